@@ -0,0 +1,81 @@
+"""
+测试用的合成PE文件和图标：只含图标资源的最小PE32文件、带半透明边缘的PNG图标帧
+测试直接导入；tools/benchmark.py 的图标管线微基准也从这里加载
+"""
+import struct
+
+
+def build_pe_icon(frames, subsystem=2):
+    """
+    生成只含一个图标组的最小PE32文件内容，资源节位于RVA 0x1000
+    frames: [(帧数据, 边长)]，帧数据为PNG或DIB，依次作为ID为1、2……的 RT_ICON；subsystem 为可选头中的子系统（2为GUI，3为控制台）
+    """
+    rva = 0x1000
+    group = struct.pack("<HHH", 0, 1, len(frames))
+    for icon_id, (frame, size) in enumerate(frames, 1):
+        bit_count = 32 if frame[:4] == b"\x89PNG" else struct.unpack_from("<H", frame, 14)[0]
+        group += struct.pack("<BBBBHHIH", size % 256, size % 256, 0, 0, 1, bit_count, len(frame), icon_id)
+    # (资源类型, [(ID, 数据)])：RT_ICON, RT_GROUP_ICON
+    types = ((3, list(enumerate((frame for frame, _ in frames), 1))), (14, [(1, group)]))
+
+    # 依次是根目录、各类型的名称目录、各资源的语言目录、数据项，最后是数据
+    offset = 16 + 8 * len(types)
+    name_dirs = []
+    for _, entries in types:
+        name_dirs.append(offset)
+        offset += 16 + 8 * len(entries)
+    resources = [data for _, entries in types for _, data in entries]
+    language_dirs = [offset + 24 * i for i in range(len(resources))]
+    offset += 24 * len(resources)
+    data_entries = [offset + 16 * i for i in range(len(resources))]
+    offset += 16 * len(resources)
+
+    rsrc = bytearray(struct.pack("<IIHHHH", 0, 0, 0, 0, 0, len(types)))
+    for (type_id, _), name_dir in zip(types, name_dirs):
+        rsrc += struct.pack("<II", type_id, 0x80000000 | name_dir)
+    index = 0
+    for _, entries in types:
+        rsrc += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, len(entries))
+        for resource_id, _ in entries:
+            rsrc += struct.pack("<II", resource_id, 0x80000000 | language_dirs[index])
+            index += 1
+    for data_entry in data_entries:
+        rsrc += struct.pack("<IIHHHHII", 0, 0, 0, 0, 0, 1, 0x409, data_entry)
+    for data in resources:
+        rsrc += struct.pack("<IIII", rva + offset, len(data), 0, 0)
+        offset += len(data) + (-len(data)) % 4
+    for data in resources:
+        rsrc += data + bytes((-len(data)) % 4)
+
+    header = bytearray(0x200)
+    header[0:2] = b"MZ"
+    struct.pack_into("<I", header, 0x3C, 0x40)
+    header[0x40:0x44] = b"PE\0\0"
+    struct.pack_into("<HHIIIHH", header, 0x44, 0x14C, 1, 0, 0, 0, 224, 0x0102)
+    optional = 0x58
+    struct.pack_into("<H", header, optional, 0x10B)
+    struct.pack_into("<H", header, optional + 68, subsystem)
+    struct.pack_into("<I", header, optional + 92, 16)  # 数据目录项数
+    struct.pack_into("<II", header, optional + 96 + 2 * 8, rva, len(rsrc))  # 资源目录
+    struct.pack_into("<8sIIII", header, optional + 224, b".rsrc", len(rsrc), rva, len(rsrc), 0x200)
+    return bytes(header) + bytes(rsrc)
+
+
+def sample_icon_png(size):
+    """带半透明边缘的 size×size PNG图标"""
+    from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, Qt
+    from PyQt6.QtGui import QColor, QImage, QPainter
+
+    image = QImage(size, size, QImage.Format.Format_ARGB32)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setBrush(QColor(37, 99, 235, 220))
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.drawEllipse(size // 16, size // 16, size * 7 // 8, size * 7 // 8)
+    painter.end()
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, "PNG")
+    return bytes(data)
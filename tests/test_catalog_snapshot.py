@@ -0,0 +1,181 @@
+"""
+目录快照：保存和读取、损坏或版本不符时整体重新扫描、目录标记变化的分类重新解析，命令行模式读取快照
+"""
+import os
+import pickle
+import shutil
+
+import pytest
+
+from tools import catalog_snapshot, cli
+from tools.catalog import scan_category
+from tools.catalog_snapshot import SNAPSHOT_VERSION, directory_stamp, load_snapshot, save_snapshot
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT = os.path.join("profile", "catalog_snapshot.bin")
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(REPO_ROOT, "apps"), tmp_path / "apps")
+    (tmp_path / "profile").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def category_dirs():
+    return sorted(os.path.join("apps", name) for name in os.listdir("apps"))
+
+
+def write_snapshot(rename=""):
+    """按当前目录写入快照；rename 非空时在快照中的名称后加上它，用来区分结果来自快照还是重新解析"""
+    dir_apps, stamps = {}, {}
+    for directory in category_dirs():
+        apps = scan_category(os.path.basename(directory), directory)
+        for app in apps:
+            app['name'] += rename
+            app['icon'] = object()  # 不在 SNAPSHOT_FIELDS 中，不应写入
+        dir_apps[directory] = apps
+        stamps[directory] = directory_stamp(directory)
+    save_snapshot(SNAPSHOT, dir_apps, stamps)
+    return dir_apps
+
+
+def scanned_directories(monkeypatch):
+    scanned = []
+    original = cli.scan_category
+
+    def recording(category, category_path, *args, **kwargs):
+        scanned.append(category_path)
+        return original(category, category_path, *args, **kwargs)
+
+    monkeypatch.setattr(cli, "scan_category", recording)
+    return scanned
+
+
+def test_round_trip_keeps_snapshot_fields(root):
+    dir_apps = write_snapshot()
+    snapshot = load_snapshot(SNAPSHOT)
+    assert sorted(snapshot) == category_dirs()
+    for directory, (stamp, apps) in snapshot.items():
+        assert stamp == directory_stamp(directory)
+        assert [app['name'] for app in apps] == [app['name'] for app in dir_apps[directory]]
+        assert all(set(app) <= set(catalog_snapshot.SNAPSHOT_FIELDS) for app in apps)
+        assert all('search_entry' in app for app in apps)
+
+
+def test_cli_uses_snapshot_for_unchanged_categories(root, monkeypatch):
+    write_snapshot(rename=" (快照)")
+    scanned = scanned_directories(monkeypatch)
+    apps = cli.load_catalog("profile")
+    assert scanned == []
+    assert apps and all(app['name'].endswith(" (快照)") for app in apps)
+
+
+def test_changed_category_is_rescanned(root, monkeypatch):
+    write_snapshot(rename=" (快照)")
+    changed = os.path.join("apps", "浏览器")
+    shutil.copy(os.path.join(changed, "Microsoft Edge.lnk"), os.path.join(changed, "Edge 副本.lnk"))
+
+    scanned = scanned_directories(monkeypatch)
+    apps = cli.load_catalog("profile")
+    assert scanned == [changed]
+    by_category = {}
+    for app in apps:
+        by_category.setdefault(app['category'], []).append(app['name'])
+    # 分类重新列出，其中没变的快捷方式仍沿用快照中的信息，只解析新增的
+    assert sorted(by_category["浏览器"]) == ["Edge 副本", "Google Chrome (快照)", "Microsoft Edge (快照)"]
+    assert all(name.endswith(" (快照)") for category, names in by_category.items() if category != "浏览器"
+               for name in names)
+
+
+def test_removed_category_is_dropped(root):
+    write_snapshot()
+    shutil.rmtree(os.path.join("apps", "嵌入式"))
+    assert "嵌入式" not in {app['category'] for app in cli.load_catalog("profile")}
+
+
+@pytest.mark.parametrize("content", [
+    b"not a pickle",
+    b"",
+    pickle.dumps({"version": SNAPSHOT_VERSION - 1, "categories": {os.path.join("apps", "浏览器"): ((0, 0), [])}}),
+    pickle.dumps(["unexpected"]),
+])
+def test_unusable_snapshot_falls_back_to_full_scan(root, monkeypatch, content):
+    with open(SNAPSHOT, 'wb') as f:
+        f.write(content)
+    assert load_snapshot(SNAPSHOT) == {}
+
+    scanned = scanned_directories(monkeypatch)
+    apps = cli.load_catalog("profile")
+    assert sorted(scanned) == category_dirs()
+    assert {app['name'] for app in apps} >= {"WPS Office", "Microsoft Edge", "Wireshark"}
+
+
+def test_missing_snapshot(root):
+    assert load_snapshot(SNAPSHOT) == {}
+    save_snapshot(SNAPSHOT, {}, {})
+    assert load_snapshot(SNAPSHOT) == {}
+    assert not os.path.exists(SNAPSHOT + ".tmp")
+
+
+def configure_roots(roots, timeout_ms=None):
+    from tools.state_store import StateStore
+    store = StateStore(os.path.join("profile", "state.db"))
+    store.set("config", "roots", roots)
+    if timeout_ms is not None:
+        store.set("config", "root_timeout_ms", timeout_ms)
+    store.close()
+
+
+def test_catalog_roots_normalized_and_deduplicated():
+    roots = catalog_snapshot.catalog_roots({"roots": ["apps/", "./apps", os.path.join("d", "..", "more")]})
+    assert roots == ["apps", "more"]
+    assert catalog_snapshot.catalog_roots({}) == ["apps"]
+
+
+def test_multiple_roots_are_merged(root):
+    shutil.copytree("apps", "more")
+    os.rename(os.path.join("more", "浏览器"), os.path.join("more", "备用浏览器"))
+    configure_roots(["apps", "more"])
+    categories = {app['category'] for app in cli.load_catalog("profile")}
+    assert {"浏览器", "备用浏览器", "嵌入式"} <= categories
+
+
+def test_unreachable_root_uses_snapshot(root):
+    configure_roots(["apps", "share"])
+    share_dir = os.path.join("share", "浏览器")
+    save_snapshot(SNAPSHOT, {share_dir: [{'name': "共享盘上的应用", 'path': os.path.join(share_dir, "x.lnk"),
+                                         'target': "x.exe", 'category': "浏览器"}]}, {share_dir: (0, 0)})
+
+    names = {app['name'] for app in cli.load_catalog("profile")}
+    assert "WPS Office" in names  # 可访问的根目录照常读取
+    assert "共享盘上的应用" in names  # share 无法访问，使用快照中的内容
+
+
+def test_slow_root_times_out_and_uses_snapshot(root, monkeypatch):
+    import threading
+    import time
+
+    shutil.copytree("apps", "slow")
+    configure_roots(["apps", "slow"], timeout_ms=200)
+    save_snapshot(SNAPSHOT, {os.path.join("slow", "浏览器"): [{'name': "快照中的应用", 'path': "slow\\x.lnk",
+                                                             'target': "x.exe", 'category': "浏览器"}]},
+                  {os.path.join("slow", "浏览器"): (0, 0)})
+    release = threading.Event()
+    original = cli.load_root
+
+    def load_root(root_dir, snapshot):
+        if root_dir == "slow":
+            release.wait(5)  # 模拟阻塞在网络共享上
+        return original(root_dir, snapshot)
+
+    monkeypatch.setattr(cli, "load_root", load_root)
+    start = time.monotonic()
+    try:
+        names = {app['name'] for app in cli.load_catalog("profile")}
+    finally:
+        release.set()
+    assert time.monotonic() - start < 2
+    assert "快照中的应用" in names
+    assert "WPS Office" in names
@@ -0,0 +1,88 @@
+"""
+命令行模式：读取目录、搜索和查找，不写入快照
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from tools import cli
+from tools.catalog import find_app, scan_category
+from tools.search_index import SearchIndex
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS_DIR = os.path.join(REPO_ROOT, "apps")
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    shutil.copytree(APPS_DIR, tmp_path / "apps")
+    (tmp_path / "profile").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_list_does_not_write_snapshot(root):
+    apps = cli.load_catalog("profile")
+    assert {app['name'] for app in apps} >= {"WPS Office", "Microsoft Edge", "Wireshark"}
+    assert os.listdir("profile") == []
+
+
+def test_search_json(root, capsys):
+    assert cli.main(["--search", "edge", "--json", "--local", "--root", str(root)]) == 0
+    results = json.loads(capsys.readouterr().out)
+    assert results[0]['name'] == "Microsoft Edge"
+    assert set(results[0]) == {'name', 'category', 'path', 'target', 'arguments', 'working_dir'}
+    assert os.listdir(root / "profile") == []
+
+
+def test_scan_category_reuses_unchanged(root):
+    apps = scan_category("浏览器", os.path.join("apps", "浏览器"))
+    assert sorted(app['name'] for app in apps) == ["Google Chrome", "Microsoft Edge"]
+    assert all('search_entry' in app for app in apps)
+    again = scan_category("浏览器", os.path.join("apps", "浏览器"), apps)
+    assert sorted(map(id, again)) == sorted(map(id, apps))
+
+
+def test_find_app(root):
+    apps = cli.load_catalog("profile")
+    index = SearchIndex()
+    for app in apps:
+        index.add(app)
+    assert find_app(apps, "wps office", [index])['name'] == "WPS Office"
+    assert find_app(apps, "wiresh", [index])['name'] == "Wireshark"
+    assert find_app(apps, "no such app", [index]) is None
+
+
+def run_cli(root, *args):
+    """在子进程中运行命令行模式，返回 (输出, 已导入的模块)"""
+    code = ("import json, sys; from tools.cli import main; code = main(sys.argv[1:]); "
+            "print(json.dumps(sorted(sys.modules)), file=sys.stderr); sys.exit(code)")
+    process = subprocess.run([sys.executable, "-c", code, *args, "--local", "--root", str(root)],
+                             cwd=REPO_ROOT, capture_output=True, text=True, encoding="utf-8", timeout=60)
+    assert process.returncode == 0, process.stderr
+    return process.stdout, set(json.loads(process.stderr.strip().splitlines()[-1]))
+
+
+def test_list_imports_neither_pypinyin_nor_qt(root):
+    output, modules = run_cli(root, "--list")
+    assert "WPS Office" in output
+    assert "pypinyin" not in modules
+    assert not any(module.startswith("PyQt6") for module in modules)
+
+
+def test_search_matches_pinyin_without_snapshot(root):
+    output, modules = run_cli(root, "--search", "jlc")
+    assert output.splitlines()[0].split("\t")[1].startswith("嘉立创")
+    assert not any(module.startswith("PyQt6") for module in modules)
+
+
+def test_launch_by_exact_name_skips_search_index(root, monkeypatch):
+    built = []
+    monkeypatch.setattr(cli, "build_index", lambda apps, profile_dir: built.append(1))
+    monkeypatch.setattr("tools.process_spawn.spawn", lambda *args: None)
+    assert cli.main(["--launch", "wps office", "--local", "--root", str(root)]) == 0
+    assert built == []
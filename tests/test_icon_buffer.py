@@ -0,0 +1,30 @@
+"""
+预乘BGRA的图标缓冲区：GDI绘制结果的alpha处理，以及包装为QImage
+"""
+from tools.icon_buffer import PIXEL_FORMAT, from_gdi_bits
+
+TRANSPARENT_MASK = b"\xff\xff\xff\xff"
+OPAQUE_MASK = b"\0\0\0\0"
+
+
+def test_alpha_icon_is_used_as_is(qapp):
+    # 带alpha的图标在全零背景上混合后已是预乘像素
+    color = bytes([10, 20, 30, 128, 0, 0, 0, 0, 40, 50, 60, 255, 1, 2, 3, 4])
+    buffer = from_gdi_bits(2, 2, color)
+    assert bytes(buffer.data) == color
+
+
+def test_mask_gives_alpha_to_legacy_icon(qapp):
+    # 旧式图标alpha全为0：掩码为白色的像素透明（颜色也清零），其余不透明
+    color = bytes([10, 20, 30, 0, 99, 99, 99, 0, 40, 50, 60, 0, 255, 255, 255, 0])
+    mask = OPAQUE_MASK + TRANSPARENT_MASK + OPAQUE_MASK + TRANSPARENT_MASK
+    buffer = from_gdi_bits(2, 2, color, mask)
+    assert bytes(buffer.data) == bytes([10, 20, 30, 255, 0, 0, 0, 0, 40, 50, 60, 255, 0, 0, 0, 0])
+
+
+def test_image_wraps_premultiplied_pixels(qapp):
+    color = bytes([0, 0, 128, 128]) * 4  # 半透明的红色
+    image = from_gdi_bits(2, 2, color).image()
+    assert image.format() == PIXEL_FORMAT
+    pixel = image.pixelColor(1, 1)
+    assert (pixel.alpha(), pixel.red(), pixel.green()) == (128, 255, 0)
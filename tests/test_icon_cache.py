@@ -0,0 +1,80 @@
+"""
+持久化图标缓存：命中、失效，以及索引缺失或损坏时不会读到数据文件中的旧像素
+"""
+import json
+import os
+
+import pytest
+
+from tools.icon_cache import CACHE_VERSION, IconCache
+
+
+@pytest.fixture
+def target(tmp_path):
+    path = tmp_path / "app.exe"
+    path.write_bytes(b"MZ")
+    return str(path)
+
+
+def read(cache, target, size=1):
+    result = cache.get(target, size)
+    if result is None:
+        return None
+    width, height, data = result
+    with data:
+        return width, height, bytes(data)
+
+
+def test_put_get_and_reopen(tmp_path, target):
+    cache = IconCache(str(tmp_path))
+    cache.put(target, 1, 1, 1, b"ABCD")
+    assert read(cache, target) == (1, 1, b"ABCD")
+    cache.close()
+
+    cache = IconCache(str(tmp_path))
+    assert read(cache, target) == (1, 1, b"ABCD")
+    assert cache.stats()['hits'] == 1
+    cache.close()
+
+
+def test_changed_target_is_invalidated(tmp_path, target):
+    cache = IconCache(str(tmp_path))
+    cache.put(target, 1, 1, 1, b"ABCD")
+    stat = os.stat(target)
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert read(cache, target) is None
+    assert cache.stats()['invalidations'] == 1
+    cache.close()
+
+
+def test_reopen_after_write_without_index(tmp_path, target):
+    # 写入了像素但在保存索引前退出：数据文件存在、索引不存在
+    cache = IconCache(str(tmp_path))
+    cache.put(target, 1, 2, 2, b"A" * 16)
+    cache._release_mmap()
+    assert not os.path.exists(cache.index_path)
+
+    cache = IconCache(str(tmp_path))
+    cache.put(target, 1, 2, 2, b"B" * 16)
+    assert read(cache, target) == (2, 2, b"B" * 16)
+    cache.close()
+
+
+@pytest.mark.parametrize("index", ["{not json", json.dumps({"version": CACHE_VERSION - 1, "entries": []})],
+                         ids=["corrupt", "old version"])
+def test_reopen_with_unusable_index(tmp_path, target, index):
+    cache = IconCache(str(tmp_path))
+    cache.put(target, 1, 2, 2, b"A" * 16)
+    cache.close()
+    with open(cache.index_path, "w", encoding="utf-8") as f:
+        f.write(index)
+
+    cache = IconCache(str(tmp_path))
+    assert read(cache, target) is None
+    cache.put(target, 1, 2, 2, b"B" * 16)
+    assert read(cache, target) == (2, 2, b"B" * 16)
+    cache.close()
+
+    cache = IconCache(str(tmp_path))
+    assert read(cache, target) == (2, 2, b"B" * 16)
+    cache.close()
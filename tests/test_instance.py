@@ -0,0 +1,141 @@
+"""
+常驻实例：InstanceServer 和 instance_client.request() 之间的收发
+客户端是阻塞调用，在单独的线程中发送，主线程运行Qt事件循环让服务端处理
+"""
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+from tools import instance_client
+from tools.instance_client import request, server_name
+from tools.instance_server import InstanceServer
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="用Unix域套接字模拟残留的套接字文件")
+
+
+class Handler:
+    """模拟启动器的 handle_remote_command"""
+    def __init__(self):
+        self.shown = []
+
+    def __call__(self, command, message):
+        argument = message.get("argument") or ""
+        if command == "show":
+            self.shown.append(argument)
+            return None
+        if command == "search":
+            names = ["Google Chrome", "Microsoft Edge", "WPS Office"]
+            return [name for name in names if argument.lower() in name.lower()]
+        raise LookupError(f"未知命令: {command}")
+
+
+def call(qapp, *args, **kwargs):
+    """在线程中调用 request()，同时处理事件，返回 (回复, 耗时)"""
+    result = {}
+
+    def run():
+        started = time.monotonic()
+        result['reply'] = request(*args, **kwargs)
+        result['elapsed'] = time.monotonic() - started
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    while thread.is_alive():
+        qapp.processEvents()
+        thread.join(0.01)
+    return result['reply'], result['elapsed']
+
+
+@pytest.fixture
+def name(tmp_path):
+    name = server_name(tmp_path)
+    yield name
+    if os.path.exists(name):
+        os.remove(name)
+
+
+@pytest.fixture
+def handler():
+    return Handler()
+
+
+@pytest.fixture
+def server(qapp, name, handler):
+    server = InstanceServer(name, handler)
+    assert server.listen()
+    yield server
+    server.close()
+
+
+def test_show(qapp, server, name, handler):
+    reply, _ = call(qapp, "show", "chrome", name=name)
+    assert reply == {'version': instance_client.PROTOCOL_VERSION, 'ok': True, 'result': None}
+    assert handler.shown == ["chrome"]
+
+
+def test_search(qapp, server, name):
+    reply, _ = call(qapp, "search", "o", name=name, limit=10)
+    assert reply['ok']
+    assert reply['result'] == ["Google Chrome", "Microsoft Edge", "WPS Office"]
+    reply, _ = call(qapp, "search", "edge", name=name)
+    assert reply['result'] == ["Microsoft Edge"]
+
+
+def test_unknown_command(qapp, server, name):
+    reply, _ = call(qapp, "frobnicate", name=name)
+    assert reply['ok'] is False
+    assert "frobnicate" in reply['error']
+
+
+def test_version_mismatch(qapp, server, name, handler, monkeypatch):
+    # 客户端的协议版本更新：服务端回复错误，客户端看到回复的版本不同，忽略这个实例
+    monkeypatch.setattr(instance_client, "PROTOCOL_VERSION", instance_client.PROTOCOL_VERSION + 1)
+    reply, _ = call(qapp, "show", name=name)
+    assert reply is None
+    assert handler.shown == []
+
+
+def test_second_instance_does_not_listen(qapp, server, name):
+    other = InstanceServer(name, Handler())
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('listening', other.listen()))
+    # listen() 先 ping 已有的实例，服务端需要在主线程中应答
+    thread.start()
+    while thread.is_alive():
+        qapp.processEvents()
+        thread.join(0.01)
+    assert result['listening'] is False
+
+
+def test_stale_socket_is_replaced(qapp, name):
+    # 上次异常退出留下的套接字文件：存在但没有进程监听
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(name)
+    stale.close()
+    assert request("ping", name=name, timeout=0.5) is None
+
+    server = InstanceServer(name, Handler())
+    try:
+        assert server.listen()
+        reply, _ = call(qapp, "ping", name=name)
+        assert reply['ok']
+    finally:
+        server.close()
+
+
+def test_no_server(name):
+    assert request("show", name=name, timeout=0.5) is None
+
+
+def test_timeout_when_server_does_not_reply(name):
+    # 接受连接但从不回复的进程，request() 在 timeout 之后放弃
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as hung:
+        hung.bind(name)
+        hung.listen(1)
+        started = time.monotonic()
+        assert request("show", name=name, timeout=0.3) is None
+        assert time.monotonic() - started < 2.0
@@ -0,0 +1,62 @@
+"""
+异步启动：只有成功创建进程才发出 launched，统计在启动完成后写入文件，不必等到退出
+"""
+import json
+import time
+
+import pytest
+
+from tools import launch_executor
+from tools.launch_executor import LaunchExecutor
+
+
+def wait_for(qapp, condition, seconds=3.0):
+    deadline = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def executor(qapp, tmp_path, monkeypatch):
+    def fake_spawn(target_path, arguments, working_dir):
+        if "missing" in target_path:
+            raise FileNotFoundError(f"找不到 {target_path}")
+
+    monkeypatch.setattr(launch_executor, "spawn", fake_spawn)
+    monkeypatch.setattr(launch_executor, "SAVE_DELAY_MS", 50)
+    executor = LaunchExecutor(str(tmp_path / "launch_stats.json"))
+    yield executor
+    executor.shutdown()
+
+
+def test_launched_only_on_success(qapp, executor):
+    launched = []
+    executor.launched.connect(launched.append)
+    assert executor.launch("apps/a.lnk", "/bin/ok.exe")
+    assert executor.launch("apps/b.lnk", "/bin/missing.exe")
+    assert wait_for(qapp, lambda: len(executor.stats) == 2)
+    assert launched == ["apps/a.lnk"]
+    assert executor.stats["apps/b.lnk"]['failures'] == 1
+
+
+def test_repeated_clicks_are_coalesced(qapp, executor):
+    assert executor.launch("apps/a.lnk", "/bin/ok.exe")
+    assert not executor.launch("apps/a.lnk", "/bin/ok.exe")
+
+
+def test_stats_saved_after_launch(qapp, executor, tmp_path):
+    executor.launch("apps/a.lnk", "/bin/ok.exe")
+    path = tmp_path / "launch_stats.json"
+    assert wait_for(qapp, path.exists)
+    assert json.loads(path.read_text(encoding="utf-8"))["apps/a.lnk"]['launches'] == 1
+
+
+def test_slowest(executor):
+    executor.stats = {
+        'fast': {'launches': 2, 'failures': 0, 'total_ms': 20.0},
+        'slow': {'launches': 1, 'failures': 0, 'total_ms': 300.0},
+        'never': {'launches': 0, 'failures': 0, 'total_ms': 0.0},
+    }
+    assert [key for key, _ in executor.slowest()] == ['slow', 'fast']
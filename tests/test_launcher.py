@@ -0,0 +1,122 @@
+"""
+主窗口：在 offscreen 平台上用仓库中 apps/ 的副本创建 AppLauncher
+"""
+import importlib.util
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def launcher_module(qapp):
+    spec = importlib.util.spec_from_file_location("launcher", os.path.join(REPO_ROOT, "软件启动器.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def pump(qapp, seconds=0.5):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def launcher(qapp, launcher_module, tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(REPO_ROOT, "apps"), tmp_path / "apps")
+    monkeypatch.chdir(tmp_path)
+    window = launcher_module.AppLauncher()
+    pump(qapp)
+    yield window
+    window.close()
+    pump(qapp, 0.05)
+
+
+def test_drop_idle_pixmaps_uses_icon_keys(qapp, launcher, monkeypatch):
+    apps = launcher.app_categories["开发工具"]
+    for app in apps:
+        app['has_icon'] = True
+    # 图标来自其他文件的应用：按图标键释放，而不是按目标程序
+    apps[0]['icon_key'] = "/icons/shared.desktop"
+    apps[1]['icon_key'] = "/icons/other.desktop"
+    launcher.other_results = [{'name': "shared", 'path': "/icons/shared.desktop", 'target': "/usr/bin/shared",
+                               'icon_key': "/icons/shared.desktop", 'has_icon': True}]
+    invalidated = []
+    monkeypatch.setattr(launcher.scaled_icons, "invalidate", invalidated.append)
+
+    launcher.toggle_category("开发工具")
+    launcher.collapsed_since["开发工具"] -= 10000
+    launcher.displayed_paths = set()
+    launcher.drop_idle_pixmaps()
+
+    assert not any(app['has_icon'] for app in apps)
+    assert "/icons/other.desktop" in invalidated
+    assert "/icons/shared.desktop" not in invalidated  # “其他结果”中仍在使用
+    assert apps[1]['target'] not in invalidated
+
+
+def test_usage_recorded_only_after_successful_launch(qapp, launcher, monkeypatch):
+    from tools import launch_executor
+
+    def fake_spawn(target_path, arguments, working_dir):
+        if "Wireshark" in target_path:
+            raise FileNotFoundError(target_path)
+
+    monkeypatch.setattr(launch_executor, "spawn", fake_spawn)
+    apps = {app['name']: app for app in launcher.app_categories["开发工具"]}
+    launcher.launch_app(apps["Wireshark"])
+    launcher.launch_app(apps["CCProxy"])
+    launcher.launch_executor.thread_pool.waitForDone(2000)
+    pump(qapp, 0.2)
+    assert launcher.usage_log.top(10) == [apps["CCProxy"]['path']]
+    assert "slowest_launches" in launcher.metrics_report()['gauges']
+
+
+def test_metrics_report_includes_icon_cache_stats(launcher):
+    from tools.metrics import format_report
+
+    report = launcher.metrics_report()
+    stats = report['gauges']['icon_cache']
+    assert {'hits', 'misses', 'invalidations'} <= set(stats)
+    assert "invalidations" in format_report(report)
+
+
+def open_launcher(qapp, launcher_module):
+    window = launcher_module.AppLauncher()
+    pump(qapp, 0.2)
+    return window
+
+
+def close_launcher(qapp, window):
+    window.close()
+    pump(qapp, 0.05)
+
+
+def test_legacy_config_and_favorites_migrated_once(qapp, launcher_module, tmp_path, monkeypatch):
+    shutil.copytree(os.path.join(REPO_ROOT, "apps"), tmp_path / "apps")
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "profile").mkdir()
+    (tmp_path / "profile" / "config.json").write_text(
+        json.dumps({"scale_factor": 1.5, "virtual_view": True, "size": [900, 650]}), encoding="utf-8")
+    (tmp_path / "favorites.txt").write_text("apps\\开发工具\\Wireshark.lnk\n\napps\\娱乐\\QQ音乐.lnk\n",
+                                            encoding="utf-8")
+
+    window = open_launcher(qapp, launcher_module)
+    assert window.scale_factor == 1.5
+    assert window.virtual_view
+    assert set(window.favorite_apps) == {"apps\\开发工具\\Wireshark.lnk", "apps\\娱乐\\QQ音乐.lnk"}
+    window.toggle_favorite("apps\\娱乐\\QQ音乐.lnk")
+    close_launcher(qapp, window)
+
+    # 旧文件仍在，但已迁移过，不再读取：被取消的收藏不会回来，旧配置的修改不生效
+    (tmp_path / "profile" / "config.json").write_text(json.dumps({"scale_factor": 0.75}), encoding="utf-8")
+    window = open_launcher(qapp, launcher_module)
+    assert window.scale_factor == 1.5
+    assert set(window.favorite_apps) == {"apps\\开发工具\\Wireshark.lnk"}
+    close_launcher(qapp, window)
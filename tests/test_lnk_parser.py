@@ -0,0 +1,122 @@
+"""
+纯Python快捷方式解析：仓库中 apps/ 下的真实快捷方式，以及无法解码时回退到COM
+"""
+import os
+import struct
+
+import pytest
+
+from tools import catalog
+from tools.lnk_parser import HEADER_SIZE, LnkFormatError, parse_lnk, parse_lnk_batch, parse_lnk_bytes
+
+APPS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "apps")
+
+# (快捷方式, 目标, 参数, 工作目录)
+EXPECTED = [
+    ("办公软件/WPS Office.lnk", r"D:\applications\small exe\WPS\WPS Office\ksolaunch.exe",
+     "/prometheus /fromksolaunch /from=desktop_shortcut", "D:\\applications\\small exe\\WPS\\WPS Office\\"),
+    ("办公软件/飞书.lnk", r"D:\applications\small exe\Feishu\Feishu.exe", "",
+     r"D:\applications\small exe\Feishu"),
+    ("嵌入式/Keil uVision5.LNK", r"D:\applications\Embedded-Software-Toolkit\STM32\KeilMDK\MDK\UV4\UV4.exe", "",
+     r"D:\applications\Embedded-Software-Toolkit\STM32\KeilMDK\MDK"),
+    ("嵌入式/嘉立创下单助手.lnk",
+     r"D:\applications\Embedded-Software-Toolkit\LcEDA\下单助手\jlc-assistant\jlc-assistant.exe", "",
+     r"D:\applications\Embedded-Software-Toolkit\LcEDA\下单助手\jlc-assistant"),
+    ("开发工具/procexp64.exe.lnk", r"D:\applications\small exe\ProcessExplorer\procexp64.exe", "",
+     r"D:\applications\small exe\ProcessExplorer"),
+    ("浏览器/Google Chrome.lnk", r"C:\Users\lenovo\AppData\Local\Google\Chrome\Application\chrome.exe", "",
+     r"C:\Users\lenovo\AppData\Local\Google\Chrome\Application"),
+    ("浏览器/Microsoft Edge.lnk", r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe",
+     "http://icc.oyb.wyswgb.com/dhntab", r"C:\Program Files (x86)\Microsoft\Edge\Application"),
+]
+
+
+def lnk_path(name):
+    return os.path.join(APPS_DIR, *name.split("/"))
+
+
+def all_shortcuts():
+    return sorted(os.path.join(dirpath, name) for dirpath, _, names in os.walk(APPS_DIR)
+                  for name in names if name.lower().endswith(".lnk"))
+
+
+@pytest.mark.parametrize("name, target, arguments, working_dir", EXPECTED)
+def test_parse_lnk(name, target, arguments, working_dir):
+    info = parse_lnk(lnk_path(name))
+    assert info['target'] == target
+    assert info['arguments'] == arguments
+    assert info['working_dir'] == working_dir
+
+
+def test_icon_location_and_relative_path():
+    info = parse_lnk(lnk_path("浏览器/Microsoft Edge.lnk"))
+    assert info['icon_location'] == r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe"
+    assert info['icon_index'] == 0
+    assert info['relative_path'].endswith(r"Microsoft\Edge\Application\msedge.exe")
+
+
+def test_parse_lnk_batch_decodes_every_shortcut():
+    paths = all_shortcuts()
+    results = parse_lnk_batch(paths)
+    assert set(results) == set(paths)
+    for path, info in results.items():
+        assert info is not None, path
+        assert info['target'].lower().endswith(".exe"), path
+
+
+def malformed():
+    data = open(lnk_path("浏览器/Microsoft Edge.lnk"), "rb").read()
+    bad_clsid = bytearray(data)
+    bad_clsid[4] ^= 0xFF
+    bad_header_size = bytearray(data)
+    bad_header_size[0] = HEADER_SIZE + 4
+    return {
+        'empty': b"",
+        'truncated header': data[:HEADER_SIZE - 1],
+        'bad CLSID': bytes(bad_clsid),
+        'bad header size': bytes(bad_header_size),
+        'truncated body': data[:HEADER_SIZE + 40],
+        'not a shortcut': b"MZ" + b"\0" * 200,
+    }
+
+
+@pytest.mark.parametrize("kind", sorted(malformed()))
+def test_malformed_input(kind, tmp_path):
+    data = malformed()[kind]
+    with pytest.raises((LnkFormatError, struct.error, ValueError, IndexError)):
+        parse_lnk_bytes(data)
+    path = tmp_path / "bad.lnk"
+    path.write_bytes(data)
+    assert parse_lnk(str(path)) is None
+
+
+def test_missing_file(tmp_path):
+    assert parse_lnk(str(tmp_path / "missing.lnk")) is None
+
+
+def test_com_fallback_only_for_undecodable(tmp_path, monkeypatch):
+    good = lnk_path("浏览器/Microsoft Edge.lnk")
+    truncated = tmp_path / "truncated.lnk"
+    truncated.write_bytes(open(good, "rb").read()[:HEADER_SIZE - 1])
+    bad_clsid = tmp_path / "bad_clsid.lnk"
+    data = bytearray(open(good, "rb").read())
+    data[8] ^= 0xFF
+    bad_clsid.write_bytes(bytes(data))
+
+    requested = []
+
+    def fake_com(paths):
+        requested.extend(paths)
+        return {path: {'target': r"C:\from\com.exe", 'arguments': "", 'working_dir': ""} for path in paths}
+
+    monkeypatch.setattr(catalog, "parse_shortcuts_com", fake_com)
+    results = catalog.parse_shortcuts([good, str(truncated), str(bad_clsid)])
+    assert sorted(requested) == sorted([str(truncated), str(bad_clsid)])
+    assert results[good]['arguments'] == "http://icc.oyb.wyswgb.com/dhntab"
+    assert results[str(truncated)]['target'] == r"C:\from\com.exe"
+    assert results[str(bad_clsid)]['target'] == r"C:\from\com.exe"
+
+
+def test_com_fallback_unavailable_off_windows(monkeypatch):
+    monkeypatch.setattr(catalog.sys, "platform", "linux")
+    assert catalog.parse_shortcuts_com(["x.lnk"]) == {}
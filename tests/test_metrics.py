@@ -0,0 +1,126 @@
+"""
+运行时指标：滚动直方图的百分位数、分桶和卡顿计数，汇总报告、JSON 输出和调试浮层
+"""
+import json
+import random
+
+import pytest
+
+from tools import metrics as metrics_module
+from tools.metrics import Metrics, RollingHistogram, format_report
+
+
+def histogram_of(values, window=256):
+    histogram = RollingHistogram(window=window)
+    for value in values:
+        histogram.add(value)
+    return histogram
+
+
+@pytest.mark.parametrize("p, expected", [(0, 1), (1, 1), (50, 50), (90, 90), (95, 95), (99, 99), (100, 100)])
+def test_percentiles_use_nearest_rank(p, expected):
+    values = list(range(1, 101))
+    random.Random(1).shuffle(values)
+    assert histogram_of(values).percentile(p) == expected
+
+
+@pytest.mark.parametrize("values, p, expected", [
+    ([], 50, 0.0),
+    ([7.5], 95, 7.5),
+    ([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 50, 5),
+    ([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 95, 10),
+    ([3, 1, 2], 50, 2),
+    ([4, 1, 3, 2], 50, 2),
+    ([4, 1, 3, 2], 75, 3),
+])
+def test_percentile_small_samples(values, p, expected):
+    assert histogram_of(values).percentile(p) == expected
+
+
+def test_window_keeps_recent_samples_and_total_counts():
+    histogram = histogram_of([100.0] * 10 + [1.0] * 20, window=20)
+    assert histogram.count == 30
+    assert histogram.stalls == 10  # 累计值，不随窗口滚动
+    assert histogram.percentile(100) == 1.0
+    summary = histogram.summary()
+    assert summary['max_ms'] == 1.0
+    assert summary['last_ms'] == 1.0
+    assert summary['count'] == 30
+
+
+def test_buckets_and_stalls():
+    histogram = histogram_of([0.5, 1, 1.5, 16, 17, 49.9, 50, 300])
+    buckets = histogram.buckets()
+    assert buckets[1] == 2  # 上界包含在内
+    assert buckets[2] == 1
+    assert buckets[16] == 1
+    assert buckets[33] == 1
+    assert buckets[50] == 2
+    assert buckets['inf'] == 1
+    assert sum(buckets.values()) == 8
+    assert histogram.stalls == 2  # 50 和 300
+
+
+def test_report_and_json_dump(tmp_path):
+    recorder = Metrics()
+    for value in (4.0, 8.0, 60.0):
+        recorder.observe("search", value)
+    with recorder.timer("display_apps"):
+        pass
+    recorder.count("icons_loaded", 3)
+    recorder.count("icons_loaded")
+    report = recorder.report(widgets=12, icon_cache={'hits': 5})
+
+    assert list(report['timings']) == ["display_apps", "search"]
+    search = report['timings']['search']
+    assert (search['count'], search['last_ms'], search['p50_ms'], search['max_ms'], search['stalls']) == \
+        (3, 60.0, 8.0, 60.0, 1)
+    assert report['timings']['display_apps']['count'] == 1
+    assert report['counters'] == {'icons_loaded': 4}
+
+    path = str(tmp_path / "out" / "metrics.json")
+    recorder.write(report, path)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['timings']['search']['p95_ms'] == 60.0
+
+    text = format_report(report)
+    assert "search" in text and "icons_loaded: 4" in text and "widgets: 12" in text and "  hits: 5" in text
+
+
+@pytest.mark.parametrize("argv, expected", [
+    (["app", "--metrics-dump"], metrics_module.DEFAULT_METRICS_PATH),
+    (["app", "--metrics-dump=m.json"], "m.json"),
+    (["app"], None),
+])
+def test_configure(monkeypatch, argv, expected):
+    monkeypatch.setattr(metrics_module, "metrics", Metrics())
+    monkeypatch.delenv(metrics_module.METRICS_ENV, raising=False)
+    assert metrics_module.configure(argv) == (expected is not None)
+    assert metrics_module.metrics.dump_path == expected
+    assert argv == ["app"]
+
+
+def test_overlay_shows_report_and_flags_stalls(qapp):
+    from PyQt6.QtWidgets import QWidget
+    from tools.metrics_overlay import MetricsOverlay
+
+    recorder = Metrics()
+    recorder.observe("search", 2.0)
+    parent = QWidget()
+    parent.resize(800, 600)
+    parent.show()
+    overlay = MetricsOverlay(lambda: recorder.report(widgets=3), parent)
+    overlay.toggle()
+    assert overlay.isVisible() and overlay.refresh_timer.isActive()
+    assert "search" in overlay.text() and "widgets: 3" in overlay.text()
+    assert "transparent" in overlay.styleSheet()
+
+    recorder.observe("search", 80.0)  # 最近一次卡顿，边框变红
+    overlay.refresh()
+    assert "#DC2626" in overlay.styleSheet()
+    assert overlay.x() + overlay.width() <= parent.width()
+
+    overlay.toggle()
+    assert not overlay.isVisible() and not overlay.refresh_timer.isActive()
+    parent.close()
+    parent.deleteLater()
@@ -0,0 +1,115 @@
+"""
+纯Python的PE图标读取：用 pe_fixtures.build_pe_icon 生成只含图标资源的合成PE文件
+"""
+import struct
+
+import pytest
+
+from pe_fixtures import build_pe_icon, sample_icon_png
+from tools.pe_icons import PEFormatError, choose_frame, load_icon_buffer, read_icon_frame
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def dib_frame(qapp, size):
+    """Qt写出的 .ico 去掉文件头和目录项后即为DIB帧（BITMAPINFOHEADER + 像素 + AND掩码）"""
+    from PyQt6.QtCore import QBuffer, QByteArray, QIODevice
+    from PyQt6.QtGui import QImage
+
+    image = QImage.fromData(sample_icon_png(size), "PNG")
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    assert image.save(buffer, "ICO")
+    ico = bytes(data)
+    _, _, count = struct.unpack_from("<HHH", ico)
+    assert count == 1
+    frame_size, frame_offset = struct.unpack_from("<II", ico, 6 + 8)
+    frame = ico[frame_offset:frame_offset + frame_size]
+    assert frame[:8] != PNG_MAGIC
+    return frame
+
+
+@pytest.fixture
+def multi_frame_exe(qapp, tmp_path):
+    frames = [(sample_icon_png(size), size) for size in (16, 32, 48, 256)]
+    path = tmp_path / "multi.exe"
+    path.write_bytes(build_pe_icon(frames))
+    return str(path)
+
+
+def test_choose_frame():
+    # (宽, 高, 位深, ID)
+    frames = [(16, 16, 32, 1), (32, 32, 8, 2), (32, 32, 32, 3), (48, 48, 32, 4), (256, 256, 32, 5)]
+    assert choose_frame(frames, 16)[3] == 1
+    assert choose_frame(frames, 24)[3] == 3  # 不小于目标的最小尺寸，同尺寸取位深最高的
+    assert choose_frame(frames, 32)[3] == 3
+    assert choose_frame(frames, 64)[3] == 5
+    assert choose_frame(frames[:4], 64)[3] == 4  # 都比目标小时取最大的
+    assert choose_frame([], 64) is None
+
+
+@pytest.mark.parametrize("size, expected", [(16, 16), (20, 32), (48, 48), (64, 256), (256, 256)])
+def test_read_icon_frame_selects_size(multi_frame_exe, size, expected):
+    width, height, frame = read_icon_frame(multi_frame_exe, size)
+    assert (width, height) == (expected, expected)
+    assert frame[:8] == PNG_MAGIC
+
+
+def test_load_icon_buffer_png(multi_frame_exe):
+    buffer = load_icon_buffer(multi_frame_exe, 48)
+    assert (buffer.width, buffer.height) == (48, 48)
+    assert len(buffer.data) == buffer.nbytes
+    pixels = bytes(buffer.data)
+    # 角上透明，中心为半透明的蓝色（预乘BGRA：各颜色分量不大于alpha）
+    assert pixels[3] == 0
+    center = (24 * 48 + 24) * 4
+    blue, green, red, alpha = pixels[center:center + 4]
+    assert 200 <= alpha <= 230
+    assert max(blue, green, red) <= alpha and blue > red
+
+
+def test_load_icon_buffer_dib(qapp, tmp_path):
+    path = tmp_path / "dib.exe"
+    path.write_bytes(build_pe_icon([(dib_frame(qapp, 32), 32)]))
+    width, height, frame = read_icon_frame(str(path), 32)
+    assert (width, height) == (32, 32) and frame[:8] != PNG_MAGIC
+    buffer = load_icon_buffer(str(path), 32)
+    assert (buffer.width, buffer.height) == (32, 32)
+    pixels = bytes(buffer.data)
+    assert pixels[3] == 0
+    assert pixels[(16 * 32 + 16) * 4 + 3] > 200
+
+
+def test_no_icon_resources(tmp_path):
+    data = bytearray(build_pe_icon([(b"\x89PNG\r\n\x1a\n", 16)]))
+    struct.pack_into("<II", data, 0x58 + 96 + 2 * 8, 0, 0)  # 清空资源目录
+    path = tmp_path / "noicon.exe"
+    path.write_bytes(bytes(data))
+    assert read_icon_frame(str(path)) is None
+    assert load_icon_buffer(str(path)) is None
+
+
+@pytest.mark.parametrize("content", [b"", b"MZ", b"not a program at all" * 10, b"MZ" + bytes(200)],
+                         ids=["empty", "mz only", "text", "no pe signature"])
+def test_not_pe(tmp_path, content):
+    path = tmp_path / "bad.exe"
+    path.write_bytes(content)
+    with pytest.raises(PEFormatError):
+        read_icon_frame(str(path))
+
+
+@pytest.mark.parametrize("length", [0x60, 0x180, 0x210, 0x260])
+def test_truncated_pe(multi_frame_exe, tmp_path, length):
+    data = open(multi_frame_exe, "rb").read()[:length]
+    path = tmp_path / "truncated.exe"
+    path.write_bytes(data)
+    with pytest.raises(PEFormatError):
+        read_icon_frame(str(path))
+
+
+def test_corrupt_frame_is_not_decoded(qapp, tmp_path):
+    # 图标组和资源目录都正确，但帧数据无法解码：返回None，不抛出异常
+    path = tmp_path / "corrupt.exe"
+    path.write_bytes(build_pe_icon([(PNG_MAGIC + b"garbage" * 20, 32)]))
+    assert load_icon_buffer(str(path), 32) is None
@@ -0,0 +1,64 @@
+"""
+预热候选文件的选择：目标程序和依赖，预算限制，Windows目录下的文件不预热
+"""
+import os
+
+import pytest
+
+from tools.prewarm import system_directories, target_files
+
+
+def write(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"\0" * size)
+    return str(path)
+
+
+@pytest.fixture
+def program(tmp_path):
+    target = write(tmp_path / "app" / "app.exe", 100)
+    write(tmp_path / "app" / "big.dll", 300)
+    write(tmp_path / "app" / "lib" / "small.jar", 50)
+    write(tmp_path / "app" / "readme.txt", 1000)
+    return target
+
+
+def names(files):
+    return [os.path.basename(path) for path, _ in files]
+
+
+def test_target_first_then_largest_dependencies(program):
+    assert names(target_files(program, 10000, [])) == ["app.exe", "big.dll", "small.jar"]
+
+
+def test_budget(program):
+    assert names(target_files(program, 200, [])) == ["app.exe", "small.jar"]
+
+
+def test_system_directories_from_environment(tmp_path, monkeypatch):
+    windows = tmp_path / "Windows"
+    monkeypatch.setenv("SystemRoot", str(windows))
+    monkeypatch.setenv("WINDIR", str(windows) + os.sep)
+    assert system_directories() == [os.path.normcase(str(windows))]
+
+
+def test_targets_under_windows_directory_are_skipped(tmp_path, monkeypatch, program):
+    windows = tmp_path / "Windows"
+    notepad = write(windows / "System32" / "notepad.exe", 100)
+    write(windows / "System32" / "kernel32.dll", 100)
+    monkeypatch.setenv("SystemRoot", str(windows))
+    monkeypatch.delenv("WINDIR", raising=False)
+    assert target_files(notepad, 10000) == []
+    assert names(target_files(program, 10000)) == ["app.exe", "big.dll", "small.jar"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="需要符号链接")
+def test_dependencies_linked_from_windows_directory_are_skipped(tmp_path, monkeypatch, program):
+    windows = tmp_path / "Windows"
+    system_dll = write(windows / "System32" / "msvcrt.dll", 100)
+    try:
+        os.symlink(system_dll, os.path.join(os.path.dirname(program), "msvcrt.dll"))
+    except OSError:
+        pytest.skip("无法创建符号链接")
+    monkeypatch.setenv("SystemRoot", str(windows))
+    assert "msvcrt.dll" not in names(target_files(program, 10000))
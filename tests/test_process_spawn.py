@@ -0,0 +1,99 @@
+"""
+创建应用进程：Windows命令行参数拆分，控制台程序的识别和创建标志
+"""
+import sys
+import time
+
+import pytest
+
+from pe_fixtures import build_pe_icon
+from tools import process_spawn
+from tools.process_spawn import IMAGE_SUBSYSTEM_WINDOWS_CUI, needs_console, pe_subsystem, split_arguments
+
+PNG_FRAME = (b"\x89PNG\r\n\x1a\n", 16)
+
+
+@pytest.mark.parametrize("arguments, expected", [
+    ("", []),
+    ("/prometheus /fromksolaunch /from=desktop_shortcut", ["/prometheus", "/fromksolaunch", "/from=desktop_shortcut"]),
+    ('"C:\\Program Files\\a b" -x', ["C:\\Program Files\\a b", "-x"]),
+    ('a\\\\"b c"', ["a\\b c"]),
+    ('a\\"b', ['a"b']),
+    ('"say ""hi"""', ['say "hi"']),
+])
+def test_split_arguments(arguments, expected):
+    assert split_arguments(arguments) == expected
+
+
+@pytest.fixture
+def programs(tmp_path):
+    paths = {}
+    for name, subsystem in (("gui", 2), ("console", IMAGE_SUBSYSTEM_WINDOWS_CUI)):
+        path = tmp_path / f"{name}.exe"
+        path.write_bytes(build_pe_icon([PNG_FRAME], subsystem=subsystem))
+        paths[name] = str(path)
+    (tmp_path / "text.exe").write_bytes(b"not a program")
+    paths['text'] = str(tmp_path / "text.exe")
+    (tmp_path / "run.CMD").write_bytes(b"@echo off")
+    paths['script'] = str(tmp_path / "run.CMD")
+    paths['missing'] = str(tmp_path / "missing.exe")
+    return paths
+
+
+def test_pe_subsystem(programs):
+    assert pe_subsystem(programs['gui']) == 2
+    assert pe_subsystem(programs['console']) == IMAGE_SUBSYSTEM_WINDOWS_CUI
+    assert pe_subsystem(programs['text']) is None
+    assert pe_subsystem(programs['missing']) is None
+
+
+def test_needs_console(programs):
+    assert needs_console(programs['console'])
+    assert needs_console(programs['script'])
+    assert not needs_console(programs['gui'])
+    assert not needs_console(programs['text'])
+
+
+@pytest.mark.parametrize("name, console", [("gui", False), ("console", True)])
+def test_windows_creation_flags(programs, monkeypatch, name, console):
+    calls = []
+    monkeypatch.setattr(process_spawn.sys, "platform", "win32")
+    monkeypatch.setattr(process_spawn, "DETACH_FLAGS", 0x208)
+    monkeypatch.setattr(process_spawn, "CONSOLE_FLAGS", 0x210)
+    monkeypatch.setattr(process_spawn.subprocess, "Popen", lambda command, **kwargs: calls.append(kwargs))
+    process_spawn.spawn(programs[name], "-v")
+    kwargs, = calls
+    assert kwargs['creationflags'] == (0x210 if console else 0x208)
+    # 控制台程序使用新控制台的标准输入输出
+    assert ('stdout' in kwargs) is not console
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="使用 /bin/sh")
+def test_spawn_detached(tmp_path):
+    marker = tmp_path / "ran"
+    process_spawn.spawn("/bin/sh", f'-c "touch {marker}"')
+    for _ in range(200):
+        if marker.exists():
+            break
+        time.sleep(0.01)
+    assert marker.exists()
+
+
+def test_pe_subsystem_rejects_out_of_range_pe_offset(tmp_path):
+    # e_lfanew 指向文件之外（接近4GB）：不按它分配内存，直接判定不是PE文件
+    data = bytearray(build_pe_icon([PNG_FRAME], subsystem=IMAGE_SUBSYSTEM_WINDOWS_CUI))
+    data[0x3C:0x40] = (0xFFFFFFF0).to_bytes(4, "little")
+    path = tmp_path / "hostile.exe"
+    path.write_bytes(bytes(data))
+    assert pe_subsystem(str(path)) is None
+    assert not needs_console(str(path))
+
+
+def test_pe_subsystem_with_header_beyond_first_kilobyte(tmp_path):
+    data = build_pe_icon([PNG_FRAME], subsystem=IMAGE_SUBSYSTEM_WINDOWS_CUI)
+    # 把PE头整体后移到 0x1000，DOS头中的偏移随之修改
+    moved = bytearray(data[:0x40]) + bytes(0x1000 - 0x40) + data[0x40:]
+    moved[0x3C:0x40] = (0x1000).to_bytes(4, "little")
+    path = tmp_path / "far.exe"
+    path.write_bytes(bytes(moved))
+    assert pe_subsystem(str(path)) == IMAGE_SUBSYSTEM_WINDOWS_CUI
@@ -0,0 +1,124 @@
+"""
+搜索索引：前缀 > 词首 > 子串 > 模糊 的排序、拼音全拼和首字母、逐键输入时的增量缩小、同一排名内的次序
+"""
+import random
+
+import pytest
+
+from tools.search_index import SearchIndex
+
+APPS = [
+    # (名称, 目标程序名, 分类)
+    ("嘉立创下单助手", "jlc", "工具"),
+    ("网易云音乐", "cloudmusic", "娱乐"),
+    ("网易邮箱大师", "mail", "办公"),
+    ("Notepad", "notepad", "工具"),
+    ("MyNotes", "mynotes", "办公"),
+    ("Keynote", "keynote", "办公"),
+    ("Teams", "ms-teams", "办公"),
+]
+
+
+def make_app(name, target, category):
+    return {'name': name, 'path': f"C:\\apps\\{category}\\{name}.lnk",
+            'target': f"C:\\Program Files\\{target}.exe", 'category': category}
+
+
+def build(apps=APPS):
+    index = SearchIndex()
+    categories = {}
+    for name, target, category in apps:
+        categories.setdefault(category, []).append(make_app(name, target, category))
+    index.build(categories)
+    return index
+
+
+def names(index, query, limit=None):
+    return [app['name'] for app in index.search(query, limit)]
+
+
+@pytest.fixture
+def index():
+    return build()
+
+
+def test_prefix_before_word_start_before_substring(index):
+    # Notepad 是前缀匹配，MyNotes 是词首匹配，Keynote 只是子串匹配
+    assert names(index, "note") == ["Notepad", "MyNotes", "Keynote"]
+
+
+def test_fuzzy_match_ranks_last(index):
+    assert names(index, "ntd") == ["Notepad"]
+    # ms-teams 的前缀匹配（其他字段）优先于 MyNotes 名称的模糊匹配
+    assert names(index, "ms") == ["Teams", "MyNotes"]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("jlc", ["嘉立创下单助手"]),
+    ("xdzs", ["嘉立创下单助手"]),  # 首字母的词首匹配
+    ("jialichuang", ["嘉立创下单助手"]),
+    ("xiadan", ["嘉立创下单助手"]),
+    ("网易", ["网易云音乐", "网易邮箱大师"]),
+    ("wyy", ["网易云音乐", "网易邮箱大师"]),
+])
+def test_pinyin(index, query, expected):
+    assert names(index, query) == expected
+
+
+def test_same_rank_prefers_shorter_names_then_insertion_order(index):
+    # 都是分类名的前缀匹配：名称较短的优先，长度相同的按加入顺序
+    assert names(index, "办公") == ["Teams", "网易邮箱大师", "MyNotes", "Keynote"]
+
+
+def test_same_rank_prefers_boosted_apps(index):
+    keynote = make_app("Keynote", "keynote", "办公")['path']
+    mynotes = make_app("MyNotes", "mynotes", "办公")['path']
+    index.set_boosts({keynote: 5.0, mynotes: 1.0})
+    index.last_results = None
+    assert names(index, "办公") == ["Keynote", "MyNotes", "Teams", "网易邮箱大师"]
+    # 评分只影响同一排名内的次序
+    assert names(index, "note") == ["Notepad", "MyNotes", "Keynote"]
+
+
+def test_limit(index):
+    assert names(index, "note", 2) == ["Notepad", "MyNotes"]
+
+
+def test_typing_narrows_previous_results(index, monkeypatch):
+    expected = {query: names(build(), query) for query in ("no", "not", "notep")}
+    assert names(index, "n")
+    # 追加输入时只在上次结果中校验，不再查倒排索引
+    monkeypatch.setattr(index, "_match_all", lambda query: pytest.fail("没有使用上次的结果"))
+    assert names(index, "no") == expected["no"]
+    assert names(index, "not") == expected["not"] == ["Notepad", "MyNotes", "Keynote"]
+    assert names(index, "notep") == ["Notepad"]
+
+
+def test_backspace_searches_again(index):
+    assert names(index, "notep") == ["Notepad"]
+    # 删除字符后结果会变多，必须重新查询
+    assert names(index, "note") == ["Notepad", "MyNotes", "Keynote"]
+    assert names(index, "") == []
+    assert names(index, "n")[:2] == ["Notepad", "MyNotes"]
+
+
+def test_changes_reset_incremental_results(index):
+    assert names(index, "note") == ["Notepad", "MyNotes", "Keynote"]
+    index.add(make_app("Notebook", "notebook", "工具"))
+    assert names(index, "noteb") == ["Notebook"]
+    index.remove(make_app("Notebook", "notebook", "工具")['path'])
+    assert names(index, "noteb") == []
+    assert len(index) == len(APPS)
+
+
+def test_incremental_results_match_fresh_search():
+    random.seed(3)
+    chars = "嘉立创下单助手网易云音乐邮箱大师abcdeno"
+    apps = [("".join(random.choice(chars) for _ in range(random.randint(2, 6))), f"t{i}", f"分类{i % 3}")
+            for i in range(300)]
+    typed = build(apps)
+    for word in ["jlcxdzs", "wangyiyun", "wyyx", "abc", "网易云", "note"]:
+        typed.last_results = None
+        for i in range(1, len(word) + 1):
+            fresh = build(apps)
+            assert names(typed, word[:i]) == names(fresh, word[:i]), word[:i]
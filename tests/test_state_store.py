@@ -0,0 +1,94 @@
+"""
+状态存储：延迟提交、一个事务内批量写入、出错时回滚并保留未提交的修改
+"""
+import sqlite3
+
+import pytest
+
+from tools.state_store import StateStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "state.db")
+
+
+def rows(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return dict(((namespace, key), value) for namespace, key, value in
+                    conn.execute("SELECT namespace, key, value FROM state"))
+
+
+class FailingConnection:
+    """转发到真正的连接，删除语句执行时抛出异常"""
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, *args):
+        return self.conn.execute(*args)
+
+    def executemany(self, sql, params):
+        if sql.startswith("DELETE"):
+            raise sqlite3.OperationalError("disk I/O error")
+        return self.conn.executemany(sql, params)
+
+
+def test_changes_are_written_only_on_flush(db_path):
+    store = StateStore(db_path)
+    dirty = []
+    store.on_dirty = lambda: dirty.append(True)
+    store.set("config", "scale_factor", 1.5)
+    store.set("favorites", "工具\\记事本.lnk", True)
+    store.set("config", "scale_factor", 1.25)
+    assert dirty == [True]  # 只在从无修改变为有修改时通知一次
+    assert store.dirty
+    assert rows(db_path) == {}
+
+    store.flush()
+    assert not store.dirty
+    assert rows(db_path) == {("config", "scale_factor"): "1.25", ("favorites", "工具\\记事本.lnk"): "true"}
+
+    reopened = StateStore(db_path)
+    assert reopened.get("config", "scale_factor") == 1.25
+    assert list(reopened.namespace("favorites")) == ["工具\\记事本.lnk"]
+
+
+def test_unchanged_values_do_not_mark_dirty(db_path):
+    store = StateStore(db_path)
+    store.update("config", {"pos": [1, 2]})
+    store.flush()
+    store.set("config", "pos", [1, 2])
+    store.delete("config", "missing")
+    assert not store.dirty
+
+
+def test_delete(db_path):
+    store = StateStore(db_path)
+    store.update("favorites", {"a": True, "b": True})
+    store.flush()
+    store.delete("favorites", "a")
+    store.close()
+    assert list(StateStore(db_path).namespace("favorites")) == ["b"]
+
+
+def test_failed_flush_rolls_back_and_keeps_changes(db_path):
+    store = StateStore(db_path)
+    store.update("config", {"pos": [1, 2], "size": [800, 600]})
+    store.flush()
+
+    store.set("config", "pos", [10, 20])
+    store.delete("config", "size")
+    conn = store._connection()
+    store._conn = FailingConnection(conn)
+    store.flush()
+
+    # 事务中已执行的更新也被回滚
+    assert rows(db_path) == {("config", "pos"): "[1, 2]", ("config", "size"): "[800, 600]"}
+    assert store.dirty
+
+    # 期间的新修改优先，下次提交时一起写入
+    store.set("config", "pos", [30, 40])
+    store._conn = conn
+    store.flush()
+    assert not store.dirty
+    assert rows(db_path) == {("config", "pos"): "[30, 40]"}
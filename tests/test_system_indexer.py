@@ -0,0 +1,177 @@
+"""
+系统索引的爬取：目录复用、移除消失的目录、从保存的队列继续、位置变化后重新开始、.desktop 文件解析
+爬取步骤直接在测试线程中调用（不启动后台线程），结果确定
+"""
+import os
+import stat
+import sys
+import time
+
+import pytest
+
+from tools.system_indexer import SystemIndexer, desktop_item
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="用可执行位和 .desktop 文件构造可启动项")
+
+
+def make_program(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("#!/bin/sh\n")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+def make_desktop(path, name, exec_line, extra=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"[Desktop Entry]\nType=Application\nName={name}\nExec={exec_line}\n{extra}", encoding="utf-8")
+    return str(path)
+
+
+class Updates:
+    """收集 on_update 的回调"""
+    def __init__(self):
+        self.changed = {}
+        self.removed = []
+
+    def __call__(self, changed, removed):
+        self.changed.update(changed)
+        self.removed.extend(removed)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    bin_dir = tmp_path / "bin"
+    make_program(bin_dir / "zedit")
+    make_program(bin_dir / "zeta")
+    (bin_dir / "readme.txt").write_text("not executable")
+    applications = tmp_path / "applications"
+    make_desktop(applications / "zebra.desktop", "Zebra", f"{bin_dir / 'zedit'} --new-window %U")
+    make_desktop(applications / "games" / "zork.desktop", "Zork", f"{bin_dir / 'zeta'} %f")
+    return tmp_path, [(str(bin_dir), False), (str(applications), True)]
+
+
+def make_indexer(tmp_path, locations, updates=None):
+    return SystemIndexer(str(tmp_path / "system_index.bin"), locations, updates or Updates())
+
+
+def crawl(indexer, limit=None):
+    """开始一轮（队列为空时）并处理最多 limit 个目录，队列处理完时结束这一轮"""
+    if not indexer.queue and not indexer.visited:
+        indexer.queue.extend((directory, recursive, 0) for directory, recursive in indexer.locations)
+    count = 0
+    while indexer.queue and (limit is None or count < limit):
+        indexer._visit(*indexer.queue.popleft())
+        count += 1
+    if not indexer.queue:
+        indexer._finish_pass()
+
+
+def names(indexer):
+    return sorted(item['name'] for _, items, _ in indexer.directories.values() for item in items)
+
+
+def test_first_pass_collects_items(tmp_path, tree):
+    _, locations = tree
+    updates = Updates()
+    indexer = make_indexer(tmp_path, locations, updates)
+    crawl(indexer)
+    assert names(indexer) == ["Zebra", "Zork", "zedit", "zeta"]
+    assert indexer.stats()['scanned_dirs'] == 3
+    assert indexer.passes == 1
+    assert sum(len(items) for items in updates.changed.values()) == 4
+
+
+def test_unchanged_directories_are_reused(tmp_path, tree):
+    root, locations = tree
+    indexer = make_indexer(tmp_path, locations)
+    crawl(indexer)
+    crawl(indexer)
+    assert indexer.stats()['reused_dirs'] == 3
+    assert indexer.stats()['scanned_dirs'] == 3
+
+    # 只有变化的目录重新读取
+    time.sleep(0.01)
+    make_program(root / "bin" / "zulu")
+    crawl(indexer)
+    assert indexer.stats()['scanned_dirs'] == 4
+    assert "zulu" in names(indexer)
+
+
+def test_vanished_directories_are_removed(tmp_path, tree):
+    root, locations = tree
+    updates = Updates()
+    indexer = make_indexer(tmp_path, locations, updates)
+    crawl(indexer)
+    games = str(root / "applications" / "games")
+    assert games in indexer.directories
+
+    os.remove(os.path.join(games, "zork.desktop"))
+    os.rmdir(games)
+    crawl(indexer)
+    assert games not in indexer.directories
+    assert games in updates.removed
+    assert "Zork" not in names(indexer)
+
+
+def test_resume_from_saved_queue(tmp_path, tree):
+    _, locations = tree
+    indexer = make_indexer(tmp_path, locations)
+    crawl(indexer, limit=2)  # bin 和 applications，games 还在队列中
+    assert len(indexer.queue) == 1
+    indexer.save()
+
+    resumed = make_indexer(tmp_path, locations)
+    resumed.load()
+    assert [directory for directory, _, _ in resumed.queue] == [directory for directory, _, _ in indexer.queue]
+    assert resumed.visited == indexer.visited
+    crawl(resumed)
+    assert names(resumed) == ["Zebra", "Zork", "zedit", "zeta"]
+    assert resumed.stats()['scanned_dirs'] == 1  # 只处理了剩下的目录
+    assert resumed.passes == 1
+
+
+def test_changed_locations_discard_saved_progress(tmp_path, tree):
+    root, locations = tree
+    indexer = make_indexer(tmp_path, locations)
+    crawl(indexer, limit=2)
+    indexer.save()
+
+    # 去掉 applications：保存的队列和进度作废，不再在范围内的目录丢弃
+    reloaded = make_indexer(tmp_path, locations[:1])
+    reloaded.load()
+    assert not reloaded.queue
+    assert not reloaded.visited
+    assert list(reloaded.directories) == [str(root / "bin")]
+
+
+def test_background_thread_completes_a_pass(tmp_path, tree):
+    _, locations = tree
+    indexer = SystemIndexer(str(tmp_path / "system_index.bin"), locations, Updates(), dirs_per_second=1000)
+    indexer.start()
+    indexer.resume()
+    deadline = time.monotonic() + 5
+    while indexer.passes < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    indexer.stop()
+    assert indexer.passes == 1
+    assert os.path.exists(indexer.index_path)
+
+
+def test_desktop_item_strips_exec_placeholders(tmp_path):
+    program = make_program(tmp_path / "bin" / "viewer")
+    path = make_desktop(tmp_path / "viewer.desktop", "Viewer", f'{program} --open %U "a b" 100%% %f',
+                        "Name[zh_CN]=查看器\nPath=/tmp\n")
+    item = desktop_item(path)
+    assert item['target'] == program
+    assert item['arguments'] == '--open "a b" 100%'
+    assert item['name'] == "查看器"
+    assert item['working_dir'] == "/tmp"
+    assert item['icon_key'] == path
+
+
+@pytest.mark.parametrize("extra", ["NoDisplay=true\n", "Hidden=true\n", "Type=Link\n"])
+def test_desktop_item_skips_hidden_entries(tmp_path, extra):
+    program = make_program(tmp_path / "bin" / "viewer")
+    path = tmp_path / "viewer.desktop"
+    path.write_text(f"[Desktop Entry]\n{extra}Type=Application\nName=Viewer\nExec={program}\n", encoding="utf-8")
+    assert desktop_item(str(path)) is None
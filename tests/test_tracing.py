@@ -0,0 +1,101 @@
+"""
+性能追踪：关闭时不记录、Chrome trace-event JSON 的格式、汇总表、命令行参数和环境变量
+"""
+import json
+import threading
+
+import pytest
+
+from tools import tracing
+from tools.tracing import Tracer
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    tracer = Tracer()
+    monkeypatch.setattr(tracing, "tracer", tracer)
+    monkeypatch.delenv(tracing.TRACE_ENV, raising=False)
+    return tracer
+
+
+def test_disabled_tracer_records_nothing(tracer):
+    with tracer.span("parse_shortcut", path="a.lnk") as span:
+        span.set(ok=True)
+    assert tracer.span("other") is tracer.span("another")  # 同一个空对象
+    assert tracer.events == []
+    tracer.write("unused.json")
+
+
+def test_chrome_trace_is_valid_json_with_complete_events(tracer, tmp_path):
+    path = str(tmp_path / "trace" / "trace.json")
+    tracer.enable(path)
+    with tracer.span("load_catalog", category="startup"):
+        with tracer.span("parse_shortcut", path="C:\\apps\\记事本.lnk") as span:
+            span.set(ok=True)
+        with pytest.raises(ValueError):
+            with tracer.span("extract_icon", target="x.exe"):
+                raise ValueError("bad icon")
+
+    def scan():
+        with tracer.span("scan_category"):
+            pass
+
+    worker = threading.Thread(target=scan, name="loader")
+    worker.start()
+    worker.join()
+    tracer.write()
+
+    with open(path, encoding='utf-8') as f:
+        trace = json.load(f)
+    events = [event for event in trace['traceEvents'] if event['ph'] == "X"]
+    by_name = {event['name']: event for event in events}
+    assert set(by_name) == {"load_catalog", "parse_shortcut", "extract_icon", "scan_category"}
+    for event in events:
+        assert {"name", "cat", "ph", "pid", "tid", "ts", "dur", "args"} <= set(event)
+        assert event['ts'] >= 0 and event['dur'] >= 0
+
+    # 嵌套的追踪项落在外层的时间范围内
+    outer = by_name["load_catalog"]
+    for name in ("parse_shortcut", "extract_icon"):
+        inner = by_name[name]
+        assert outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+        assert inner['tid'] == outer['tid']
+    assert outer['cat'] == "startup"
+    assert by_name["parse_shortcut"]['args'] == {"path": "C:\\apps\\记事本.lnk", "ok": "True"}
+    assert "bad icon" in by_name["extract_icon"]['args']['error']
+
+    # 每个线程一条线程名元数据
+    names = {event['tid']: event['args']['name'] for event in trace['traceEvents'] if event['ph'] == "M"}
+    assert names[by_name["scan_category"]['tid']] == "loader"
+    assert by_name["scan_category"]['tid'] != outer['tid']
+
+    with open(str(tmp_path / "trace" / "trace.summary.txt"), encoding='utf-8') as f:
+        summary = f.read()
+    assert "最慢的快捷方式" in summary and "C:\\apps\\记事本.lnk" in summary
+    assert "最慢的图标" in summary
+
+
+def test_summary_totals(tracer):
+    tracer.enable()
+    for duration in (1_000_000, 3_000_000):
+        tracer.record("parse_shortcut", "launcher", 0, duration, {"path": f"{duration}.lnk"})
+    lines = tracer.summary().splitlines()
+    row = next(line for line in lines if line.startswith("parse_shortcut")).split()
+    assert row[1:] == ["2", "4.00", "2.000", "3.000"]
+    slowest = lines[lines.index("最慢的快捷方式（前10个）") + 1:]
+    assert [line.split()[-1] for line in slowest] == ["3000000.lnk", "1000000.lnk"]
+
+
+@pytest.mark.parametrize("argv, env, expected", [
+    (["app", "--trace"], None, tracing.DEFAULT_TRACE_PATH),
+    (["app", "--trace=out.json", "--resident"], None, "out.json"),
+    (["app"], "1", tracing.DEFAULT_TRACE_PATH),
+    (["app"], "env.json", "env.json"),
+    (["app"], None, None),
+])
+def test_configure(tracer, monkeypatch, argv, env, expected):
+    if env is not None:
+        monkeypatch.setenv(tracing.TRACE_ENV, env)
+    assert tracing.configure(argv) == (expected is not None)
+    assert tracer.path == expected
+    assert not any(arg.startswith("--trace") for arg in argv)
@@ -0,0 +1,104 @@
+"""
+使用记录：frecency 衰减排序、日志压缩、重命名/移动后评分转移、容忍写入中断的最后一行
+"""
+import time
+
+import pytest
+
+from tools import usage_log
+from tools.usage_log import UsageLog
+
+DAY = 86400
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "usage.log")
+
+
+def test_recent_use_outweighs_old_frequent_use(log_path):
+    log = UsageLog(log_path)
+    now = time.time()
+    for i in range(4):
+        log.record("old", now - 60 * DAY + i)  # 四次，约四个半衰期之前
+    log.record("recent", now - DAY)
+    for i in range(3):
+        log.record("frequent", now - 2 * DAY + i)
+    assert log.top(3, now) == ["frequent", "recent", "old"]
+    assert log.score("old", now) == pytest.approx(4 * 0.5 ** (60 / 14), rel=1e-3)
+    assert log.score("recent", now) == pytest.approx(0.5 ** (1 / 14), rel=1e-3)
+    assert log.score("never", now) == 0.0
+
+
+def test_scores_survive_reload(log_path):
+    log = UsageLog(log_path)
+    now = time.time()
+    log.record("a", now - DAY)
+    log.record("a", now)
+    log.record("b", now - 3 * DAY)
+    reloaded = UsageLog(log_path)
+    for key in ("a", "b"):
+        assert reloaded.score(key, now) == pytest.approx(log.score(key, now))
+
+
+def test_compaction_keeps_scores_and_bounds_file(log_path, monkeypatch):
+    monkeypatch.setattr(usage_log, "COMPACT_LINES", 20)
+    log = UsageLog(log_path)
+    now = time.time()
+    for i in range(19):
+        log.record("a" if i % 2 else "b", now - i * 60)
+    log.record("faded", now - 400 * DAY)  # 衰减后低于 MIN_SCORE
+    assert log.line_count == 20
+    before = {key: log.score(key, now) for key in ("a", "b")}
+    log.record("a", now)  # 第21行，超过上限触发压缩
+
+    with open(log_path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert sorted(line.split("\t")[3] for line in lines) == ["a", "b"]
+    assert all(line.startswith("S\t") for line in lines)
+    assert log.line_count == 2
+    assert "faded" not in log.scores
+
+    reloaded = UsageLog(log_path)
+    assert reloaded.score("a", now) == pytest.approx(before["a"] + 1, rel=1e-4)
+    assert reloaded.score("b", now) == pytest.approx(before["b"], rel=1e-4)
+
+
+def test_rename_carries_score_over(log_path):
+    log = UsageLog(log_path)
+    now = time.time()
+    log.record("工具\\旧名.lnk", now - DAY)
+    log.record("工具\\旧名.lnk", now)
+    log.record("办公\\新名.lnk", now - 2 * DAY)
+    expected = log.score("工具\\旧名.lnk", now) + log.score("办公\\新名.lnk", now)
+
+    log.rename("工具\\旧名.lnk", "办公\\新名.lnk")
+    assert log.score("工具\\旧名.lnk", now) == 0.0
+    assert log.score("办公\\新名.lnk", now) == pytest.approx(expected)
+
+    # 重命名记录在日志中，重新加载后评分仍在新键下
+    reloaded = UsageLog(log_path)
+    assert reloaded.score("工具\\旧名.lnk", now) == 0.0
+    assert reloaded.score("办公\\新名.lnk", now) == pytest.approx(expected)
+
+
+def test_rename_of_unknown_key_writes_nothing(log_path):
+    log = UsageLog(log_path)
+    log.rename("missing", "other")
+    assert log.line_count == 0
+    assert "other" not in log.scores
+
+
+@pytest.mark.parametrize("tail", ["L\t17", "L\t1700000000\tC:\\apps\\Half", "S\t1700000000\t3.5"])
+def test_truncated_last_record_is_ignored(log_path, tail):
+    now = time.time()
+    with open(log_path, 'w', encoding='utf-8') as f:
+        f.write(f"L\t{now:.0f}\tkept\n" + tail)
+    log = UsageLog(log_path)
+    assert set(log.scores) == {"kept"}
+
+    # 新记录不能接在半行后面
+    log.record("next", now)
+    reloaded = UsageLog(log_path)
+    assert set(reloaded.scores) == {"kept", "next"}
+    assert reloaded.score("next", now) == pytest.approx(1.0)
@@ -0,0 +1,227 @@
+"""
+虚拟化的应用网格（模型/视图方式）
+所有应用和分类标题都是同一个列表模型中的行，由委托直接绘制，只有可见区域内的项目才会被绘制，
+不为每个应用创建控件，适合上万个快捷方式的超大目录
+"""
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle
+from PyQt6.QtGui import QColor, QFont, QPen
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QRectF, QSize, pyqtSignal
+
+# 自定义数据角色
+AppRole = Qt.ItemDataRole.UserRole + 1  # 应用信息字典
+IsHeaderRole = Qt.ItemDataRole.UserRole + 2  # 是否为分类标题
+CategoryRole = Qt.ItemDataRole.UserRole + 3  # 标题行的分类名
+
+
+class AppListModel(QAbstractListModel):
+    """把 {分类名: [应用列表]} 展开成 标题, 应用, 应用, 标题, ... 的列表"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []  # [(是否为标题, 分类名或应用信息)]
+        self.path_rows = {}  # {快捷方式路径: [行号]}，同一应用可能出现在多个区块中
+        self.titles = {}  # {分类名: 标题文字}
+
+    def set_categories(self, categories, titles=None, collapsed=()):
+        """
+        重建行列表，分类按传入的顺序排列；titles 为标题显示的文字（默认为分类名），
+        collapsed 中的分类没有应用时也显示标题（折叠的分类）
+        """
+        self.beginResetModel()
+        self.rows = []
+        self.path_rows = {}
+        self.titles = titles or {}
+        for category, apps in categories.items():
+            if not apps and category not in collapsed:
+                continue
+            self.rows.append((True, category))
+            for app in apps:
+                self.path_rows.setdefault(app['path'], []).append(len(self.rows))
+                self.rows.append((False, app))
+        self.endResetModel()
+
+    def app_changed(self, app_path):
+        """某个应用的图标或名称变化，只通知对应的行重绘"""
+        for row in self.path_rows.get(app_path, ()):
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        is_header, value = self.rows[index.row()]
+        if role == IsHeaderRole:
+            return is_header
+        if is_header:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self.titles.get(value, value)
+            if role == CategoryRole:
+                return value
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return value['name']
+        if role == Qt.ItemDataRole.DecorationRole:
+            return value.get('icon')
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return value['target']
+        if role == AppRole:
+            return value
+        return None
+
+    def flags(self, index):
+        if index.isValid() and not self.rows[index.row()][0]:
+            return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        return Qt.ItemFlag.NoItemFlags
+
+
+class AppItemDelegate(QStyledItemDelegate):
+    """绘制应用图标、名称、悬停效果和分类标题，尺寸随缩放因子变化"""
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.scale_factor = 1.0
+        self.icon_provider = None  # 可选的 (应用信息, 边长) -> QPixmap，按缩放尺寸取得清晰的图标
+
+    def header_height(self):
+        return int(50 * self.scale_factor)
+
+    def tile_size(self):
+        return QSize(int(150 * self.scale_factor), int(150 * self.scale_factor))
+
+    def sizeHint(self, option, index):
+        if index.data(IsHeaderRole):
+            # 标题占满整行，迫使后面的应用从新的一行开始
+            width = self.view.viewport().width() - 2 * self.view.spacing() - 1
+            return QSize(max(1, width), self.header_height())
+        return self.tile_size()
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        rect = option.rect
+        scale = self.scale_factor
+
+        if index.data(IsHeaderRole):
+            # 分类标题和分隔线
+            painter.setFont(QFont("SimHei", int(14 * scale), QFont.Weight.Bold))
+            painter.setPen(QColor("#333333"))
+            text_rect = QRect(rect.left(), rect.top(), rect.width(), rect.height() - int(8 * scale))
+            painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom,
+                             index.data(Qt.ItemDataRole.DisplayRole))
+            painter.setPen(QPen(QColor("#E5E7EB"), 1))
+            painter.drawLine(rect.left(), rect.bottom(), rect.right(), rect.bottom())
+            painter.restore()
+            return
+
+        # 按钮背景，选中时为浅蓝色，悬停时加深并显示边框
+        margin = int(5 * scale)
+        radius = int(8 * scale)
+        tile_rect = QRectF(rect.adjusted(margin, margin, -margin, -margin))
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(QPen(QColor("#93C5FD"), 1))
+            painter.setBrush(QColor(219, 234, 254, 230))
+        elif option.state & QStyle.StateFlag.State_MouseOver:
+            painter.setPen(QPen(QColor("#E5E7EB"), 1))
+            painter.setBrush(QColor(240, 240, 240, 230))
+        else:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(255, 255, 255, 178))
+        painter.drawRoundedRect(tile_rect, radius, radius)
+
+        # 图标在上
+        icon_size = int(64 * scale)
+        padding = int(8 * scale)
+        icon_rect = QRect(rect.center().x() - icon_size // 2, rect.top() + margin + padding,
+                          icon_size, icon_size)
+        pixmap = self.icon_provider(index.data(AppRole), icon_size) if self.icon_provider else None
+        if pixmap is not None:
+            painter.drawPixmap(icon_rect, pixmap)
+        else:
+            icon = index.data(Qt.ItemDataRole.DecorationRole)
+            if icon is not None:
+                icon.paint(painter, icon_rect)
+
+        # 名称在下，最多两行，超出部分省略
+        font = QFont(option.font)
+        font.setPixelSize(max(1, int(12 * scale)))
+        painter.setFont(font)
+        painter.setPen(QColor("#000000"))
+        text_top = icon_rect.bottom() + padding
+        text_rect = QRect(rect.left() + margin + padding, text_top,
+                          rect.width() - 2 * (margin + padding), rect.bottom() - margin - text_top)
+        name = index.data(Qt.ItemDataRole.DisplayRole)
+        metrics = painter.fontMetrics()
+        if metrics.horizontalAdvance(name) > text_rect.width() * 2:
+            name = metrics.elidedText(name, Qt.TextElideMode.ElideRight, text_rect.width() * 2)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop
+                         | Qt.TextFlag.TextWrapAnywhere, name)
+        painter.restore()
+
+
+class AppGridView(QListView):
+    """图标模式的列表视图：静态、自动换行、随窗口宽度重新排列，分批布局"""
+    header_clicked = pyqtSignal(str)  # 点击分类标题（折叠/展开）
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.app_model = AppListModel(self)
+        self.delegate = AppItemDelegate(self)
+        self.setModel(self.app_model)
+        self.setItemDelegate(self.delegate)
+
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setMovement(QListView.Movement.Static)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setWrapping(True)
+        self.setUniformItemSizes(False)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(500)
+        self.setSelectionMode(QListView.SelectionMode.ExtendedSelection)  # Ctrl/Shift多选后批量操作
+        self.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WidgetAttribute.WA_Hover)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.setStyleSheet("""
+            QListView {
+                border: none;
+                background-color: rgba(249, 250, 251, 0.9);
+            }
+        """)
+        self.set_scale(1.0)
+
+    def set_scale(self, scale_factor):
+        """缩放只改变委托尺寸，setSpacing 会触发一次重新布局"""
+        self.delegate.scale_factor = scale_factor
+        self.setSpacing(int(5 * scale_factor))
+        self.scheduleDelayedItemsLayout()
+
+    def selected_apps(self):
+        """选中的应用，同一应用在多个区块中被选中时只返回一次"""
+        apps = {}
+        for index in sorted(self.selectedIndexes(), key=lambda index: index.row()):
+            app = index.data(AppRole)
+            if app is not None:
+                apps.setdefault(app['path'], app)
+        return list(apps.values())
+
+    def mouseReleaseEvent(self, event):
+        # 标题行不可选中，QListView 不会为它发出 clicked
+        index = self.indexAt(event.position().toPoint())
+        if event.button() == Qt.MouseButton.LeftButton and index.isValid() and index.data(IsHeaderRole):
+            self.header_clicked.emit(index.data(CategoryRole))
+        super().mouseReleaseEvent(event)
+
+    def app_at(self, pos):
+        """返回视口坐标处的应用信息，标题或空白处返回None"""
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return None
+        return index.data(AppRole)
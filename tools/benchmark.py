@@ -0,0 +1,462 @@
+"""
+无界面性能基准
+生成 N个分类 × M个快捷方式 的合成 apps/ 目录（真实的.lnk二进制文件，指向生成的假.exe），
+在 QT_QPA_PLATFORM=offscreen 下运行 AppLauncher，用假的 extract_icon 和COM替代Windows接口，可在Linux上运行；
+测量冷启动到首帧、完整 load_applications、改变窗口大小的重新排列、缩放、逐键搜索延迟和峰值内存，结果输出为JSON便于跨提交比较；
+--icon-pipeline 只运行图标管线的微基准：从PE文件中的图标帧到QPixmap，比较旧的PIL管线和零拷贝管线每个图标的耗时和像素复制次数
+
+用法: python tools/benchmark.py --categories 20 --shortcuts 100 [--virtual] [--icon-delay 2] [--output result.json]
+      python tools/benchmark.py --icon-pipeline 200
+"""
+import argparse
+import importlib.util
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from collections import Counter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAUNCHER_PATH = os.path.join(REPO_ROOT, "软件启动器.py")
+PE_FIXTURES_PATH = os.path.join(REPO_ROOT, "tests", "pe_fixtures.py")
+
+# 生成应用名称用的词
+NAME_WORDS = ["微信", "飞书", "钉钉", "网易云音乐", "腾讯会议", "嘉立创", "下单助手", "浏览器", "播放器", "编辑器",
+              "Chrome", "Office", "Studio", "Code", "Player", "Design", "Suite", "Tools", "Pro", "Manager"]
+SEARCH_QUERIES = ["wx", "jlc", "studio", "网易", "chrome", "xdzs", "manager", "zz"]
+
+LINK_CLSID = bytes.fromhex("0114020000000000c000000000000046")
+HAS_LINK_INFO = 0x02
+HAS_WORKING_DIR = 0x10
+IS_UNICODE = 0x80
+
+
+def build_lnk(target, working_dir=""):
+    """生成只含LinkInfo（本地路径，带Unicode路径）和工作目录的最小快捷方式"""
+    flags = HAS_LINK_INFO | IS_UNICODE | (HAS_WORKING_DIR if working_dir else 0)
+    header = struct.pack("<I16sII", 0x4C, LINK_CLSID, flags, 0) + bytes(0x4C - 28)
+
+    volume_id = struct.pack("<IIII", 0x11, 3, 0, 0x10) + b"\x00"
+    ansi_path = target.encode("ascii", errors="replace") + b"\x00"
+    unicode_path = target.encode("utf-16-le") + b"\x00\x00"
+    header_size = 0x24
+    volume_offset = header_size
+    local_offset = volume_offset + len(volume_id)
+    suffix_offset = local_offset + len(ansi_path)
+    unicode_offset = suffix_offset + 1
+    size = unicode_offset + len(unicode_path) + 2
+    link_info = struct.pack("<9I", size, header_size, 1, volume_offset, local_offset, 0, suffix_offset,
+                            unicode_offset, size - 2)
+    link_info += volume_id + ansi_path + b"\x00" + unicode_path + b"\x00\x00"
+
+    string_data = b""
+    if working_dir:
+        string_data = struct.pack("<H", len(working_dir)) + working_dir.encode("utf-16-le")
+    return header + link_info + string_data + b"\x00\x00\x00\x00"
+
+
+def generate_catalog(root, categories, shortcuts, seed=1):
+    """在 root 下生成 apps/ 和假的目标程序，返回快捷方式总数"""
+    rng = random.Random(seed)
+    targets_dir = os.path.join(root, "targets")
+    os.makedirs(targets_dir, exist_ok=True)
+    count = 0
+    for c in range(categories):
+        category_dir = os.path.join(root, "apps", f"分类{c:03d}")
+        os.makedirs(category_dir, exist_ok=True)
+        for m in range(shortcuts):
+            name = "".join(rng.sample(NAME_WORDS, rng.randint(1, 3))) + f" {c}-{m}"
+            target = os.path.join(targets_dir, f"app{c}_{m}.exe")
+            with open(target, "wb") as f:
+                f.write(b"MZ")
+            with open(os.path.join(category_dir, name + ".lnk"), "wb") as f:
+                f.write(build_lnk(target, targets_dir))
+            count += 1
+    return count
+
+
+def install_fake_windows_modules(icon_delay):
+    """用假模块替代pywin32，extract_icon 返回纯色像素，可模拟提取耗时"""
+    for name in ("pythoncom", "win32api", "win32con", "win32gui", "win32ui", "win32com", "win32com.client"):
+        sys.modules.setdefault(name, types.ModuleType(name))
+    sys.modules["pythoncom"].CoInitialize = lambda: None
+    sys.modules["pythoncom"].CoUninitialize = lambda: None
+    sys.modules["win32com"].client = sys.modules["win32com.client"]
+    sys.modules["win32com.client"].Dispatch = lambda name: None
+
+    from tools.icon_buffer import IconBuffer
+
+    def fake_extract_icon(exe_path, icon_size=64):
+        if icon_delay:
+            time.sleep(icon_delay / 1000)
+        shade = hash(exe_path) & 0xFF
+        return IconBuffer(icon_size, icon_size, bytes((255 - shade, 128, shade, 255)) * (icon_size * icon_size))
+
+    return fake_extract_icon
+
+
+def load_launcher_module(fake_extract_icon):
+    spec = importlib.util.spec_from_file_location("launcher", LAUNCHER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.extract_icon = fake_extract_icon
+    return module
+
+
+def load_pe_fixtures():
+    """测试用的合成PE文件和图标生成函数（tests/pe_fixtures.py），与测试共用一份"""
+    spec = importlib.util.spec_from_file_location("pe_fixtures", PE_FIXTURES_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def buffer_address(obj):
+    """QImage或任意缓冲区对象的像素地址，前后两步地址不同说明复制了像素"""
+    from PyQt6 import sip
+    from PyQt6.QtGui import QImage
+
+    if isinstance(obj, QImage):
+        return int(obj.constBits())
+    return int(sip.voidptr(obj))
+
+
+def legacy_icon_pipeline(exe_path, cache, size, tally):
+    """
+    旧管线：PIL解码 → convert("RGBA") → LANCZOS缩放各级 → tobytes 写入缓存 → 读出映射的字节切片
+    → 包装为 Format_RGBA8888 → QPixmap（转换为预乘格式）
+    """
+    from PIL import Image
+    from PyQt6.QtGui import QImage, QPixmap
+
+    from tools.icon_pyramid import ICON_LEVELS
+    from tools.pe_icons import read_icon_frame
+
+    _, _, frame = read_icon_frame(exe_path, ICON_LEVELS[-1])
+    image = Image.open(io.BytesIO(frame))
+    image.load()
+    image = image.convert("RGBA")  # PIL的 convert 即使模式相同也返回新图像
+    tally['convert_rgba'] += 1
+    for level in ICON_LEVELS:
+        scaled = image if image.size == (level, level) else image.resize((level, level), Image.Resampling.LANCZOS)
+        tally['pyramid'] += scaled is not image
+        data = scaled.tobytes("raw", "RGBA")
+        tally['pyramid'] += 1
+        cache.put(exe_path, level, level, level, data)
+    width, height, view = cache.get(exe_path, size)
+    with view:
+        data = bytes(view)  # 旧的图标缓存返回映射的切片，即一份新的bytes
+    tally['cache_read'] += 1
+    image = QImage(data, width, height, QImage.Format.Format_RGBA8888)
+    tally['wrap'] += buffer_address(image) != buffer_address(data)
+    pixmap = QPixmap.fromImage(image)
+    tally['to_pixmap'] += 1
+    return pixmap
+
+
+def zero_copy_icon_pipeline(exe_path, cache, size, tally):
+    """
+    新管线：Qt解码 → 原地转换为预乘BGRA → 缩放各级 → 内存视图写入缓存 → 映射的内存视图
+    → 直接包装为 Format_ARGB32_Premultiplied → QPixmap（不需要格式转换）
+    """
+    from PyQt6.QtGui import QImage, QPixmap
+
+    from tools.icon_buffer import PIXEL_FORMAT, IconBuffer
+    from tools.icon_pyramid import ICON_LEVELS, build_pyramid
+    from tools.pe_icons import read_icon_frame
+
+    _, _, frame = read_icon_frame(exe_path, ICON_LEVELS[-1])
+    image = QImage.fromData(frame, "PNG")
+    decoded = buffer_address(image)
+    buffer = IconBuffer.from_qimage(image)
+    tally['premultiply'] += buffer_address(buffer.image()) != decoded
+    for level, scaled in build_pyramid(buffer).items():
+        tally['pyramid'] += scaled is not buffer
+        cache.put(exe_path, level, scaled.width, scaled.height, scaled.data)
+    width, height, view = cache.get(exe_path, size)
+    with view:
+        tally['cache_read'] += 0  # 内存视图的切片不复制像素
+        image = QImage(view, width, height, width * 4, PIXEL_FORMAT)
+        tally['wrap'] += buffer_address(image) != buffer_address(view)
+        pixmap = QPixmap.fromImage(image)
+        tally['to_pixmap'] += 1
+        del image
+    return pixmap
+
+
+def icon_pipeline_benchmark(work_dir, count, size=64):
+    """
+    同一个PE文件（256×256 PNG帧）分别走旧管线和零拷贝管线，得到 size 像素的QPixmap；
+    像素复制次数不含解码本身和写入缓存文件，Qt中的步骤通过比较像素地址测得
+    """
+    from tools.icon_cache import IconCache
+
+    fixtures = load_pe_fixtures()
+    exe_path = os.path.join(work_dir, "icon.exe")
+    with open(exe_path, "wb") as f:
+        f.write(fixtures.build_pe_icon([(fixtures.sample_icon_png(256), 256)]))
+
+    pipelines = {'zero_copy': zero_copy_icon_pipeline}
+    try:
+        import PIL  # noqa: F401
+        pipelines['legacy'] = legacy_icon_pipeline
+    except ImportError:
+        pass  # PIL已是可选依赖，没有安装时只测新管线
+
+    results = {'icons': count, 'frame': "256x256 PNG", 'display_size': size}
+    for name, pipeline in pipelines.items():
+        cache_dir = os.path.join(work_dir, name)
+        os.makedirs(cache_dir, exist_ok=True)
+        cache = IconCache(cache_dir, max_bytes=64 * 1024 * 1024)
+        tally = Counter()
+        pipeline(exe_path, cache, size, Counter())  # 预热
+        samples = []
+        for _ in range(count):
+            start = time.perf_counter()
+            pipeline(exe_path, cache, size, tally)
+            samples.append((time.perf_counter() - start) * 1000)
+        cache.close()
+        results[name] = {
+            'per_icon_ms': summarize(samples),
+            'copies_per_icon': sum(tally.values()) / count,
+            'copies_by_stage': {stage: copies / count for stage, copies in tally.items()},
+        }
+    return results
+
+
+def summarize(samples):
+    """毫秒统计"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'min': round(ordered[0], 3),
+        'median': round(statistics.median(ordered), 3),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        'max': round(ordered[-1], 3),
+        'mean': round(statistics.fmean(ordered), 3),
+    }
+
+
+def peak_rss_kb():
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss // 1024 if sys.platform == "darwin" else rss
+    except ImportError:
+        return None
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+class Runner:
+    def __init__(self, app, module, category_count, virtual):
+        self.app = app
+        self.module = module
+        self.category_count = category_count
+        self.virtual = virtual
+
+    def wait_until(self, predicate, timeout=300):
+        deadline = time.perf_counter() + timeout
+        while not predicate():
+            self.app.processEvents()
+            if time.perf_counter() > deadline:
+                raise TimeoutError("等待超时")
+            time.sleep(0.0005)
+
+    def catalog_ready(self, launcher):
+        return len(launcher.app_categories) == self.category_count and not launcher.display_pending
+
+    def idle(self, launcher):
+        return self.catalog_ready(launcher) and launcher.thread_pool.activeThreadCount() == 0
+
+    def start(self):
+        """创建窗口并测量首帧、目录就绪和图标全部就绪的时间"""
+        from PyQt6.QtCore import QEvent, QObject
+
+        first_paint = []
+        start = time.perf_counter()
+
+        class PaintWatcher(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Type.Paint and not first_paint:
+                    first_paint.append(time.perf_counter())
+                return False
+
+        watcher = PaintWatcher()
+        self.app.installEventFilter(watcher)
+        launcher = self.module.AppLauncher()
+        if launcher.virtual_view != self.virtual:
+            launcher.toggle_view_mode()
+        launcher.resize(1200, 800)
+        launcher.show()
+        constructed = time.perf_counter()
+        self.wait_until(lambda: first_paint)
+        self.wait_until(lambda: self.catalog_ready(launcher))
+        ready = time.perf_counter()
+        self.wait_until(lambda: self.idle(launcher))
+        self.app.processEvents()
+        idle = time.perf_counter()
+        self.app.removeEventFilter(watcher)
+        return launcher, {
+            'construct_ms': round((constructed - start) * 1000, 3),
+            'first_paint_ms': round((first_paint[0] - start) * 1000, 3),
+            'catalog_ready_ms': round((ready - start) * 1000, 3),
+            'icons_ready_ms': round((idle - start) * 1000, 3),
+        }
+
+    def full_reload(self, launcher, rounds):
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            launcher.load_applications()
+            # 旧结果保留到新结果到达，等待所有分类的新扫描都已返回
+            self.wait_until(lambda: launcher.thread_pool.activeThreadCount() == 0
+                            and not launcher.display_pending)
+            self.app.processEvents()
+            samples.append((time.perf_counter() - start) * 1000)
+        return summarize(samples)
+
+    def resize_steps(self, launcher):
+        samples = []
+        for width in (900, 1100, 1300, 1500, 1700, 1500, 1300, 1100, 900, 700):
+            start = time.perf_counter()
+            launcher.resize(width, 800)
+            if not launcher.virtual_view:
+                launcher.reflow_apps()
+            self.app.processEvents()
+            samples.append((time.perf_counter() - start) * 1000)
+        return summarize(samples)
+
+    def zoom_steps(self, launcher):
+        samples = []
+        for scale in (1.1, 1.2, 1.3, 1.4, 1.5, 1.4, 1.3, 1.2, 1.1, 1.0, 0.9, 0.8, 0.7, 0.8, 0.9, 1.0):
+            start = time.perf_counter()
+            launcher.scale_factor = scale
+            launcher.update_scale()
+            self.app.processEvents()
+            samples.append((time.perf_counter() - start) * 1000)
+        return summarize(samples)
+
+    def keystrokes(self, launcher):
+        samples = []
+        per_query = {}
+        for query in SEARCH_QUERIES:
+            timings = []
+            for i in range(1, len(query) + 1):
+                start = time.perf_counter()
+                launcher.filter_apps(query[:i])
+                self.app.processEvents()
+                timings.append((time.perf_counter() - start) * 1000)
+            per_query[query] = [round(t, 3) for t in timings]
+            samples.extend(timings)
+            launcher.filter_apps("")
+            self.app.processEvents()
+        return summarize(samples), per_query
+
+
+def main():
+    parser = argparse.ArgumentParser(description="应用启动器无界面性能基准")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--shortcuts", type=int, default=50, help="每个分类的快捷方式数量")
+    parser.add_argument("--virtual", action="store_true", help="使用虚拟化网格显示")
+    parser.add_argument("--icon-delay", type=float, default=0.0, help="模拟每次图标提取的耗时(ms)")
+    parser.add_argument("--reloads", type=int, default=3, help="完整重新加载的次数")
+    parser.add_argument("--keep", action="store_true", help="保留生成的临时目录")
+    parser.add_argument("--output", help="JSON结果文件，默认输出到标准输出")
+    parser.add_argument("--icon-pipeline", type=int, metavar="N",
+                        help="只运行图标管线的微基准，每条管线处理N个图标")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, REPO_ROOT)
+    work_dir = tempfile.mkdtemp(prefix="launcher_bench_")
+    old_cwd = os.getcwd()
+    try:
+        if args.icon_pipeline:
+            from PyQt6.QtWidgets import QApplication
+            app = QApplication.instance() or QApplication([sys.argv[0]])
+            results = {
+                'revision': git_revision(),
+                'python': sys.version.split()[0],
+                'platform': sys.platform,
+                'icon_pipeline': icon_pipeline_benchmark(work_dir, args.icon_pipeline),
+            }
+            return write_results(results, args.output)
+
+        start = time.perf_counter()
+        total = generate_catalog(work_dir, args.categories, args.shortcuts)
+        generate_ms = (time.perf_counter() - start) * 1000
+        os.chdir(work_dir)
+
+        fake_extract_icon = install_fake_windows_modules(args.icon_delay)
+        from PyQt6.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([sys.argv[0]])
+        module = load_launcher_module(fake_extract_icon)
+        if args.virtual:
+            # 配置中保存的显示模式决定启动时使用的界面
+            os.makedirs("profile", exist_ok=True)
+            with open(os.path.join("profile", "config.json"), "w", encoding="utf-8") as f:
+                json.dump({"virtual_view": True}, f)
+        runner = Runner(app, module, args.categories, args.virtual)
+
+        launcher, cold = runner.start()
+        results = {
+            'revision': git_revision(),
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'params': {
+                'categories': args.categories, 'shortcuts_per_category': args.shortcuts,
+                'total_shortcuts': total, 'virtual_view': args.virtual, 'icon_delay_ms': args.icon_delay,
+            },
+            'generate_catalog_ms': round(generate_ms, 3),
+            'cold_start': cold,
+            'load_applications_ms': runner.full_reload(launcher, args.reloads),
+            'resize_relayout_ms': runner.resize_steps(launcher),
+            'zoom_step_ms': runner.zoom_steps(launcher),
+        }
+        results['keystroke_ms'], results['keystroke_by_query_ms'] = runner.keystrokes(launcher)
+        results['icon_memory'] = launcher.scaled_icons.stats()
+        launcher.close()
+        app.processEvents()
+
+        # 第二次启动时图标缓存已经写好
+        launcher, warm = runner.start()
+        results['warm_start'] = warm
+        launcher.close()
+        app.processEvents()
+
+        results['peak_rss_kb'] = peak_rss_kb()
+    finally:
+        os.chdir(old_cwd)
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    write_results(results, args.output)
+
+
+def write_results(results, output):
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+应用目录的扫描和查找
+界面（后台线程中）和命令行模式共用：解析分类目录下的快捷方式、按名称查找应用、输出应用信息；
+不导入Qt，只在确实需要时才导入pywin32（纯Python无法解析的快捷方式交给COM）
+"""
+import os
+import sys
+
+from tools.lnk_parser import parse_lnk
+from tools.search_index import search_entry
+from tools.tracing import tracer
+
+OUTPUT_FIELDS = ('name', 'category', 'path', 'target', 'arguments', 'working_dir')
+
+
+def parse_shortcuts_com(lnk_paths):
+    """通过COM(WScript.Shell)解析快捷方式，整批只初始化一次COM；非Windows系统上返回空结果"""
+    results = {}
+    if sys.platform != "win32" or not lnk_paths:
+        return results
+    try:
+        # 只有纯Python无法解析的快捷方式才需要COM，用到时才导入pywin32
+        import pythoncom
+        import win32com.client
+    except ImportError as e:
+        print(f"初始化COM失败: {e}", file=sys.stderr)
+        return results
+    try:
+        pythoncom.CoInitialize()
+        shell = win32com.client.Dispatch("WScript.Shell")
+        for lnk_path in lnk_paths:
+            try:
+                with tracer.span("parse_shortcut_com", path=lnk_path):
+                    shortcut = shell.CreateShortCut(lnk_path)
+                    results[lnk_path] = {
+                        'target': shortcut.Targetpath,
+                        'arguments': shortcut.Arguments,
+                        'working_dir': shortcut.WorkingDirectory
+                    }
+            except Exception as e:
+                print(f"解析快捷方式失败: {e}", file=sys.stderr)
+                results[lnk_path] = None
+    except Exception as e:
+        print(f"初始化COM失败: {e}", file=sys.stderr)
+    finally:
+        pythoncom.CoUninitialize()
+    return results
+
+
+def parse_shortcuts(lnk_paths):
+    """批量解析快捷方式，返回 {路径: 解析结果}，只对无法解码的文件走COM"""
+    results = {}
+    for lnk_path in lnk_paths:
+        with tracer.span("parse_shortcut", path=lnk_path) as span:
+            results[lnk_path] = parse_lnk(lnk_path)
+            span.set(ok=bool(results[lnk_path]))
+    failed = [path for path, info in results.items() if not info]
+    if failed:
+        results.update(parse_shortcuts_com(failed))
+    return results
+
+
+def scan_category(category, category_path, previous_apps=None, search_entries=True):
+    """
+    解析一个分类目录下的快捷方式（界面在后台线程中调用，不创建任何Qt对象），目录无法读取时抛出OSError
+    previous_apps 中修改时间和大小都没变的快捷方式直接沿用原来的应用信息
+    search_entries 为False时不生成搜索条目（需要导入pypinyin），由 SearchIndex.add 在用到时生成
+    """
+    previous = {app['path']: app for app in previous_apps or []}
+    apps_in_category = []
+
+    # 只处理.lnk快捷方式文件，记录修改时间和大小用于下次比较
+    stats = {}
+    for file in os.listdir(category_path):
+        if file.lower().endswith('.lnk'):
+            file_path = os.path.join(category_path, file)
+            try:
+                st = os.stat(file_path)
+                stats[file_path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                continue
+
+    # 没变化的直接沿用，其余的整批解析
+    changed = [path for path, stat in stats.items()
+               if path not in previous or previous[path].get('stat') != stat]
+    lnk_infos = parse_shortcuts(changed)
+
+    # 遍历分类目录下的所有快捷方式
+    for file_path, stat in stats.items():
+        if file_path not in lnk_infos:
+            apps_in_category.append(previous[file_path])
+            continue
+        lnk_info = lnk_infos[file_path]
+        if lnk_info:
+            app = {
+                'name': os.path.splitext(os.path.basename(file_path))[0],  # 从文件名获取应用名
+                'path': file_path,  # 快捷方式路径
+                'target': lnk_info['target'],  # 实际应用路径
+                'arguments': lnk_info.get('arguments', ''),  # 启动参数
+                'working_dir': lnk_info.get('working_dir', ''),  # 工作目录
+                'category': category,
+                'stat': stat,  # (修改时间, 大小)
+            }
+            if search_entries:
+                # 拼音转换较慢，在后台线程中预先生成搜索条目
+                app['search_entry'] = search_entry(app)
+            apps_in_category.append(app)
+    return apps_in_category
+
+
+def find_app(apps, name, indexes):
+    """
+    名称完全相同（不区分大小写）的应用优先，否则依次取各个搜索索引的第一个结果
+    indexes 可以是生成器，有同名应用时不会取出索引（建立索引可能需要生成拼音）
+    """
+    wanted = name.casefold()
+    for app in apps:
+        if app['name'].casefold() == wanted:
+            return app
+    for index in indexes:
+        results = index.search(name, 1)
+        if results:
+            return results[0]
+    return None
+
+
+def app_summary(app):
+    """输出和进程间传递的应用信息"""
+    return {key: app.get(key, '') for key in OUTPUT_FIELDS}
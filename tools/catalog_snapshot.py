@@ -0,0 +1,65 @@
+"""
+应用目录快照
+把解析好的应用信息（名称、快捷方式路径、目标、参数、工作目录、分类、快捷方式的修改时间和大小、搜索条目）
+按分类目录（根目录/分类名）保存到 profile/ 下带版本号的二进制文件中；每个分类同时记录目录的修改时间和条目数，
+下次启动时目录没有变化的分类直接使用快照，不再解析快捷方式；根目录响应慢或无法访问时也先显示快照中的内容
+"""
+import os
+import pickle
+
+SNAPSHOT_VERSION = 2  # 2: 以分类目录而不是分类名为键，支持多个根目录
+# 写入快照的字段，图标等Qt对象不保存
+SNAPSHOT_FIELDS = ('name', 'path', 'target', 'arguments', 'working_dir', 'category', 'stat', 'search_entry')
+DEFAULT_ROOTS = ("apps",)  # 没有配置 roots 时使用启动器目录下的 apps/
+ROOT_TIMEOUT_MS = 3000  # 根目录在这个时间内没有列出时标记为响应慢
+
+
+def catalog_roots(config):
+    """配置中的应用根目录（config["roots"]），规范化并去重，保持配置中的顺序"""
+    roots = []
+    for root in config.get("roots") or DEFAULT_ROOTS:
+        root = os.path.normpath(os.path.expanduser(str(root)))
+        if root not in roots:
+            roots.append(root)
+    return roots
+
+
+def directory_stamp(directory):
+    """目录的 (修改时间, 条目数)，用于判断分类是否有变化；目录不存在时返回None"""
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+        with os.scandir(directory) as entries:
+            count = sum(1 for _ in entries)
+        return mtime, count
+    except OSError:
+        return None
+
+
+def load_snapshot(snapshot_path):
+    """读取快照，返回 {分类目录: (目录标记, [应用信息])}，文件不存在或版本不符时返回空字典"""
+    try:
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+            if snapshot.get("version") == SNAPSHOT_VERSION:
+                return snapshot["categories"]
+    except Exception as e:
+        print(f"加载目录快照失败: {e}")
+    return {}
+
+
+def save_snapshot(snapshot_path, dir_apps, stamps):
+    """原子地写入快照，dir_apps 为 {分类目录: [应用信息]}，只保存目录标记已知的分类"""
+    categories = {}
+    for directory, stamp in stamps.items():
+        apps = dir_apps.get(directory, [])
+        categories[directory] = (stamp, [{key: app[key] for key in SNAPSHOT_FIELDS if key in app}
+                                         for app in apps])
+    try:
+        tmp_path = snapshot_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({"version": SNAPSHOT_VERSION, "categories": categories}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    except Exception as e:
+        print(f"保存目录快照失败: {e}")
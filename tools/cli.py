@@ -0,0 +1,223 @@
+"""
+命令行模式
+  python 软件启动器.py --list [--json]
+  python 软件启动器.py --search 关键字 [--limit N] [--json]
+  python 软件启动器.py --launch 名称 [--json]
+  python 软件启动器.py --metrics [--json]（查看常驻实例的运行时指标）
+不创建QApplication，也不导入Qt、PIL和COM：有常驻实例（--resident）时把命令交给它处理，
+否则目录优先取自 profile/ 下的快照（目录标记不变的分类），有变化的分类直接用纯Python解析快捷方式；
+每个根目录在单独的线程中读取，超时未完成的根目录（如断开的网络共享）使用快照中的内容，
+命令行模式只读取快照，不写入（快照由界面维护），适合绑定到快捷键和脚本中调用
+经由 软件启动器.py 调用时，解释器每次都要编译这个两千多行的脚本（约30毫秒，脚本本身不缓存字节码）；
+绑定快捷键时可以改用 python -m tools.cli（在启动器目录中运行，参数相同），只加载已缓存的小模块
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from tools.catalog import app_summary, find_app, scan_category
+from tools.catalog_snapshot import ROOT_TIMEOUT_MS, catalog_roots, directory_stamp, load_snapshot
+from tools.instance_client import request
+from tools.search_index import SearchIndex
+
+CLI_OPTIONS = ("--list", "--search", "--launch", "--metrics")
+
+
+def wants_cli(argv):
+    """命令行参数中是否包含命令行模式的选项"""
+    return any(arg.split("=", 1)[0] in CLI_OPTIONS for arg in argv)
+
+
+def load_root(root, snapshot):
+    """
+    读取一个根目录：目录标记与快照一致的分类直接用快照，其余分类重新解析，返回 {分类目录: (目录标记, [应用信息])}
+    重新解析的应用不生成搜索条目：--list 用不到，导入pypinyin要两百毫秒，只在搜索时由 SearchIndex 生成
+    """
+    directories = sorted(os.path.join(root, category) for category in os.listdir(root)
+                         if os.path.isdir(os.path.join(root, category)))
+    results = {}
+    for directory in directories:
+        cached = snapshot.get(directory)
+        stamp = directory_stamp(directory)
+        if cached and cached[0] == stamp:
+            results[directory] = cached
+            continue
+        try:
+            apps = scan_category(os.path.basename(directory), directory, cached[1] if cached else None,
+                                 search_entries=False)
+        except OSError as e:
+            print(f"读取分类目录失败: {e}", file=sys.stderr)
+            continue
+        results[directory] = (stamp, apps)
+    return results
+
+
+def load_roots(roots, snapshot, timeout):
+    """并发读取各个根目录，返回 {根目录: load_root 的结果}；超时或无法访问的根目录不在结果中"""
+    results = {}
+
+    def worker(root):
+        try:
+            results[root] = load_root(root, snapshot)
+        except OSError as e:
+            print(f"读取应用目录失败: {e}", file=sys.stderr)
+
+    # 守护线程：阻塞在网络共享上的线程不会阻止进程退出
+    threads = [threading.Thread(target=worker, args=(root,), daemon=True) for root in roots]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    return dict(results)
+
+
+def load_catalog(profile_dir="profile"):
+    """
+    读取全部应用：各根目录中有变化的分类重新解析（只在内存中，快照由界面写入）；
+    超时或无法访问的根目录使用快照中的内容；最后应用用户的自定义名称
+    """
+    config, overrides = {}, {}
+    state_path = os.path.join(profile_dir, "state.db")
+    if os.path.exists(state_path):
+        from tools.state_store import StateStore
+        store = StateStore(state_path)
+        config = store.namespace("config")
+        overrides = store.namespace("overrides")
+        store.close()
+    roots = catalog_roots(config)
+    timeout = config.get("root_timeout_ms", ROOT_TIMEOUT_MS) / 1000
+
+    snapshot_path = os.path.join(profile_dir, "catalog_snapshot.bin")
+    snapshot = load_snapshot(snapshot_path)
+    loaded = load_roots(roots, snapshot, timeout)
+
+    catalog = {}
+    for root in roots:
+        if root in loaded:
+            catalog.update(loaded[root])
+        else:
+            print(f"{root}：响应慢或无法访问，使用上次的内容", file=sys.stderr)
+            catalog.update((directory, entry) for directory, entry in snapshot.items()
+                           if os.path.dirname(directory) == root)
+
+    apps = [app for _, category_apps in catalog.values() for app in category_apps]
+    for app in apps:
+        override = overrides.get(app['path'])
+        if override and override.get('name'):
+            app['name'] = override['name']
+            app.pop('search_entry', None)  # 按新名称重新生成
+    return apps
+
+
+def usage_log(profile_dir):
+    from tools.usage_log import UsageLog
+    return UsageLog(os.path.join(profile_dir, "usage.log"))
+
+
+def build_index(apps, profile_dir):
+    """与界面相同的搜索索引和排序（常用应用靠前）"""
+    index = SearchIndex()
+    index.set_boosts(usage_log(profile_dir).all_scores())
+    for app in apps:
+        index.add(app)
+    return index
+
+
+def lazy_indexes(apps, profile_dir):
+    """按名称查找时，只有没有同名应用才建立搜索索引"""
+    yield build_index(apps, profile_dir)
+
+
+def output(apps, as_json):
+    if as_json:
+        print(json.dumps([app_summary(app) for app in apps], ensure_ascii=False, indent=2))
+    else:
+        for app in apps:
+            print(f"{app['category']}\t{app['name']}\t{app['target']}")
+
+
+def run_local(args):
+    """没有常驻实例时自己读取目录，返回 (退出码, 结果)"""
+    if args.metrics:
+        print("没有运行中的常驻实例（--resident），无法取得运行时指标", file=sys.stderr)
+        return 1, None
+    profile_dir = "profile"
+    apps = load_catalog(profile_dir)
+    if args.list:
+        return 0, apps
+    if args.search is not None:
+        return 0, build_index(apps, profile_dir).search(args.search, args.limit)
+
+    app = find_app(apps, args.launch, lazy_indexes(apps, profile_dir))
+    if app is None:
+        print(f"未找到应用: {args.launch}", file=sys.stderr)
+        return 1, None
+    from tools.process_spawn import spawn
+    try:
+        spawn(app['target'], app.get('arguments', ''), app.get('working_dir', ''))
+    except Exception as e:
+        print(f"无法启动应用: {e}", file=sys.stderr)
+        return 2, None
+    usage_log(profile_dir).record(app['path'])
+    return 0, app
+
+
+def run_remote(args):
+    """把命令交给常驻实例，返回 (退出码, 结果)；没有常驻实例时返回None"""
+    if args.list:
+        reply = request("list")
+    elif args.search is not None:
+        reply = request("search", args.search, limit=args.limit)
+    elif args.metrics:
+        reply = request("metrics")
+    else:
+        reply = request("launch", args.launch)
+    if reply is None:
+        return None
+    if not reply.get("ok"):
+        print(reply.get("error", "常驻实例处理失败"), file=sys.stderr)
+        return 1, None
+    return 0, reply.get("result")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="软件启动器", description="应用启动器命令行模式")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--list", action="store_true", help="列出所有应用")
+    action.add_argument("--search", metavar="QUERY", help="搜索应用（支持拼音和首字母）")
+    action.add_argument("--launch", metavar="NAME", help="启动名称匹配的应用")
+    action.add_argument("--metrics", action="store_true", help="显示常驻实例的运行时指标")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出")
+    parser.add_argument("--limit", type=int, default=20, help="搜索结果的最大数量")
+    parser.add_argument("--root", default=".", help="启动器所在目录（含 apps/ 和 profile/），默认为当前目录")
+    parser.add_argument("--local", action="store_true", help="不使用常驻实例，自己读取目录")
+    args = parser.parse_args(argv)
+
+    # 与界面一样使用相对路径，应用键（快捷方式路径）才能与界面的使用记录和自定义设置对应
+    os.chdir(args.root)
+    outcome = None if args.local else run_remote(args)
+    code, result = outcome if outcome is not None else run_local(args)
+    if code != 0:
+        return code
+
+    if args.metrics:
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        else:
+            from tools.metrics import format_report
+            print(format_report(result))
+    elif args.launch is None:
+        output(result, args.json)
+    elif args.json:
+        print(json.dumps(app_summary(result), ensure_ascii=False))
+    else:
+        print(f"已启动: {result['name']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,64 +1,110 @@
+import ctypes
 import os
 import sys
-from PIL import Image
-import win32api
+from ctypes import wintypes
+
 import win32con
 import win32gui
-import win32ui
 
+from tools.icon_buffer import from_gdi_bits
+
+BI_RGB = 0
+DIB_RGB_COLORS = 0
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ('biSize', wintypes.DWORD),
+        ('biWidth', wintypes.LONG),
+        ('biHeight', wintypes.LONG),
+        ('biPlanes', wintypes.WORD),
+        ('biBitCount', wintypes.WORD),
+        ('biCompression', wintypes.DWORD),
+        ('biSizeImage', wintypes.DWORD),
+        ('biXPelsPerMeter', wintypes.LONG),
+        ('biYPelsPerMeter', wintypes.LONG),
+        ('biClrUsed', wintypes.DWORD),
+        ('biClrImportant', wintypes.DWORD),
+    ]
 
-def extract_icon(exe_path):
+
+_gdi32 = ctypes.WinDLL("gdi32")
+_gdi32.CreateDIBSection.argtypes = [wintypes.HDC, ctypes.POINTER(BITMAPINFOHEADER), wintypes.UINT,
+                                    ctypes.POINTER(ctypes.c_void_p), wintypes.HANDLE, wintypes.DWORD]
+_gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+
+
+def _render(mem_dc, hicon, size, flags, fill):
+    """
+    在 size×size 的32位自顶向下DIB节上绘制图标，返回BGRA字节；fill 为绘制前每个字节的初始值
+    DIB节的像素直接可读，不经过设备相关位图，也不受屏幕色深影响
     """
-    提取指定程序的图标并返回PIL Image对象（更大尺寸并保留透明通道）
+    header = BITMAPINFOHEADER()
+    header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+    header.biWidth = size
+    header.biHeight = -size  # 负数表示自顶向下，行序与QImage相同
+    header.biPlanes = 1
+    header.biBitCount = 32
+    header.biCompression = BI_RGB
+    bits = ctypes.c_void_p()
+    hbmp = _gdi32.CreateDIBSection(mem_dc, ctypes.byref(header), DIB_RGB_COLORS, ctypes.byref(bits), None, 0)
+    if not hbmp or not bits:
+        raise OSError("无法创建DIB节")
+    try:
+        ctypes.memset(bits, fill, size * size * 4)
+        old_bmp = win32gui.SelectObject(mem_dc, hbmp)
+        try:
+            win32gui.DrawIconEx(mem_dc, 0, 0, hicon, size, size, 0, None, flags)
+            _gdi32.GdiFlush()  # 读取像素前完成GDI的批量绘制
+            return ctypes.string_at(bits, size * size * 4)
+        finally:
+            win32gui.SelectObject(mem_dc, old_bmp)
+    finally:
+        win32gui.DeleteObject(hbmp)
+
+
+def extract_icon(exe_path, icon_size=64):
+    """
+    提取指定程序的图标并返回 IconBuffer（更大尺寸并保留透明通道）
+    icon_size 为绘制的边长，默认64x64
     """
     if not os.path.exists(exe_path):
         raise FileNotFoundError(f"文件不存在: {exe_path}")
 
+    large_icons, small_icons = [], []
+    screen_dc = mem_dc = None
     try:
         # 获取图标，增加图标尺寸到64x64
-        large_icon, small_icon = win32gui.ExtractIconEx(exe_path, 0)
+        large_icons, small_icons = win32gui.ExtractIconEx(exe_path, 0)
 
-        if large_icon:
-            hicon = large_icon[0]
-        elif small_icon:
-            hicon = small_icon[0]
+        if large_icons:
+            hicon = large_icons[0]
+        elif small_icons:
+            hicon = small_icons[0]
         else:
             raise Exception("无法提取图标")
 
-        # 绘制图标到设备上下文，使用64x64尺寸
-        hdc = win32ui.CreateDCFromHandle(win32gui.GetDC(0))
-        hbmp = win32ui.CreateBitmap()
-
-        # 修改为64x64大小的图标
-        icon_size = 64
-        hbmp.CreateCompatibleBitmap(hdc, icon_size, icon_size)
-        hdc = hdc.CreateCompatibleDC()
-
-        old_bmp = hdc.SelectObject(hbmp)
-        # 绘制图标
-        win32gui.DrawIconEx(hdc.GetSafeHdc(), 0, 0, hicon, icon_size, icon_size, 0, None, win32con.DI_NORMAL)
-
-        # 获取位图信息
-        bmp_info = hbmp.GetInfo()
-        bmp_str = hbmp.GetBitmapBits(True)
-
-        # 使用RGBA模式保留透明通道
-        img = Image.frombuffer(
-            'RGBA',  # 改为RGBA模式保留透明度
-            (bmp_info['bmWidth'], bmp_info['bmHeight']),
-            bmp_str, 'raw', 'BGRA', 0, 1  # 对应BGRA格式
-        )
-
-        # 清理资源
-        hdc.SelectObject(old_bmp)
-        hdc.DeleteDC()
-        win32gui.DestroyIcon(hicon)
-
-        return img
+        screen_dc = win32gui.GetDC(0)
+        mem_dc = win32gui.CreateCompatibleDC(screen_dc)
+        # 带alpha的图标在全零的DIB上混合，得到的就是预乘alpha的BGRA
+        color = _render(mem_dc, hicon, icon_size, win32con.DI_NORMAL, 0)
+        mask = None
+        if color[3::4].count(0) == icon_size * icon_size:
+            # 没有alpha通道的旧式图标：alpha全为0，透明区域取自AND掩码（在全白的DIB上绘制，透明处保持白色）
+            mask = _render(mem_dc, hicon, icon_size, win32con.DI_MASK, 0xFF)
+        return from_gdi_bits(icon_size, icon_size, color, mask)
 
     except Exception as e:
         print(f"提取图标时出错: {str(e)}")
         return None
+    finally:
+        # 清理资源：屏幕DC必须释放，ExtractIconEx 返回的每个图标句柄都要销毁
+        if mem_dc is not None:
+            win32gui.DeleteDC(mem_dc)
+        if screen_dc is not None:
+            win32gui.ReleaseDC(0, screen_dc)
+        for hicon in list(large_icons) + list(small_icons):
+            win32gui.DestroyIcon(hicon)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+"""
+零拷贝的图标像素
+各提取后端返回 IconBuffer：预乘alpha的BGRA像素，即（小端机器上）QImage.Format_ARGB32_Premultiplied 的内存布局，
+也是光栅绘制引擎内部使用的格式；QImage 直接包装这块内存，生成各级尺寸、写入和读取图标缓存、转换为QPixmap时
+都不再经过PIL，也不再在RGBA和BGRA之间转换，只在缩放和上传为QPixmap时各复制一次像素
+PIL变为可选：只在Qt无法解码某一帧时作为后备
+"""
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+
+PIXEL_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+_INVERT = bytes(255 - value for value in range(256))  # 按字节取反的转换表
+
+
+class IconBuffer:
+    """
+    宽×高的预乘BGRA像素，行与行之间没有填充；data 是支持缓冲区协议的对象（bytes、bytearray、内存视图）
+    image() 返回直接包装 data 的QImage，PyQt 持有 data 的引用，QImage 存在期间缓冲区不会被释放；
+    由QImage得到的缓冲区（from_qimage）由这个QImage持有像素，data 是它的只读内存视图
+    """
+    __slots__ = ("width", "height", "data", "_image")
+
+    def __init__(self, width, height, data, image=None):
+        self.width = width
+        self.height = height
+        self.data = data
+        self._image = image
+
+    @classmethod
+    def from_qimage(cls, image):
+        """取得QImage的像素；已是预乘ARGB32时不复制，ARGB32等同位深的格式在图像独占像素时原地转换"""
+        if image.format() != PIXEL_FORMAT:
+            image.convertTo(PIXEL_FORMAT)
+        bits = image.constBits()
+        bits.setsize(image.sizeInBytes())
+        return cls(image.width(), image.height(), memoryview(bits), image)
+
+    def image(self):
+        """包装 data 的QImage（不复制）"""
+        if self._image is None:
+            self._image = QImage(self.data, self.width, self.height, self.width * 4, PIXEL_FORMAT)
+        return self._image
+
+    def scaled(self, size):
+        """等比缩放到 size×size 以内的新缓冲区；平滑缩放在预乘像素上进行，透明边缘不会出现暗边"""
+        if self.width == size and self.height == size:
+            return self
+        return IconBuffer.from_qimage(self.image().scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio,
+                                                          Qt.TransformationMode.SmoothTransformation))
+
+    @property
+    def nbytes(self):
+        return self.width * self.height * 4
+
+
+def decode_image(data, format_hint=None):
+    """解码PNG、ICO等图像数据，Qt无法解码时回退到PIL（未安装则放弃），失败时返回None"""
+    image = QImage.fromData(data, format_hint)
+    if not image.isNull():
+        return IconBuffer.from_qimage(image)
+    try:
+        from io import BytesIO
+
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(BytesIO(data)) as pil_image:
+            return from_pil(pil_image)
+    except Exception as e:
+        print(f"解码图标失败: {e}")
+        return None
+
+
+def load_image_file(path):
+    """读取图像文件，失败时返回None"""
+    try:
+        with open(path, 'rb') as f:
+            return decode_image(f.read())
+    except OSError as e:
+        print(f"读取图标文件失败: {e}")
+        return None
+
+
+def from_gdi_bits(width, height, color, mask=None):
+    """
+    GDI在32位DIB节上绘制的图标（tools/get_icon_func.py）：color 为 DrawIconEx(DI_NORMAL) 在全零背景上的结果，
+    带alpha的图标混合后已是预乘BGRA，直接使用；mask 为 DrawIconEx(DI_MASK) 在全白背景上的结果，
+    给出时 color 没有alpha通道，按掩码补上：掩码为白色（FF）的像素透明，其余不透明
+    整块像素按大整数做按位运算，不逐个像素循环
+    """
+    if mask is None:
+        return IconBuffer(width, height, color)
+    count = width * height
+    opaque = int.from_bytes(mask.translate(_INVERT), "little")  # 不透明像素的四个字节都是FF
+    alpha = int.from_bytes(b"\0\0\0\xff" * count, "little")
+    pixels = (int.from_bytes(color, "little") | alpha) & opaque
+    return IconBuffer(width, height, pixels.to_bytes(count * 4, "little"))
+
+
+def from_pil(image):
+    """PIL图像转换为缓冲区，BGRa 打包模式一次完成通道重排和预乘"""
+    return IconBuffer(image.width, image.height, image.convert("RGBA").tobytes("raw", "BGRa"))
@@ -0,0 +1,213 @@
+"""
+持久化图标缓存
+以 目标路径 + 图标尺寸 为键、目标文件mtime为校验，将已光栅化的预乘BGRA像素打包存放在一个数据文件中，
+索引单独保存为JSON；读取时返回指向mmap的内存视图，不复制像素，支持LRU淘汰和总大小上限
+"""
+import json
+import mmap
+import os
+from collections import OrderedDict
+
+CACHE_VERSION = 2  # 2: 像素由RGBA改为预乘BGRA
+
+
+class IconCache:
+    def __init__(self, cache_dir, max_bytes=32 * 1024 * 1024):
+        self.data_path = os.path.join(cache_dir, "icon_cache.bin")
+        self.index_path = os.path.join(cache_dir, "icon_cache.json")
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # {键: [偏移, 长度, 宽, 高, mtime]}，按最近使用排序
+        self.data_size = 0  # 数据文件当前长度（含已淘汰的空洞）
+        self.live_bytes = 0  # 仍被索引引用的像素字节数
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.dirty = False
+        self._mmap = None
+        self._mmap_size = 0
+        self.load()
+
+    @staticmethod
+    def make_key(target_path, size):
+        """缓存键：规范化后的目标路径 + 尺寸"""
+        return f"{os.path.normcase(os.path.abspath(target_path))}|{size}"
+
+    def load(self):
+        """读取索引，丢弃超出数据文件范围的记录；索引缺失、损坏或版本不同时丢弃数据文件，从头开始写"""
+        try:
+            if os.path.exists(self.index_path) and os.path.exists(self.data_path):
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                # 版本不同时旧格式的像素不能再用
+                if index.get("version") == CACHE_VERSION:
+                    self.data_size = os.path.getsize(self.data_path)
+                    for key, entry in index.get("entries", []):
+                        offset, length = entry[0], entry[1]
+                        if offset + length <= self.data_size:
+                            self.entries[key] = entry
+                            self.live_bytes += length
+                    return
+        except Exception as e:
+            print(f"加载图标缓存失败: {e}")
+            self.entries.clear()
+            self.live_bytes = 0
+        self._discard_data()
+
+    def _discard_data(self):
+        """
+        没有可用索引时删除数据文件（如写入后、保存索引前异常退出）：
+        否则新记录追加在旧数据之后，却会按 data_size=0 记录偏移，指向旧像素
+        """
+        self.data_size = 0
+        try:
+            if os.path.exists(self.data_path):
+                os.remove(self.data_path)
+        except OSError as e:
+            print(f"删除图标缓存数据失败: {e}")
+            # 无法删除时从文件末尾继续追加
+            self.data_size = os.path.getsize(self.data_path)
+
+    def save(self):
+        """原子地写回索引"""
+        if not self.dirty:
+            return
+        try:
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, "entries": list(self.entries.items())},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+            self.dirty = False
+        except Exception as e:
+            print(f"保存图标缓存失败: {e}")
+
+    def close(self):
+        """保存索引并释放映射"""
+        self.save()
+        self._release_mmap()
+
+    def _release_mmap(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+            self._mmap_size = 0
+
+    def _view(self):
+        """返回覆盖整个数据文件的只读映射，文件增长后重新映射"""
+        if self._mmap is None or self._mmap_size != self.data_size:
+            self._release_mmap()
+            if self.data_size == 0:
+                return None
+            with open(self.data_path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mmap_size = self.data_size
+        return self._mmap
+
+    @staticmethod
+    def _mtime(target_path):
+        try:
+            return os.stat(target_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, target_path, size):
+        """
+        命中时返回 (宽, 高, 像素)，像素为指向映射的只读内存视图，调用方用完后须 release()（或用 with），
+        否则数据文件增长后无法重新映射；未命中或目标文件已变化时返回None
+        """
+        key = self.make_key(target_path, size)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        offset, length, width, height, mtime = entry
+        if mtime != self._mtime(target_path):
+            # 目标文件已更新，作废旧记录
+            self._drop(key)
+            self.invalidations += 1
+            self.misses += 1
+            return None
+
+        try:
+            view = self._view()
+            data = memoryview(view)[offset:offset + length]
+        except Exception as e:
+            print(f"读取图标缓存失败: {e}")
+            self._drop(key)
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return width, height, data
+
+    def put(self, target_path, size, width, height, pixels):
+        """追加一条图标记录（pixels 为预乘BGRA像素，任意缓冲区对象），超出上限时按LRU淘汰"""
+        length = width * height * 4
+        mtime = self._mtime(target_path)
+        if mtime is None or length > self.max_bytes:
+            return
+        key = self.make_key(target_path, size)
+        if key in self.entries:
+            self._drop(key)
+
+        try:
+            with open(self.data_path, 'ab') as f:
+                offset = f.tell()  # 追加模式打开后位于文件末尾，偏移以实际位置为准
+                f.write(pixels)
+        except Exception as e:
+            print(f"写入图标缓存失败: {e}")
+            return
+
+        self.entries[key] = [offset, length, width, height, mtime]
+        self.data_size = offset + length
+        self.live_bytes += length
+        self.dirty = True
+        self._evict()
+
+    def _drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.live_bytes -= entry[1]
+            self.dirty = True
+
+    def _evict(self):
+        """淘汰最久未使用的图标；空洞过多时压缩数据文件"""
+        while self.live_bytes > self.max_bytes and self.entries:
+            self._drop(next(iter(self.entries)))
+        if self.data_size > self.max_bytes and self.data_size > 2 * self.live_bytes:
+            self.compact()
+
+    def compact(self):
+        """只保留仍被引用的像素，重写数据文件"""
+        try:
+            view = self._view()
+            tmp_path = self.data_path + ".tmp"
+            new_entries = OrderedDict()
+            offset = 0
+            with open(tmp_path, 'wb') as f:
+                for key, (old_offset, length, width, height, mtime) in self.entries.items():
+                    f.write(view[old_offset:old_offset + length])
+                    new_entries[key] = [offset, length, width, height, mtime]
+                    offset += length
+            self._release_mmap()
+            os.replace(tmp_path, self.data_path)
+            self.entries = new_entries
+            self.data_size = offset
+            self.live_bytes = offset
+            self.dirty = True
+            self.save()
+        except Exception as e:
+            print(f"压缩图标缓存失败: {e}")
+
+    def stats(self):
+        """命中统计"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'entries': len(self.entries),
+            'bytes': self.live_bytes,
+            'file_bytes': self.data_size,
+        }
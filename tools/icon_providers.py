@@ -0,0 +1,162 @@
+"""
+图标提取后端
+每个后端实现 extract(路径, 尺寸) 返回预乘BGRA像素的 IconBuffer（tools/icon_buffer.py）；extract_icon 按顺序尝试可用的后端：
+- pe: 纯Python读取PE资源（tools/pe_icons.py），不依赖GDI，可在任意线程和子进程中并行
+- win32: 通过 ExtractIconEx + GDI 绘制（tools/get_icon_func.py），处理纯Python读取不了的文件
+- freedesktop: 在Linux上按图标主题规范查找 .desktop 文件或程序名对应的图标
+"""
+import os
+import sys
+
+from tools.icon_buffer import load_image_file
+from tools.pe_icons import PEFormatError, load_icon_buffer
+
+
+class IconProvider:
+    """图标提取后端的接口"""
+    name = ""
+
+    def available(self):
+        """当前环境能否使用这个后端"""
+        return True
+
+    def extract(self, path, size):
+        """返回不小于 size（尽量接近）的 IconBuffer，无法提取时返回None"""
+        raise NotImplementedError
+
+
+class PeIconProvider(IconProvider):
+    name = "pe"
+
+    def extract(self, path, size):
+        if not path.lower().endswith(('.exe', '.dll')):
+            return None
+        try:
+            return load_icon_buffer(path, size)
+        except (OSError, PEFormatError) as e:
+            print(f"读取程序图标失败: {e}")
+            return None
+
+
+class Win32IconProvider(IconProvider):
+    name = "win32"
+
+    def available(self):
+        if sys.platform != "win32":
+            return False
+        try:
+            from tools import get_icon_func  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def extract(self, path, size):
+        from tools.get_icon_func import extract_icon
+        return extract_icon(path, size)
+
+
+class FreedesktopIconProvider(IconProvider):
+    """按 freedesktop 图标主题规范查找PNG图标（不处理SVG）"""
+    name = "freedesktop"
+
+    def __init__(self, theme="hicolor"):
+        self.theme = theme
+
+    def available(self):
+        return sys.platform.startswith(("linux", "freebsd", "openbsd"))
+
+    @staticmethod
+    def data_dirs():
+        data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+        return [data_home] + [path for path in data_dirs.split(":") if path]
+
+    @staticmethod
+    def icon_name(path):
+        """.desktop 文件取 Icon= 的值，其他文件取不带扩展名的文件名"""
+        if path.endswith(".desktop"):
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    in_entry = False
+                    for line in f:
+                        line = line.strip()
+                        if line.startswith("["):
+                            in_entry = line == "[Desktop Entry]"
+                        elif in_entry and line.startswith("Icon="):
+                            return line[5:].strip()
+            except OSError:
+                return None
+            return None
+        return os.path.splitext(os.path.basename(path))[0]
+
+    def find(self, name, size):
+        """图标文件路径：主题中不小于 size 的最小尺寸优先，其次最大的，最后是 pixmaps 目录"""
+        if os.path.isabs(name):
+            return name if os.path.isfile(name) else None
+        candidates = []  # [(尺寸, 路径)]
+        themes = [self.theme] if self.theme == "hicolor" else [self.theme, "hicolor"]
+        for data_dir in self.data_dirs():
+            for theme in themes:
+                theme_dir = os.path.join(data_dir, "icons", theme)
+                try:
+                    size_dirs = os.listdir(theme_dir)
+                except OSError:
+                    continue
+                for size_dir in size_dirs:
+                    width = size_dir.split("x")[0].split("@")[0]
+                    if not width.isdigit():
+                        continue
+                    icon_path = os.path.join(theme_dir, size_dir, "apps", name + ".png")
+                    if os.path.isfile(icon_path):
+                        candidates.append((int(width), icon_path))
+            if candidates:
+                break
+        if candidates:
+            larger = [candidate for candidate in candidates if candidate[0] >= size]
+            return min(larger)[1] if larger else max(candidates)[1]
+        for data_dir in self.data_dirs():
+            icon_path = os.path.join(data_dir, "pixmaps", name + ".png")
+            if os.path.isfile(icon_path):
+                return icon_path
+        return None
+
+    def extract(self, path, size):
+        name = self.icon_name(path)
+        if not name:
+            return None
+        icon_path = self.find(name, size)
+        if icon_path is None or not icon_path.lower().endswith(".png"):
+            return None
+        return load_image_file(icon_path)
+
+
+def default_providers():
+    """当前平台可用的后端，纯Python的PE读取优先"""
+    providers = [PeIconProvider(), Win32IconProvider(), FreedesktopIconProvider()]
+    return [provider for provider in providers if provider.available()]
+
+
+_providers = None
+
+
+def extract_icon(path, icon_size=64, providers=None):
+    """依次尝试各后端提取图标，返回 IconBuffer，都失败时返回None"""
+    global _providers
+    if providers is None:
+        if _providers is None:
+            _providers = default_providers()
+        providers = _providers
+    for provider in providers:
+        image = provider.extract(path, icon_size)
+        if image is not None:
+            return image
+    return None
+
+
+if __name__ == "__main__":
+    # 显示各后端的提取结果：python -m tools.icon_providers <路径> [尺寸]
+    target = sys.argv[1]
+    target_size = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    for backend in default_providers():
+        result = backend.extract(target, target_size)
+        print(f"{backend.name}: {f'{result.width}x{result.height}' if result is not None else '无图标'}")
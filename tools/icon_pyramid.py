@@ -0,0 +1,132 @@
+"""
+多分辨率图标
+提取一次图标后生成 32/48/64/96/128 五级金字塔存入图标缓存，显示时按缩放后的尺寸选用最接近的一级，
+缩放到目标尺寸的QPixmap再按 (像素内容, 尺寸) 缓存，反复缩放时不必每次重新采样，相同的图标只保存一份；
+像素始终是预乘BGRA（tools/icon_buffer.py），从图标缓存的映射直接包装为QImage，转换为QPixmap时不需要格式转换
+"""
+import hashlib
+import struct
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QIcon, QImage, QPixmap
+
+from tools.icon_buffer import PIXEL_FORMAT
+
+ICON_LEVELS = (32, 48, 64, 96, 128)
+
+
+def build_pyramid(buffer):
+    """由 IconBuffer 生成各级图标，返回 {边长: IconBuffer}；每级由原图缩放一次，可在后台线程调用"""
+    return {level: buffer.scaled(level) for level in ICON_LEVELS}
+
+
+def level_order(size):
+    """按优先顺序列出可用的级别：不小于目标尺寸的最小一级优先（缩小比放大清晰），其次更大的，最后更小的"""
+    larger = [level for level in ICON_LEVELS if level >= size]
+    smaller = [level for level in reversed(ICON_LEVELS) if level < size]
+    return larger + smaller
+
+
+class ScaledIconCache:
+    """
+    缩放好的图标缓存，按内容寻址：缩放前的像素数据相同的图标（同一程序的多个快捷方式、图标相同的不同程序）
+    共用同一个QPixmap和QIcon，占用的内存与不同图标的数量成正比；按目标路径LRU淘汰（只能在GUI线程使用）
+    """
+
+    def __init__(self, icon_cache, max_bytes=16 * 1024 * 1024):
+        self.icon_cache = icon_cache
+        self.max_bytes = max_bytes
+        self.targets = OrderedDict()  # {目标路径: {尺寸: 内容键}}，按最近使用排序
+        self.contents = {}  # {内容键: [QPixmap, QIcon或None, 引用数]}，内容键为 (像素摘要, 尺寸)
+        self.total_bytes = 0  # 所有不同图标的像素字节数
+        self.shared_hits = 0  # 新的目标路径复用了已有图标的次数
+
+    def _content_key(self, target_path, size):
+        """目标程序在指定边长下的内容键，图标缓存中没有任何一级时返回None"""
+        for level in level_order(size):
+            cached = self.icon_cache.get(target_path, level)
+            if cached:
+                break
+        else:
+            return None
+
+        width, height, data = cached
+        with data:  # 指向图标缓存映射的内存视图，用完立即释放
+            digest = hashlib.blake2b(data, digest_size=16, person=struct.pack("<II", width, height)).digest()
+            key = (digest, size)
+            content = self.contents.get(key)
+            if content is not None:
+                content[2] += 1
+                self.shared_hits += 1
+                return key
+
+            # 直接包装映射中的像素；缩放或 fromImage 产生QPixmap自己的一份，之后不再引用映射
+            image = QImage(data, width, height, width * 4, PIXEL_FORMAT)
+            if width != size or height != size:
+                image = image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio,
+                                     Qt.TransformationMode.SmoothTransformation)
+            pixmap = QPixmap.fromImage(image)
+            del image
+        self.contents[key] = [pixmap, None, 1]
+        self.total_bytes += size * size * 4
+        return key
+
+    def _lookup(self, target_path, size):
+        sizes = self.targets.get(target_path)
+        if sizes is not None and size in sizes:
+            self.targets.move_to_end(target_path)
+            return self.contents[sizes[size]]
+
+        key = self._content_key(target_path, size)
+        if key is None:
+            return None
+        if sizes is None:
+            sizes = self.targets[target_path] = {}
+        sizes[size] = key
+        self.targets.move_to_end(target_path)
+        content = self.contents[key]
+        self._evict()
+        return content
+
+    def pixmap(self, target_path, size):
+        """返回目标程序在指定边长下的图标，图标缓存中没有任何一级时返回None"""
+        content = self._lookup(target_path, size)
+        return content[0] if content else None
+
+    def icon(self, target_path, size):
+        """同 pixmap，返回共用的QIcon"""
+        content = self._lookup(target_path, size)
+        if not content:
+            return None
+        if content[1] is None:
+            content[1] = QIcon(content[0])
+        return content[1]
+
+    def _release(self, key):
+        content = self.contents[key]
+        content[2] -= 1
+        if content[2] <= 0:
+            del self.contents[key]
+            self.total_bytes -= key[1] * key[1] * 4
+
+    def invalidate(self, target_path):
+        """目标程序的图标更新后丢弃旧的缩放结果"""
+        sizes = self.targets.pop(target_path, None)
+        for key in (sizes or {}).values():
+            self._release(key)
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self.targets) > 1:
+            _, sizes = self.targets.popitem(last=False)
+            for key in sizes.values():
+                self._release(key)
+
+    def stats(self):
+        """不同图标数、引用数（目标路径和尺寸的组合）、像素字节数"""
+        return {
+            'unique_icons': len(self.contents),
+            'references': sum(content[2] for content in self.contents.values()),
+            'bytes': self.total_bytes,
+            'shared_hits': self.shared_hits,
+        }
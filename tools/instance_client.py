@@ -0,0 +1,121 @@
+"""
+常驻实例的客户端
+常驻实例（--resident）在本地套接字上监听（见 tools/instance_server.py），之后的调用把命令发给它后立即退出。
+协议：客户端发送一行JSON {"version", "command", "argument", ...}，服务端回复一行JSON {"version", "ok", "result"/"error"}
+客户端直接使用Unix域套接字/Windows命名管道，与 QLocalServer 兼容，不需要导入Qt，命令行模式仍然很快
+"""
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+PROTOCOL_VERSION = 1
+MAX_MESSAGE_BYTES = 4 * 1024 * 1024  # 回复可能包含大量搜索结果
+
+
+def server_name(root="."):
+    """
+    本地套接字名称：按用户和启动器目录区分，同一目录只有一个常驻实例
+    Unix上为套接字文件的完整路径（QLocalServer 接受完整路径），Windows上为命名管道名
+    """
+    root = os.path.normcase(os.path.abspath(root))
+    digest = hashlib.sha1(root.encode("utf-8")).hexdigest()[:12]
+    if sys.platform == "win32":
+        return f"app-launcher-{os.environ.get('USERNAME', '')}-{digest}"
+    temp_dir = os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(temp_dir, f"app-launcher-{os.getuid()}-{digest}.sock")
+
+
+def encode_message(message):
+    return json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def decode_message(line):
+    """解析一行消息，格式不对时返回None"""
+    try:
+        message = json.loads(line.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    return message if isinstance(message, dict) else None
+
+
+def _exchange_unix(name, data, timeout):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(name)
+        sock.sendall(data)
+        reply = b""
+        while not reply.endswith(b"\n") and len(reply) < MAX_MESSAGE_BYTES:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            reply += chunk
+        return reply
+
+
+def _exchange_pipe(name, data, timeout):
+    """
+    先用 WaitNamedPipe 等待管道空闲（管道不存在时立即失败），再在工作线程中收发，最多等待 timeout 秒；
+    管道文件的阻塞读写无法取消，超时后工作线程留在后台，进程退出时随之结束
+    """
+    import pywintypes
+    import win32pipe
+
+    path = r"\\.\pipe" + "\\" + name
+    deadline = time.monotonic() + timeout
+    try:
+        win32pipe.WaitNamedPipe(path, max(1, int(timeout * 1000)))
+    except pywintypes.error as e:
+        raise OSError(e.winerror, e.strerror) from None
+
+    result = {}
+
+    def exchange():
+        try:
+            with open(path, "r+b", buffering=0) as pipe:
+                pipe.write(data)
+                reply = b""
+                while not reply.endswith(b"\n") and len(reply) < MAX_MESSAGE_BYTES:
+                    chunk = pipe.read(65536)
+                    if not chunk:
+                        break
+                    reply += chunk
+                result['reply'] = reply
+        except OSError as e:
+            result['error'] = e
+
+    worker = threading.Thread(target=exchange, name="instance-client", daemon=True)
+    worker.start()
+    worker.join(max(0.0, deadline - time.monotonic()))
+    if worker.is_alive():
+        raise TimeoutError("常驻实例没有及时回复")
+    if 'error' in result:
+        raise result['error']
+    return result['reply']
+
+
+def request(command, argument="", name=None, timeout=2.0, **fields):
+    """
+    向常驻实例发送命令并等待回复；没有常驻实例、连接失败或协议版本不同时返回None
+    """
+    name = name or server_name()
+    data = encode_message(dict(fields, version=PROTOCOL_VERSION, command=command, argument=argument))
+    try:
+        if sys.platform == "win32":
+            reply = _exchange_pipe(name, data, timeout)
+        else:
+            reply = _exchange_unix(name, data, timeout)
+    except OSError:
+        # 套接字不存在、拒绝连接（上次异常退出留下的文件）或超时
+        return None
+
+    message = decode_message(reply.strip())
+    if message is None:
+        return None
+    if message.get("version") != PROTOCOL_VERSION:
+        print(f"常驻实例的协议版本不同 ({message.get('version')} != {PROTOCOL_VERSION})，忽略", file=sys.stderr)
+        return None
+    return message
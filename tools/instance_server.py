@@ -0,0 +1,83 @@
+"""
+常驻实例的服务端
+在 QLocalServer 上接收 tools/instance_client.py 发来的命令，交给处理函数后回复；
+监听前先确认没有存活的实例，上次异常退出留下的套接字文件会被清理
+"""
+from PyQt6.QtCore import QObject
+from PyQt6.QtNetwork import QAbstractSocket, QLocalServer
+
+from tools.instance_client import (MAX_MESSAGE_BYTES, PROTOCOL_VERSION, decode_message,
+                                   encode_message, request)
+
+
+class InstanceServer(QObject):
+    def __init__(self, name, handler, parent=None):
+        """handler(command, message) 返回结果（可序列化为JSON），抛出异常时回复错误"""
+        super().__init__(parent)
+        self.name = name
+        self.handler = handler
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)  # 只允许当前用户连接
+        self.server.newConnection.connect(self.on_new_connection)
+        self.buffers = {}  # {连接: 已收到的字节}
+
+    def listen(self):
+        """开始监听；已有存活的实例时返回False"""
+        if request("ping", name=self.name, timeout=0.5) is not None:
+            return False
+        if self.server.listen(self.name):
+            return True
+        if self.server.serverError() == QAbstractSocket.SocketError.AddressInUseError:
+            # 没有实例应答，套接字是上次异常退出留下的
+            QLocalServer.removeServer(self.name)
+            if self.server.listen(self.name):
+                return True
+        print(f"监听本地套接字失败: {self.server.errorString()}")
+        return False
+
+    def close(self):
+        self.server.close()
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            self.buffers[connection] = b""
+            connection.readyRead.connect(lambda connection=connection: self.on_ready_read(connection))
+            connection.disconnected.connect(lambda connection=connection: self.on_disconnected(connection))
+
+    def on_disconnected(self, connection):
+        self.buffers.pop(connection, None)
+        connection.deleteLater()
+
+    def on_ready_read(self, connection):
+        if connection not in self.buffers:
+            return
+        data = self.buffers[connection] + connection.readAll().data()
+        if b"\n" not in data:
+            if len(data) > MAX_MESSAGE_BYTES:
+                connection.abort()
+            else:
+                self.buffers[connection] = data
+            return
+        del self.buffers[connection]
+
+        reply = self.dispatch(decode_message(data.split(b"\n", 1)[0]))
+        connection.write(encode_message(reply))
+        connection.flush()
+        connection.disconnectFromServer()
+
+    def dispatch(self, message):
+        """处理一条命令，返回回复"""
+        if message is None:
+            return {'version': PROTOCOL_VERSION, 'ok': False, 'error': "无法解析的消息"}
+        if message.get("version") != PROTOCOL_VERSION:
+            return {'version': PROTOCOL_VERSION, 'ok': False,
+                    'error': f"协议版本不同 ({message.get('version')} != {PROTOCOL_VERSION})"}
+        command = message.get("command")
+        if command == "ping":
+            return {'version': PROTOCOL_VERSION, 'ok': True, 'result': None}
+        try:
+            result = self.handler(command, message)
+        except Exception as e:
+            return {'version': PROTOCOL_VERSION, 'ok': False, 'error': str(e) or type(e).__name__}
+        return {'version': PROTOCOL_VERSION, 'ok': True, 'result': result}
@@ -0,0 +1,132 @@
+"""
+异步启动应用
+在线程池中创建子进程（见 tools/process_spawn.py），不阻塞界面；短时间内重复点击同一应用只启动一次；
+记录每个应用的启动耗时和失败次数，每次启动完成后稍后写入统计文件；成功启动的应用通过 launched 信号通知
+"""
+import json
+import os
+import time
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from tools.process_spawn import spawn
+from tools.tracing import tracer
+
+COALESCE_SECONDS = 1.0  # 同一应用在这段时间内的重复点击被合并
+SLOW_LAUNCH_MS = 500  # 超过这个耗时的启动会打印提示
+SAVE_DELAY_MS = 2000  # 启动完成后隔这么久写入统计，合并连续的启动
+
+
+class LaunchSignals(QObject):
+    finished = pyqtSignal(str, float, str)  # (应用键, 耗时ms, 错误信息，成功时为空)
+
+
+class LaunchTask(QRunnable):
+    def __init__(self, signals, key, target_path, arguments, working_dir):
+        super().__init__()
+        self.signals = signals
+        self.key = key
+        self.target_path = target_path
+        self.arguments = arguments
+        self.working_dir = working_dir
+
+    def run(self):
+        start = time.perf_counter()
+        error = ""
+        try:
+            with tracer.span("spawn", target=self.target_path):
+                spawn(self.target_path, self.arguments, self.working_dir)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        self.signals.finished.emit(self.key, (time.perf_counter() - start) * 1000, error)
+
+
+class LaunchExecutor(QObject):
+    """启动请求在GUI线程中提交，实际创建进程在专用线程池中进行，结果通过信号回到GUI线程统计"""
+    launched = pyqtSignal(str)  # 应用键，进程创建成功后发出
+
+    def __init__(self, stats_path=None, parent=None):
+        super().__init__(parent)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(2)
+        self.signals = LaunchSignals(self)
+        self.signals.finished.connect(self.on_finished)
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.save_stats)
+        self.last_requests = {}  # {应用键: 上次请求的时间}
+        self.stats_path = stats_path
+        self.stats = {}  # {应用键: {'launches', 'failures', 'total_ms', 'max_ms', 'last_ms', 'last_error'}}
+        self.dirty = False
+        self.load_stats()
+
+    def launch(self, key, target_path, arguments="", working_dir=""):
+        """提交一次启动，合并窗口内的重复请求返回False"""
+        now = time.monotonic()
+        last = self.last_requests.get(key)
+        if last is not None and now - last < COALESCE_SECONDS:
+            return False
+        self.last_requests[key] = now
+        self.thread_pool.start(LaunchTask(self.signals, key, target_path, arguments or "", working_dir or ""))
+        return True
+
+    def on_finished(self, key, elapsed_ms, error):
+        stats = self.stats.setdefault(key, {'launches': 0, 'failures': 0, 'total_ms': 0.0,
+                                            'max_ms': 0.0, 'last_ms': 0.0, 'last_error': ""})
+        stats['launches'] += 1
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        stats['last_ms'] = elapsed_ms
+        if error:
+            stats['failures'] += 1
+            stats['last_error'] = error
+            print(f"无法启动应用: {error}")
+        elif elapsed_ms > SLOW_LAUNCH_MS:
+            print(f"启动较慢 ({elapsed_ms:.0f} ms): {key}")
+        self.dirty = True
+        self.save_timer.start()
+        if not error:
+            self.launched.emit(key)
+
+    def rename_key(self, old_key, new_key):
+        """快捷方式被重命名或移动后，统计转到新键下"""
+        if old_key in self.stats:
+            self.stats[new_key] = self.stats.pop(old_key)
+            self.dirty = True
+            self.save_timer.start()
+        if old_key in self.last_requests:
+            self.last_requests[new_key] = self.last_requests.pop(old_key)
+
+    def slowest(self, count=10):
+        """按平均启动耗时排序的应用 [(应用键, 统计)]"""
+        items = [(key, stats) for key, stats in self.stats.items() if stats['launches']]
+        items.sort(key=lambda item: -item[1]['total_ms'] / item[1]['launches'])
+        return items[:count]
+
+    def load_stats(self):
+        try:
+            if self.stats_path and os.path.exists(self.stats_path):
+                with open(self.stats_path, 'r', encoding='utf-8') as f:
+                    self.stats = json.load(f)
+        except Exception as e:
+            print(f"加载启动统计失败: {e}")
+            self.stats = {}
+
+    def save_stats(self):
+        self.save_timer.stop()
+        if not self.dirty or not self.stats_path:
+            return
+        try:
+            tmp_path = self.stats_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.stats, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.stats_path)
+            self.dirty = False
+        except Exception as e:
+            print(f"保存启动统计失败: {e}")
+
+    def shutdown(self, timeout_ms=2000):
+        """等待已提交的启动完成并保存统计"""
+        self.thread_pool.waitForDone(timeout_ms)
+        self.save_stats()
@@ -0,0 +1,276 @@
+"""
+纯Python实现的Windows快捷方式(.lnk)解析器（MS-SHLLINK二进制格式）
+不依赖COM，可在任意平台上批量解析快捷方式；无法解码的文件返回None，由调用方回退到COM
+"""
+import os
+import struct
+import sys
+
+# ShellLinkHeader 固定大小与 CLSID {00021401-0000-0000-C000-000000000046}
+HEADER_SIZE = 0x4C
+LINK_CLSID = bytes.fromhex("0114020000000000c000000000000046")
+
+# LinkFlags
+HAS_LINK_TARGET_ID_LIST = 0x00000001
+HAS_LINK_INFO = 0x00000002
+HAS_NAME = 0x00000004
+HAS_RELATIVE_PATH = 0x00000008
+HAS_WORKING_DIR = 0x00000010
+HAS_ARGUMENTS = 0x00000020
+HAS_ICON_LOCATION = 0x00000040
+IS_UNICODE = 0x00000080
+FORCE_NO_LINK_INFO = 0x00000100
+
+# LinkInfoFlags
+VOLUME_ID_AND_LOCAL_BASE_PATH = 0x1
+COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX = 0x2
+
+# ExtraData 块签名
+ENVIRONMENT_VARIABLE_DATA_BLOCK = 0xA0000001
+ICON_ENVIRONMENT_DATA_BLOCK = 0xA0000007
+
+# "我的电脑" CLSID {20D04FE0-3AEA-1069-A2D8-08002B30309D}（按GUID字节序存储）
+MY_COMPUTER_CLSID = bytes.fromhex("e04fd020ea3a6910a2d808002b30309d")
+
+# 非Unicode字符串使用系统ANSI代码页
+ANSI_ENCODING = "mbcs" if sys.platform == "win32" else "gbk"
+
+
+class LnkFormatError(ValueError):
+    """快捷方式文件格式无法识别"""
+
+
+def _read_c_string(data, offset, encoding=ANSI_ENCODING):
+    """读取以NUL结尾的单字节字符串"""
+    end = data.index(b"\x00", offset)
+    return data[offset:end].decode(encoding, errors="replace")
+
+
+def _read_c_wstring(data, offset):
+    """读取以NUL结尾的UTF-16LE字符串"""
+    end = offset
+    while data[end:end + 2] != b"\x00\x00":
+        end += 2
+        if end >= len(data):
+            raise LnkFormatError("Unicode字符串未结束")
+    return data[offset:end].decode("utf-16-le", errors="replace")
+
+
+def _parse_id_list(data, offset):
+    """解析LinkTargetIDList，尽量从"我的电脑\\盘符\\文件项"序列还原出目标路径"""
+    size, = struct.unpack_from("<H", data, offset)
+    end = offset + 2 + size
+    pos = offset + 2
+    parts = []
+    resolvable = False
+
+    while pos < end:
+        item_size, = struct.unpack_from("<H", data, pos)
+        if item_size == 0:
+            break
+        item = data[pos + 2:pos + item_size]
+        pos += item_size
+        if not item:
+            continue
+
+        class_type = item[0]
+        if class_type == 0x1F:
+            # 根文件夹，只认识"我的电脑"
+            resolvable = item[2:18] == MY_COMPUTER_CLSID
+        elif class_type & 0x70 == 0x20:
+            # 卷项目，如 "C:\"
+            parts = [_read_c_string(item, 1, "ascii").rstrip("\\")]
+        elif class_type & 0x70 == 0x30:
+            # 文件/目录项，优先使用扩展块(0xBEEF0004)中的长文件名
+            parts.append(_file_entry_name(item))
+        else:
+            resolvable = False
+
+    if not resolvable or not parts:
+        return None, end
+    return "\\".join(parts), end
+
+
+def _file_entry_name(item):
+    """从文件项中取出名称（长文件名优先，否则为8.3短名）"""
+    is_unicode = item[0] & 0x04
+    name_offset = 12
+    if is_unicode:
+        short_name = _read_c_wstring(item, name_offset)
+        name_end = name_offset + (len(short_name) + 1) * 2
+    else:
+        short_name = _read_c_string(item, name_offset)
+        name_end = name_offset + len(short_name.encode(ANSI_ENCODING)) + 1
+    # 扩展块按2字节对齐
+    name_end += name_end % 2
+
+    ext_sig = item.rfind(b"\x04\x00\xef\xbe", name_end)
+    if ext_sig < 4:
+        return short_name
+    ext_offset = ext_sig - 4
+    ext_size, ext_version = struct.unpack_from("<HH", item, ext_offset)
+    # 各版本扩展块中长文件名的起始偏移
+    if ext_version >= 9:
+        long_name_offset = ext_offset + 46
+    elif ext_version >= 7:
+        long_name_offset = ext_offset + 42
+    elif ext_version >= 3:
+        long_name_offset = ext_offset + 20
+    else:
+        return short_name
+    try:
+        long_name = _read_c_wstring(item, long_name_offset)
+    except (LnkFormatError, IndexError):
+        return short_name
+    return long_name or short_name
+
+
+def _parse_link_info(data, offset):
+    """解析LinkInfo结构，返回本地或网络目标路径"""
+    (size, header_size, flags, volume_id_offset, local_base_path_offset,
+     network_offset, suffix_offset) = struct.unpack_from("<7I", data, offset)
+    end = offset + size
+    if size < 0x1C:
+        return None, end
+
+    local_base_path_unicode = suffix_unicode = None
+    if header_size >= 0x24:
+        local_base_path_unicode, suffix_unicode = struct.unpack_from("<2I", data, offset + 0x1C)
+
+    if suffix_unicode:
+        suffix = _read_c_wstring(data, offset + suffix_unicode)
+    else:
+        suffix = _read_c_string(data, offset + suffix_offset) if suffix_offset else ""
+
+    if flags & VOLUME_ID_AND_LOCAL_BASE_PATH:
+        if local_base_path_unicode:
+            base = _read_c_wstring(data, offset + local_base_path_unicode)
+        else:
+            base = _read_c_string(data, offset + local_base_path_offset)
+        return base + suffix, end
+
+    if flags & COMMON_NETWORK_RELATIVE_LINK_AND_PATH_SUFFIX:
+        net = offset + network_offset
+        _, _, net_name_offset, _, _ = struct.unpack_from("<5I", data, net)
+        if net_name_offset > 0x14:
+            net_name_unicode, = struct.unpack_from("<I", data, net + 0x14)
+            net_name = _read_c_wstring(data, net + net_name_unicode)
+        else:
+            net_name = _read_c_string(data, net + net_name_offset)
+        if suffix:
+            return net_name.rstrip("\\") + "\\" + suffix, end
+        return net_name, end
+
+    return None, end
+
+
+def _parse_extra_data(data, offset):
+    """解析ExtraData中的环境变量块，返回 {签名: 路径}"""
+    blocks = {}
+    while offset + 8 <= len(data):
+        size, signature = struct.unpack_from("<II", data, offset)
+        if size < 4:
+            break
+        if signature in (ENVIRONMENT_VARIABLE_DATA_BLOCK, ICON_ENVIRONMENT_DATA_BLOCK) and size >= 0x314:
+            target = _read_c_wstring(data, offset + 0x10C) or _read_c_string(data, offset + 8)
+            blocks[signature] = target
+        offset += size
+    return blocks
+
+
+def parse_lnk_bytes(data):
+    """
+    解析快捷方式二进制内容，返回与COM接口一致的字段：
+    target、arguments、working_dir，以及 icon_location、icon_index、relative_path
+    无法得到目标路径时抛出LnkFormatError
+    """
+    if len(data) < HEADER_SIZE or data[4:20] != LINK_CLSID:
+        raise LnkFormatError("不是有效的快捷方式文件")
+
+    header_size, = struct.unpack_from("<I", data, 0)
+    flags, = struct.unpack_from("<I", data, 0x14)
+    icon_index, = struct.unpack_from("<i", data, 0x38)
+    if header_size != HEADER_SIZE:
+        raise LnkFormatError("快捷方式头部大小错误")
+
+    offset = HEADER_SIZE
+    id_list_target = None
+    if flags & HAS_LINK_TARGET_ID_LIST:
+        id_list_target, offset = _parse_id_list(data, offset)
+
+    link_info_target = None
+    if flags & HAS_LINK_INFO:
+        link_info_target, offset = _parse_link_info(data, offset)
+        # ForceNoLinkInfo 时结构仍存在，但其中的路径不可用
+        if flags & FORCE_NO_LINK_INFO:
+            link_info_target = None
+
+    # StringData，按固定顺序出现
+    strings = {}
+    for flag, key in ((HAS_NAME, 'name'), (HAS_RELATIVE_PATH, 'relative_path'),
+                      (HAS_WORKING_DIR, 'working_dir'), (HAS_ARGUMENTS, 'arguments'),
+                      (HAS_ICON_LOCATION, 'icon_location')):
+        if not flags & flag:
+            continue
+        count, = struct.unpack_from("<H", data, offset)
+        offset += 2
+        if flags & IS_UNICODE:
+            raw = data[offset:offset + count * 2]
+            offset += count * 2
+            strings[key] = raw.decode("utf-16-le", errors="replace")
+        else:
+            raw = data[offset:offset + count]
+            offset += count
+            strings[key] = raw.decode(ANSI_ENCODING, errors="replace")
+
+    extra = _parse_extra_data(data, offset)
+
+    target = link_info_target or id_list_target
+    if not target and ENVIRONMENT_VARIABLE_DATA_BLOCK in extra:
+        target = os.path.expandvars(extra[ENVIRONMENT_VARIABLE_DATA_BLOCK])
+    if not target:
+        raise LnkFormatError("无法确定快捷方式目标")
+
+    return {
+        'target': target,
+        'arguments': strings.get('arguments', ''),
+        'working_dir': strings.get('working_dir', ''),
+        'icon_location': strings.get('icon_location', ''),
+        'icon_index': icon_index,
+        'relative_path': strings.get('relative_path', ''),
+    }
+
+
+def parse_lnk(lnk_path):
+    """解析单个快捷方式文件，无法解码时返回None"""
+    try:
+        with open(lnk_path, 'rb') as f:
+            data = f.read()
+        return parse_lnk_bytes(data)
+    except (OSError, LnkFormatError, struct.error, ValueError, IndexError):
+        return None
+
+
+def parse_lnk_batch(lnk_paths):
+    """批量解析快捷方式，返回 {路径: 解析结果或None}"""
+    return {path: parse_lnk(path) for path in lnk_paths}
+
+
+if __name__ == "__main__":
+    import time
+
+    if len(sys.argv) > 1:
+        paths = sys.argv[1:]
+    else:
+        root = input("请输入快捷方式目录: ").replace("\"", "").strip()
+        paths = [os.path.join(dirpath, f)
+                 for dirpath, _, files in os.walk(root)
+                 for f in files if f.lower().endswith('.lnk')]
+
+    start = time.perf_counter()
+    results = parse_lnk_batch(paths)
+    elapsed = time.perf_counter() - start
+
+    for path, info in results.items():
+        print(f"{path}\n    -> {info['target'] if info else '解析失败'}")
+    print(f"共解析 {len(results)} 个快捷方式，耗时 {elapsed * 1000:.2f} ms")
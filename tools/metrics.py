@@ -0,0 +1,164 @@
+"""
+运行时指标
+界面线程上的关键操作（显示、搜索、缩放、窗口大小变化后的重新排列）按名称记录耗时，
+每项保留最近若干次的滚动直方图，可随时取得最近一次、p50、p95 和最长耗时，以及超过卡顿阈值的次数；
+始终开启，每次记录只有两次计时和一次 deque.append 的开销
+F12 显示的调试浮层（tools/metrics_overlay.py）、常驻实例的 metrics 命令和 --metrics-dump 输出的JSON都取自这里
+"""
+import json
+import os
+import time
+from collections import deque
+
+METRICS_ENV = "APP_LAUNCHER_METRICS"
+DEFAULT_METRICS_PATH = os.path.join("profile", "metrics.json")
+WINDOW = 256  # 每项保留的最近样本数
+STALL_MS = 50.0  # 超过这个耗时的界面线程操作记为一次卡顿（约三帧）
+
+
+class RollingHistogram:
+    """最近 window 个样本（毫秒）的滚动直方图"""
+
+    def __init__(self, window=WINDOW, stall_ms=STALL_MS):
+        self.samples = deque(maxlen=window)
+        self.stall_ms = stall_ms
+        self.count = 0  # 累计样本数（包括已滚出窗口的）
+        self.stalls = 0  # 累计卡顿次数
+        self.last = 0.0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.last = value
+        if value >= self.stall_ms:
+            self.stalls += 1
+
+    def percentile(self, p):
+        """窗口内样本的第 p 百分位数（最近秩法），没有样本时返回0"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        # 第 ceil(p% × n) 个样本；整数运算，避免浮点误差和 round() 的四舍六入五成双
+        rank = -(-p * len(ordered) // 100)
+        return ordered[max(0, min(len(ordered), rank) - 1)]
+
+    def buckets(self, bounds=(1, 2, 4, 8, 16, 33, 50, 100, 250)):
+        """窗口内样本按上界分桶的个数 {上界: 个数}，最后一个桶的上界为 'inf'"""
+        counts = dict.fromkeys(list(bounds) + ['inf'], 0)
+        for value in self.samples:
+            for bound in bounds:
+                if value <= bound:
+                    counts[bound] += 1
+                    break
+            else:
+                counts['inf'] += 1
+        return counts
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'last_ms': round(self.last, 3),
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'max_ms': round(max(self.samples, default=0.0), 3),
+            'stalls': self.stalls,
+            'buckets': self.buckets(),
+        }
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.add((time.perf_counter_ns() - self.start) / 1e6)
+        return False
+
+
+class Metrics:
+    def __init__(self):
+        self.histograms = {}  # {名称: RollingHistogram}
+        self.counters = {}  # {名称: 次数}
+        self.dump_path = None  # 开启 --metrics-dump 时输出的JSON路径
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = RollingHistogram()
+        return histogram
+
+    def timer(self, name):
+        """用法: with metrics.timer("display_apps"): ..."""
+        return _Timer(self.histogram(name))
+
+    def observe(self, name, value):
+        """直接记录一个以毫秒为单位的样本"""
+        self.histogram(name).add(value)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self, **gauges):
+        """全部指标的汇总，gauges 为调用方提供的即时数值（控件数、图标字节数等）"""
+        return {
+            'time': time.time(),
+            'timings': {name: histogram.summary() for name, histogram in sorted(self.histograms.items())},
+            'counters': dict(sorted(self.counters.items())),
+            'gauges': gauges,
+        }
+
+    def write(self, report, path=None):
+        """原子地写出JSON"""
+        path = path or self.dump_path
+        if not path:
+            return
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"写入运行时指标失败: {e}")
+
+
+def format_report(report):
+    """把 report() 的结果排成文本，用于调试浮层和命令行输出"""
+    lines = [f"{'操作':<16}{'最近':>9}{'p95':>9}{'最长':>9}{'次数':>7}{'卡顿':>6}"]
+    for name, timing in report['timings'].items():
+        lines.append(f"{name:<16}{timing['last_ms']:>9.2f}{timing['p95_ms']:>9.2f}{timing['max_ms']:>9.2f}"
+                     f"{timing['count']:>7}{timing['stalls']:>6}")
+    for name, value in report['counters'].items():
+        lines.append(f"{name}: {value}")
+    for name, value in report['gauges'].items():
+        if isinstance(value, dict):
+            lines.append(f"{name}:")
+            lines.extend(f"  {key}: {item}" for key, item in value.items())
+        else:
+            lines.append(f"{name}: {value}")
+    return "\n".join(lines)
+
+
+metrics = Metrics()
+
+
+def configure(argv):
+    """根据命令行参数 --metrics-dump[=路径] 或环境变量开启定时输出，并从argv中去掉该参数"""
+    path = os.environ.get(METRICS_ENV)
+    if path in ("1", "true", "on"):
+        path = DEFAULT_METRICS_PATH
+    for arg in list(argv[1:]):
+        if arg == "--metrics-dump" or arg.startswith("--metrics-dump="):
+            path = arg.partition("=")[2] or DEFAULT_METRICS_PATH
+            argv.remove(arg)
+    metrics.dump_path = path or None
+    return metrics.dump_path is not None
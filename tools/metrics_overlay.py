@@ -0,0 +1,76 @@
+"""
+运行时指标的调试浮层（F12 切换）
+半透明的文字浮层叠在窗口右上角，不接收鼠标事件，显示期间每半秒刷新一次；
+EventLoopProbe 用一个固定间隔的定时器测量事件循环的延迟，任何阻塞界面线程的操作都会体现为一次卡顿
+"""
+import time
+
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QObject, QTimer
+
+from tools.metrics import STALL_MS, format_report, metrics
+
+PROBE_INTERVAL_MS = 100
+
+
+class EventLoopProbe(QObject):
+    """定时器实际触发时间比预期晚多少毫秒，记为 event_loop_lag"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.setInterval(PROBE_INTERVAL_MS)
+        self.timer.timeout.connect(self.on_timeout)
+        self.expected = 0.0
+
+    def start(self):
+        if not self.timer.isActive():
+            self.expected = time.perf_counter() + PROBE_INTERVAL_MS / 1000
+            self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def on_timeout(self):
+        now = time.perf_counter()
+        metrics.observe("event_loop_lag", max(0.0, (now - self.expected) * 1000))
+        self.expected = now + PROBE_INTERVAL_MS / 1000
+
+
+class MetricsOverlay(QLabel):
+    def __init__(self, source, parent):
+        """source() 返回 metrics.report(...) 的结果"""
+        super().__init__(parent)
+        self.source = source
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setFont(QFont("Consolas", 9))
+        self.setTextFormat(Qt.TextFormat.PlainText)
+        self.setStyleSheet("background-color: rgba(17, 24, 39, 0.85); color: #E5E7EB; "
+                           "border-radius: 6px; padding: 8px;")
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(500)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.refresh_timer.stop()
+            self.hide()
+        else:
+            self.show()
+            self.refresh()
+            self.refresh_timer.start()
+
+    def refresh(self):
+        report = self.source()
+        stalled = any(timing['last_ms'] >= STALL_MS for timing in report['timings'].values())
+        # 最近一次操作卡顿时边框变红，便于在操作的同时发现
+        self.setStyleSheet("background-color: rgba(17, 24, 39, 0.85); color: #E5E7EB; border-radius: 6px; "
+                           f"padding: 8px; border: 2px solid {'#DC2626' if stalled else 'transparent'};")
+        self.setText(format_report(report))
+        self.adjustSize()
+        parent = self.parentWidget()
+        self.move(max(0, parent.width() - self.width() - 12), 12)
+        self.raise_()
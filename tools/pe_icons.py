@@ -0,0 +1,206 @@
+"""
+纯Python的PE图标读取
+用mmap打开 .exe/.dll，沿资源目录找到第一个 RT_GROUP_ICON 图标组，按目标尺寸选出最合适的 RT_ICON 帧，
+返回帧的原始数据（PNG或DIB），不需要GDI和窗口句柄，可以在任意线程、子进程和Linux上运行
+"""
+import mmap
+import struct
+import sys
+
+RT_ICON = 3
+RT_GROUP_ICON = 14
+
+_MAX_ENTRIES = 4096  # 资源目录项数的上限，防止损坏的文件导致长时间循环
+
+
+class PEFormatError(ValueError):
+    """文件不是有效的PE文件，或资源目录已损坏"""
+
+
+class _PEImage:
+    """只读的PE映像，负责边界检查和 RVA 到文件偏移的转换"""
+
+    def __init__(self, data):
+        self.data = data
+        self.size = len(data)
+        if self.size < 64 or data[:2] != b"MZ":
+            raise PEFormatError("缺少MZ头")
+        pe_offset = self.u32(0x3C)
+        if self.bytes(pe_offset, 4) != b"PE\0\0":
+            raise PEFormatError("缺少PE签名")
+
+        coff = pe_offset + 4
+        section_count = self.u16(coff + 2)
+        optional_size = self.u16(coff + 16)
+        optional = coff + 20
+        magic = self.u16(optional)
+        if magic == 0x10B:  # PE32
+            directory_count_offset, directories = optional + 92, optional + 96
+        elif magic == 0x20B:  # PE32+
+            directory_count_offset, directories = optional + 108, optional + 112
+        else:
+            raise PEFormatError(f"未知的可选头类型: {magic:#x}")
+
+        self.sections = []  # [(虚拟地址, 虚拟大小, 文件偏移, 文件中的大小)]
+        section_table = optional + optional_size
+        for i in range(section_count):
+            entry = section_table + i * 40
+            virtual_size, virtual_address, raw_size, raw_offset = struct.unpack_from(
+                "<IIII", self.bytes(entry + 8, 16))
+            self.sections.append((virtual_address, max(virtual_size, raw_size), raw_offset, raw_size))
+
+        self.resource_rva = 0
+        if self.u32(directory_count_offset) > 2:
+            self.resource_rva, _ = struct.unpack_from("<II", self.bytes(directories + 2 * 8, 8))
+
+    def bytes(self, offset, length):
+        if offset < 0 or length < 0 or offset + length > self.size:
+            raise PEFormatError("读取超出文件范围")
+        return self.data[offset:offset + length]
+
+    def u16(self, offset):
+        return struct.unpack_from("<H", self.bytes(offset, 2))[0]
+
+    def u32(self, offset):
+        return struct.unpack_from("<I", self.bytes(offset, 4))[0]
+
+    def rva_to_offset(self, rva):
+        for virtual_address, virtual_size, raw_offset, raw_size in self.sections:
+            if virtual_address <= rva < virtual_address + virtual_size:
+                delta = rva - virtual_address
+                if delta >= raw_size:
+                    break  # 未初始化的数据不在文件中
+                return raw_offset + delta
+        raise PEFormatError(f"RVA不在任何节中: {rva:#x}")
+
+    def resource_entries(self, directory_offset):
+        """资源目录的条目 [(名称或ID, 是否为子目录, 相对资源节起始的偏移)]，命名条目在前、ID条目按ID升序"""
+        base = self.rva_to_offset(self.resource_rva)
+        named, ids = struct.unpack_from("<HH", self.bytes(base + directory_offset + 12, 4))
+        count = named + ids
+        if count > _MAX_ENTRIES:
+            raise PEFormatError("资源目录项过多")
+        entries = []
+        for i in range(count):
+            name, target = struct.unpack_from("<II", self.bytes(base + directory_offset + 16 + i * 8, 8))
+            entries.append((name if not name & 0x80000000 else None, bool(target & 0x80000000),
+                            target & 0x7FFFFFFF))
+        return entries
+
+    def resource_data(self, entry_offset):
+        """资源数据项指向的原始字节"""
+        base = self.rva_to_offset(self.resource_rva)
+        data_rva, size = struct.unpack_from("<II", self.bytes(base + entry_offset, 8))
+        return self.bytes(self.rva_to_offset(data_rva), size)
+
+    def resources(self, resource_type):
+        """某种类型的全部资源 [(名称或ID, 数据)]，每个资源取第一种语言"""
+        if not self.resource_rva:
+            return []
+        for type_id, is_directory, offset in self.resource_entries(0):
+            if type_id == resource_type and is_directory:
+                break
+        else:
+            return []
+
+        resources = []
+        for name, is_directory, name_offset in self.resource_entries(offset):
+            data_offset = name_offset
+            depth = 0
+            while is_directory and depth < 2:  # 名称 -> 语言 -> 数据
+                languages = self.resource_entries(data_offset)
+                if not languages:
+                    break
+                _, is_directory, data_offset = languages[0]
+                depth += 1
+            if not is_directory:
+                resources.append((name, self.resource_data(data_offset)))
+        return resources
+
+
+def _parse_group(data):
+    """解析 GRPICONDIR，返回 [(宽, 高, 位深, RT_ICON的ID)]，宽高为0表示256"""
+    if len(data) < 6:
+        raise PEFormatError("图标组数据不完整")
+    _, icon_type, count = struct.unpack_from("<HHH", data)
+    if icon_type != 1 or len(data) < 6 + count * 14:
+        raise PEFormatError("图标组数据不完整")
+    frames = []
+    for i in range(count):
+        width, height, _, _, _, bit_count, _, icon_id = struct.unpack_from("<BBBBHHIH", data, 6 + i * 14)
+        frames.append((width or 256, height or 256, bit_count, icon_id))
+    return frames
+
+
+def choose_frame(frames, size):
+    """不小于目标尺寸的最小一帧优先（缩小比放大清晰），没有时取最大的一帧；同尺寸取位深最高的"""
+    if not frames:
+        return None
+    larger = [frame for frame in frames if frame[0] >= size]
+    if larger:
+        return min(larger, key=lambda frame: (frame[0], -frame[2]))
+    return max(frames, key=lambda frame: (frame[0], frame[2]))
+
+
+def read_icon_frame(path, size=64):
+    """
+    读取程序第一个图标组中最适合 size 的一帧，返回 (宽, 高, 帧数据)，帧数据为PNG或不带文件头的DIB；
+    文件中没有图标时返回None，不是有效的PE文件时抛出 PEFormatError
+    """
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # 空文件
+            raise PEFormatError("文件为空")
+    with data:
+        image = _PEImage(data)
+        groups = image.resources(RT_GROUP_ICON)
+        if not groups:
+            return None
+        icons = {icon_id: frame for icon_id, frame in image.resources(RT_ICON) if icon_id is not None}
+        # 资源管理器使用的图标是第一个图标组；组中引用了不存在的帧时跳过
+        frames = [frame for frame in _parse_group(groups[0][1]) if frame[3] in icons]
+        frame = choose_frame(frames, size)
+        if frame is None:
+            return None
+        return frame[0], frame[1], bytes(icons[frame[3]])
+
+
+def frame_to_ico(width, height, frame):
+    """把一帧包装成只含这一帧的 .ico 文件，便于交给图像库解码"""
+    if frame[:8] == b"\x89PNG\r\n\x1a\n":
+        bit_count = 32
+    else:
+        bit_count = struct.unpack_from("<H", frame, 14)[0] if len(frame) >= 16 else 32
+    header = struct.pack("<HHH", 0, 1, 1)
+    entry = struct.pack("<BBBBHHII", width % 256, height % 256, 0, 0, 1, bit_count, len(frame), 6 + 16)
+    return header + entry + frame
+
+
+def load_icon_buffer(path, size=64):
+    """读取程序图标并解码为预乘BGRA的 IconBuffer（tools/icon_buffer.py），没有图标或无法解码时返回None"""
+    from tools.icon_buffer import decode_image
+
+    result = read_icon_frame(path, size)
+    if result is None:
+        return None
+    width, height, frame = result
+    if frame[:8] == b"\x89PNG\r\n\x1a\n":
+        return decode_image(frame, "PNG")
+    # DIB帧（含各种位深、调色板和AND掩码）交给ICO解码器处理
+    return decode_image(frame_to_ico(width, height, frame), "ICO")
+
+
+if __name__ == "__main__":
+    # 列出程序中第一个图标组的各帧：python tools/pe_icons.py C:\path\to\app.exe
+    for exe_path in sys.argv[1:]:
+        try:
+            with open(exe_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                pe = _PEImage(data)
+                groups = pe.resources(RT_GROUP_ICON)
+                print(f"{exe_path}: {len(groups)} 个图标组")
+                if groups:
+                    for width, height, bit_count, icon_id in _parse_group(groups[0][1]):
+                        print(f"  {width}x{height} {bit_count}位 (RT_ICON {icon_id})")
+        except (OSError, ValueError) as e:
+            print(f"{exe_path}: 读取失败: {e}")
@@ -0,0 +1,225 @@
+"""
+启动目标的页缓存预热
+开机后第一次启动大型程序（Keil、STM32CubeMX等）时，大部分时间花在从磁盘读取程序和DLL/jar上；
+启动器空闲时在一个低优先级的后台线程中把常用和收藏应用的目标程序及同目录的依赖文件预先读入系统页缓存，
+之后的启动直接从内存读取。有每轮的字节预算和速率限制，用户操作时立即暂停，不与前台的读写争抢磁盘：
+- Linux等支持 posix_fadvise 的系统按块发出 POSIX_FADV_WILLNEED，由内核异步预读，不复制数据
+- Windows上以后台模式（THREAD_MODE_BACKGROUND_BEGIN，降低I/O优先级）顺序读取
+Windows目录（%SystemRoot%、%WINDIR%）下的程序和DLL由系统自己维护缓存（SysMain），不预热
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+CHUNK_BYTES = 1024 * 1024
+DEPENDENCY_EXTENSIONS = ('.dll', '.jar', '.pak', '.so', '.pyd')  # 与目标程序一起加载的文件
+DEPENDENCY_SUBDIRS = ('lib', 'bin')  # 也查看目标程序目录下的这些子目录
+REWARM_SECONDS = 3600  # 预热过的文件在这段时间内不再重复读取（之后可能已被挤出页缓存）
+
+
+def system_directories():
+    """不预热的系统目录：环境变量 SystemRoot 和 WINDIR 指向的Windows目录（规范化后的绝对路径）"""
+    directories = []
+    for variable in ("SystemRoot", "WINDIR"):
+        value = os.environ.get(variable)
+        if value:
+            directory = os.path.normcase(os.path.abspath(value)).rstrip(os.sep)
+            if directory not in directories:
+                directories.append(directory)
+    return directories
+
+
+def in_directories(path, directories):
+    """path 是否在 directories 中的某个目录下"""
+    path = os.path.normcase(os.path.abspath(path))
+    return any(path.startswith(directory + os.sep) for directory in directories)
+
+
+def target_files(target_path, max_bytes, excluded_dirs=None):
+    """
+    目标程序和它旁边的依赖文件 [(路径, 大小)]，目标程序在前、依赖按从大到小，合计不超过 max_bytes；
+    excluded_dirs（默认为 system_directories()）下的目标和依赖不预热
+    """
+    if excluded_dirs is None:
+        excluded_dirs = system_directories()
+    if in_directories(os.path.realpath(target_path), excluded_dirs):
+        return []
+    try:
+        files = [(target_path, os.path.getsize(target_path))]
+    except OSError:
+        return []
+    directory = os.path.dirname(target_path)
+    dependencies = []
+    for folder in [directory] + [os.path.join(directory, name) for name in DEPENDENCY_SUBDIRS]:
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if (entry.name.lower().endswith(DEPENDENCY_EXTENSIONS) and entry.is_file()
+                            and not in_directories(os.path.realpath(entry.path), excluded_dirs)):
+                        dependencies.append((entry.path, entry.stat().st_size))
+        except OSError:
+            continue
+    # 大文件更可能是启动时的瓶颈
+    dependencies.sort(key=lambda item: -item[1])
+
+    selected, total = [], 0
+    for path, size in files + dependencies:
+        if total + size > max_bytes:
+            continue
+        selected.append((path, size))
+        total += size
+    return selected
+
+
+def lower_thread_priority():
+    """把当前线程的CPU和I/O优先级降到最低"""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+        elif hasattr(os, "setpriority") and hasattr(threading, "get_native_id"):
+            # Linux上 setpriority 对线程ID只影响这个线程，I/O调度优先级随nice值降低
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except Exception as e:
+        print(f"降低预热线程优先级失败: {e}")
+
+
+class Prewarmer:
+    def __init__(self, budget_bytes=256 * 1024 * 1024, rate_bytes=32 * 1024 * 1024,
+                 per_target_bytes=128 * 1024 * 1024):
+        """
+        budget_bytes: 每一轮（submit 之后）最多读取的字节数
+        rate_bytes: 每秒最多读取的字节数
+        per_target_bytes: 每个目标程序及其依赖最多读取的字节数
+        """
+        self.budget_bytes = budget_bytes
+        self.rate_bytes = rate_bytes
+        self.per_target_bytes = per_target_bytes
+        self.queue = deque()  # 待预热的目标程序
+        self.lock = threading.Lock()
+        self.running = threading.Event()  # 未暂停
+        self.wake = threading.Condition(self.lock)
+        self.stopped = False
+        self.thread = None
+        self.warmed = {}  # {文件路径: (修改时间, 预热时间)}
+        self.round_bytes = 0
+        self.warmed_bytes = 0  # 累计预热的字节数
+        self.warmed_files = 0
+        self.warmed_targets = 0
+        self.budget_exhausted = 0  # 因预算用完而提前结束的轮数
+
+    def submit(self, targets):
+        """开始新的一轮：按顺序预热这些目标程序（已在队列中的会被替换）"""
+        with self.lock:
+            self.queue = deque(dict.fromkeys(targets))
+            self.round_bytes = 0
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="prewarm", daemon=True)
+                self.thread.start()
+            self.wake.notify()
+
+    def pause(self):
+        """用户操作时暂停，正在读取的块读完后停下"""
+        self.running.clear()
+
+    def resume(self):
+        self.running.set()
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            self.queue.clear()
+            self.wake.notify()
+        self.running.set()
+
+    def stats(self):
+        return {
+            'warmed_bytes': self.warmed_bytes,
+            'warmed_files': self.warmed_files,
+            'warmed_targets': self.warmed_targets,
+            'pending_targets': len(self.queue),
+            'budget_exhausted': self.budget_exhausted,
+        }
+
+    def _run(self):
+        lower_thread_priority()
+        while True:
+            with self.lock:
+                while not self.queue and not self.stopped:
+                    self.wake.wait()
+                if self.stopped:
+                    return
+                target_path = self.queue.popleft()
+            self.running.wait()
+            self._warm_target(target_path)
+            if not self.queue and self.round_bytes:
+                print(f"预热完成: 本轮 {self.round_bytes / 1048576:.1f} MB，"
+                      f"累计 {self.warmed_files} 个文件 {self.warmed_bytes / 1048576:.1f} MB")
+
+    def _warm_target(self, target_path):
+        remaining = self.budget_bytes - self.round_bytes
+        if remaining <= 0:
+            with self.lock:
+                if self.queue:
+                    self.budget_exhausted += 1
+                self.queue.clear()
+            return
+        now = time.time()
+        for path, size in target_files(target_path, min(self.per_target_bytes, remaining)):
+            if self.stopped:
+                return
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            previous = self.warmed.get(path)
+            if previous and previous[0] == mtime and now - previous[1] < REWARM_SECONDS:
+                continue
+            try:
+                warmed = self._warm_file(path, size)
+            except OSError as e:
+                print(f"预热文件失败: {e}")
+                continue
+            self.warmed[path] = (mtime, time.time())
+            self.round_bytes += warmed
+            self.warmed_bytes += warmed
+            self.warmed_files += 1
+        self.warmed_targets += 1
+
+    def _throttle(self, chunk_started, length):
+        """按速率限制在每块之后等待，暂停时在这里停下"""
+        delay = length / self.rate_bytes - (time.perf_counter() - chunk_started)
+        if delay > 0:
+            time.sleep(delay)
+        self.running.wait()
+
+    def _warm_file(self, path, size):
+        """把一个文件读入页缓存，返回处理的字节数"""
+        done = 0
+        if hasattr(os, "posix_fadvise"):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                while done < size and not self.stopped:
+                    chunk_started = time.perf_counter()
+                    length = min(CHUNK_BYTES, size - done)
+                    os.posix_fadvise(fd, done, length, os.POSIX_FADV_WILLNEED)
+                    done += length
+                    self._throttle(chunk_started, length)
+            finally:
+                os.close(fd)
+            return done
+
+        buffer = bytearray(CHUNK_BYTES)
+        with open(path, 'rb', buffering=0) as f:
+            while not self.stopped:
+                chunk_started = time.perf_counter()
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                done += read
+                self._throttle(chunk_started, read)
+        return done
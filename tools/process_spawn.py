@@ -0,0 +1,132 @@
+"""
+创建应用进程
+按Windows命令行规则拆分快捷方式参数，使用快捷方式的工作目录，子进程与启动器分离；
+控制台程序（PE可选头中的子系统为 IMAGE_SUBSYSTEM_WINDOWS_CUI）和批处理文件在新的控制台窗口中运行，
+其他程序不分配控制台；不依赖Qt，界面和命令行模式共用
+"""
+import os
+import struct
+import subprocess
+import sys
+
+IMAGE_SUBSYSTEM_WINDOWS_CUI = 3
+CONSOLE_SCRIPT_EXTENSIONS = ('.bat', '.cmd')
+
+if sys.platform == "win32":
+    DETACH_FLAGS = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    CONSOLE_FLAGS = subprocess.CREATE_NEW_CONSOLE | subprocess.CREATE_NEW_PROCESS_GROUP
+else:
+    DETACH_FLAGS = CONSOLE_FLAGS = 0
+
+
+def split_arguments(arguments):
+    """
+    按 CommandLineToArgvW 的规则拆分参数字符串：空白分隔，双引号包裹含空格的参数，
+    2n个反斜杠加引号得到n个反斜杠，2n+1个反斜杠加引号得到n个反斜杠和一个字面引号，"" 在引号内表示一个引号
+    """
+    args = []
+    current = ""
+    in_arg = False
+    in_quotes = False
+    i = 0
+    length = len(arguments)
+    while i < length:
+        ch = arguments[i]
+        if ch in " \t" and not in_quotes:
+            if in_arg:
+                args.append(current)
+                current = ""
+                in_arg = False
+            i += 1
+            continue
+
+        in_arg = True
+        if ch == "\\":
+            end = i
+            while end < length and arguments[end] == "\\":
+                end += 1
+            count = end - i
+            if end < length and arguments[end] == '"':
+                current += "\\" * (count // 2)
+                if count % 2:
+                    current += '"'
+                    end += 1
+            else:
+                current += "\\" * count
+            i = end
+        elif ch == '"':
+            if in_quotes and i + 1 < length and arguments[i + 1] == '"':
+                current += '"'
+                i += 1
+            else:
+                in_quotes = not in_quotes
+            i += 1
+        else:
+            current += ch
+            i += 1
+
+    if in_arg:
+        args.append(current)
+    return args
+
+
+def working_directory(target_path, working_dir):
+    """快捷方式指定的工作目录不存在时使用目标程序所在目录"""
+    working_dir = os.path.expandvars(working_dir or "")
+    if working_dir and os.path.isdir(working_dir):
+        return working_dir
+    directory = os.path.dirname(target_path)
+    return directory if os.path.isdir(directory) else None
+
+
+def pe_subsystem(path):
+    """读取PE可选头中的子系统（2为图形界面，3为控制台），不是PE文件或无法读取时返回None"""
+    try:
+        with open(path, 'rb') as f:
+            dos_header = f.read(0x40)
+            if dos_header[:2] != b"MZ" or len(dos_header) < 0x40:
+                return None
+            pe_offset, = struct.unpack_from("<I", dos_header, 0x3C)
+            # PE签名、COFF头（20字节）和可选头中 Subsystem 之前的部分
+            if pe_offset + 24 + 70 > os.fstat(f.fileno()).st_size:
+                return None
+            f.seek(pe_offset)
+            header = f.read(24 + 70)
+        if header[:4] != b"PE\0\0":
+            return None
+        # Subsystem 在PE32和PE32+的可选头中偏移都是68
+        subsystem, = struct.unpack_from("<H", header, 24 + 68)
+        return subsystem
+    except (OSError, struct.error):
+        return None
+
+
+def needs_console(target_path):
+    """目标是否需要控制台窗口：控制台子系统的程序和批处理文件"""
+    if target_path.lower().endswith(CONSOLE_SCRIPT_EXTENSIONS):
+        return True
+    return pe_subsystem(target_path) == IMAGE_SUBSYSTEM_WINDOWS_CUI
+
+
+def spawn(target_path, arguments="", working_dir=""):
+    """创建与启动器分离的子进程"""
+    command = [target_path] + split_arguments(arguments)
+    kwargs = {
+        'cwd': working_directory(target_path, working_dir),
+        'stdin': subprocess.DEVNULL,
+        'stdout': subprocess.DEVNULL,
+        'stderr': subprocess.DEVNULL,
+        'close_fds': True,
+    }
+    if sys.platform == "win32":
+        if needs_console(target_path):
+            # 分离的进程没有控制台，控制台程序会立即退出或看不到输出；改为打开新的控制台，
+            # 标准输入输出使用这个控制台，不再重定向
+            kwargs['creationflags'] = CONSOLE_FLAGS
+            for stream in ('stdin', 'stdout', 'stderr'):
+                del kwargs[stream]
+        else:
+            kwargs['creationflags'] = DETACH_FLAGS
+    else:
+        kwargs['start_new_session'] = True
+    subprocess.Popen(command, **kwargs)
@@ -0,0 +1,402 @@
+"""
+应用搜索索引
+对应用名称、名称的拼音全拼和首字母、目标程序名、分类名建立前缀/词首/二元组/单字符倒排索引，
+查询时直接取出候选集合，不再逐个扫描全部应用；结果按 前缀 > 词首 > 子串 > 模糊 排序
+"""
+import os
+import re
+
+
+PREFIX_LENGTH = 4  # 前缀索引记录的最大前缀长度，更长的查询改由二元组候选逐个校验
+INCREMENTAL_LIMIT = 1024  # 上一次结果不超过这个数量时，追加输入直接在上次结果中校验
+FUZZY_LIMIT = 500  # 精确匹配已经这么多时不再做模糊匹配
+
+# 匹配类型，数值越小排名越靠前
+MATCH_PREFIX = 0
+MATCH_WORD_START = 1
+MATCH_SUBSTRING = 2
+MATCH_FUZZY = 3
+
+# 字段分组：名称（含拼音）优先于目标程序名和分类名
+GROUP_NAME = 0
+GROUP_EXTRA = 1
+
+# 排名按 (匹配类型, 字段分组) 从好到差的顺序
+RANK_ORDER = [(kind, group) for kind in (MATCH_PREFIX, MATCH_WORD_START, MATCH_SUBSTRING, MATCH_FUZZY)
+              for group in (GROUP_NAME, GROUP_EXTRA)]
+
+SEPARATOR = "\x00"  # 拼接文本中各字段的分隔符
+
+_lazy_pinyin = None  # 第一次需要拼音时才导入pypinyin（导入需要几百毫秒），未安装时为False
+
+
+def _is_cjk(ch):
+    return '一' <= ch <= '鿿'
+
+
+def _word_starts(text):
+    """词首位置：开头、分隔符之后、小写到大写、中英文交界"""
+    starts = [0]
+    for i in range(1, len(text)):
+        prev, ch = text[i - 1], text[i]
+        if not ch.isalnum():
+            continue
+        if not prev.isalnum() or (prev.islower() and ch.isupper()) or _is_cjk(prev) != _is_cjk(ch):
+            starts.append(i)
+    return starts
+
+
+def _pinyin_segments(name):
+    """与lazy_pinyin的输出一一对应：每个汉字一项(True)，连续的非汉字合为一项(False)"""
+    segments = []
+    for ch in name:
+        if _is_cjk(ch):
+            segments.append(True)
+        elif not segments or segments[-1]:
+            segments.append(False)
+    return segments
+
+
+def _pinyin(name):
+    """名称的拼音，每个汉字一项；未安装pypinyin时返回None"""
+    global _lazy_pinyin
+    if _lazy_pinyin is None:
+        try:
+            from pypinyin import lazy_pinyin
+            _lazy_pinyin = lazy_pinyin
+        except ImportError:  # 未安装pypinyin时不支持拼音搜索
+            _lazy_pinyin = False
+    return _lazy_pinyin(name) if _lazy_pinyin else None
+
+
+def _pinyin_fields(name):
+    """返回 [(拼音全拼, 词首位置), (拼音首字母, 词首位置)]，名称不含汉字时返回空列表"""
+    if not any(_is_cjk(ch) for ch in name):
+        return []
+    tokens = _pinyin(name)
+    if tokens is None:
+        return []
+
+    full, initials = "", ""
+    full_starts, initial_starts = [], []
+    for token, is_hanzi in zip(tokens, _pinyin_segments(name)):
+        token = token.lower()
+        if not token.strip():
+            continue
+        if is_hanzi:
+            # 一个汉字对应一个音节：全拼中音节开头是词首，首字母中每个字母都是词首
+            full_starts.append(len(full))
+            initial_starts.append(len(initials))
+            full += token
+            initials += token[0]
+        else:
+            # 非汉字片段原样保留
+            full_starts.extend(len(full) + i for i in _word_starts(token))
+            initial_starts.extend(len(initials) + i for i in _word_starts(token))
+            full += token
+            initials += token
+    return [(full, full_starts), (initials, initial_starts)]
+
+
+def _record(fields):
+    """
+    一组字段的校验记录 (拼接文本, 词首后缀拼接文本)
+    每段以分隔符开头，分隔符+查询 出现在其中即为前缀/词首匹配，校验只需几次 in 判断
+    """
+    joined = "".join(SEPARATOR + text for text, _ in fields)
+    word_joined = "".join(SEPARATOR + text[start:] for text, starts in fields for start in starts)
+    return joined, word_joined
+
+
+def _record_keys(record):
+    """由校验记录得到索引键：(前缀, 词首前缀, 二元组, 单字符)"""
+    joined, word_joined = record
+    texts = joined.split(SEPARATOR)[1:]
+    prefixes = {text[:length] for text in texts for length in range(1, min(PREFIX_LENGTH, len(text)) + 1)}
+    word_prefixes = {suffix[:length] for suffix in word_joined.split(SEPARATOR)[1:]
+                     for length in range(1, min(PREFIX_LENGTH, len(suffix)) + 1)}
+    grams = {text[i:i + 2] for text in texts for i in range(len(text) - 1)}
+    chars = set("".join(texts))
+    return prefixes, word_prefixes, grams, chars
+
+
+def search_entry(app):
+    """
+    计算一个应用的索引条目 (校验键, (名称组记录, 其他组记录))
+    拼音转换是建索引时最慢的部分；这里只依赖名称、目标和分类，不涉及Qt，
+    可以在后台线程中预先计算后放入 app['search_entry']
+    """
+    name = app['name']
+    name_fields = [(name.lower(), _word_starts(name))] + _pinyin_fields(name)
+
+    target_name = os.path.splitext(os.path.basename(app['target'].replace("\\", "/")))[0]
+    category = app['category']
+    extra_fields = [(target_name.lower(), _word_starts(target_name)),
+                    (category.lower(), _word_starts(category))] + _pinyin_fields(category)
+
+    return (name, app['target'], category), (_record(name_fields), _record(extra_fields))
+
+
+class _FieldGroup:
+    """一组字段的倒排索引"""
+
+    def __init__(self):
+        self.prefixes = {}  # {前缀: {应用id}}
+        self.word_prefixes = {}  # {词首开始的前缀: {应用id}}
+        self.grams = {}  # {二元组: {应用id}}
+        self.chars = {}  # {单字符: {应用id}}
+
+    def _indexes(self):
+        return self.prefixes, self.word_prefixes, self.grams, self.chars
+
+    def add(self, app_id, record):
+        for index, keys in zip(self._indexes(), _record_keys(record)):
+            for key in keys:
+                ids = index.get(key)
+                if ids is None:
+                    index[key] = {app_id}
+                else:
+                    ids.add(app_id)
+
+    def remove(self, app_id, record):
+        for index, keys in zip(self._indexes(), _record_keys(record)):
+            for key in keys:
+                ids = index.get(key)
+                if ids is not None:
+                    ids.discard(app_id)
+                    if not ids:
+                        del index[key]
+
+    def _intersect(self, index, parts):
+        sets = []
+        for part in parts:
+            ids = index.get(part)
+            if not ids:
+                return set()
+            sets.append(ids)
+        sets.sort(key=len)
+        return set.intersection(*sets)
+
+    def substring_candidates(self, query):
+        """包含query所有二元组的应用；query不超过2个字符时就是精确的子串匹配"""
+        if len(query) == 1:
+            return self.chars.get(query, set())
+        return self._intersect(self.grams, {query[i:i + 2] for i in range(len(query) - 1)})
+
+    def fuzzy_candidates(self, query):
+        """包含query所有字符的应用，是子序列匹配的超集"""
+        return self._intersect(self.chars, set(query))
+
+
+class SearchIndex:
+    def __init__(self):
+        self.apps = {}  # {应用id: 应用信息}
+        self.records = {}  # {应用id: (名称组记录, 其他组记录)}
+        self.path_ids = {}  # {快捷方式路径: 应用id}
+        self.sort_keys = {}  # {应用id: 同一排名内的次序}，名称较短的优先
+        self.boosts = {}  # {快捷方式路径: 使用频率评分}，同一排名内常用的应用排在前面
+        self.next_id = 0
+        self.groups = (_FieldGroup(), _FieldGroup())
+        self.last_query = None
+        self.last_results = None  # 上次查询的完整结果 [(排名, [应用id])]
+
+    def build(self, app_categories):
+        """由 {分类名: [应用列表]} 重建索引"""
+        boosts = self.boosts
+        self.__init__()
+        self.boosts = boosts
+        for apps in app_categories.values():
+            for app in apps:
+                self.add(app)
+
+    def add(self, app):
+        """加入或更新一个应用（以快捷方式路径识别）"""
+        self.remove(app['path'])
+        entry = app.get('search_entry')
+        if entry is None or entry[0] != (app['name'], app['target'], app['category']):
+            entry = app['search_entry'] = search_entry(app)
+
+        app_id = self.next_id
+        self.next_id += 1
+        self.apps[app_id] = app
+        self.records[app_id] = entry[1]
+        self.path_ids[app['path']] = app_id
+        self.sort_keys[app_id] = (len(app['name']) << 32) | app_id
+        for group, record in zip(self.groups, entry[1]):
+            group.add(app_id, record)
+        self.last_results = None
+
+    def remove(self, app_path):
+        app_id = self.path_ids.pop(app_path, None)
+        if app_id is None:
+            return
+        del self.apps[app_id]
+        del self.sort_keys[app_id]
+        for group, record in zip(self.groups, self.records.pop(app_id)):
+            group.remove(app_id, record)
+        self.last_results = None
+
+    def set_boosts(self, boosts):
+        """设置各应用的使用频率评分"""
+        self.boosts = boosts
+
+    def _sorted(self, ids):
+        """同一排名内：有使用评分的按评分从高到低排在前面，其余名称较短的优先"""
+        if not self.boosts:
+            return sorted(ids, key=self.sort_keys.__getitem__)
+        boosted = []
+        others = []
+        for app_id in ids:
+            score = self.boosts.get(self.apps[app_id]['path'])
+            if score:
+                boosted.append((-score, self.sort_keys[app_id], app_id))
+            else:
+                others.append(app_id)
+        boosted.sort()
+        others.sort(key=self.sort_keys.__getitem__)
+        return [app_id for _, _, app_id in boosted] + others
+
+    def __len__(self):
+        return len(self.apps)
+
+    @staticmethod
+    def _fuzzy_pattern(query):
+        """子序列匹配的正则，不跨越字段分隔符；单个字符的模糊匹配就是子串匹配，返回None"""
+        if len(query) < 2:
+            return None
+        return re.compile(f"[^{SEPARATOR}]*?".join(map(re.escape, query)))
+
+    def _rank(self, app_id, query, fuzzy_pattern):
+        """(匹配类型, 字段分组)，不匹配返回None"""
+        (name_joined, name_words), (extra_joined, extra_words) = self.records[app_id]
+        marked = SEPARATOR + query
+        if marked in name_joined:
+            return MATCH_PREFIX, GROUP_NAME
+        if marked in extra_joined:
+            return MATCH_PREFIX, GROUP_EXTRA
+        if marked in name_words:
+            return MATCH_WORD_START, GROUP_NAME
+        if marked in extra_words:
+            return MATCH_WORD_START, GROUP_EXTRA
+        if query in name_joined:
+            return MATCH_SUBSTRING, GROUP_NAME
+        if query in extra_joined:
+            return MATCH_SUBSTRING, GROUP_EXTRA
+        if fuzzy_pattern is not None and fuzzy_pattern.search(name_joined):
+            return MATCH_FUZZY, GROUP_NAME
+        return None
+
+    def _match_all(self, query):
+        """
+        按排名从好到差依次用倒排索引取出候选，已归入更好排名的应用不再参与后面的判断，
+        大部分工作是集合运算；返回 ({排名: {应用id}}, 结果是否完整)
+        """
+        buckets = {}
+        seen = set()
+
+        def take(rank, ids):
+            ids = ids - seen
+            if ids:
+                buckets[rank] = ids
+                seen.update(ids)
+
+        if len(query) <= PREFIX_LENGTH:
+            # 前缀索引直接得到前缀/词首匹配，无需校验
+            for kind, attr in ((MATCH_PREFIX, 'prefixes'), (MATCH_WORD_START, 'word_prefixes')):
+                for group_no, group in enumerate(self.groups):
+                    take((kind, group_no), getattr(group, attr).get(query, set()))
+            for group_no, group in enumerate(self.groups):
+                candidates = group.substring_candidates(query) - seen
+                if len(query) > 2:
+                    candidates = {app_id for app_id in candidates
+                                  if query in self.records[app_id][group_no][0]}
+                take((MATCH_SUBSTRING, group_no), candidates)
+        else:
+            # 更长的查询由二元组候选逐个校验
+            found = {}
+            candidates = self.groups[GROUP_NAME].substring_candidates(query)
+            candidates |= self.groups[GROUP_EXTRA].substring_candidates(query)
+            for app_id in candidates:
+                rank = self._rank(app_id, query, None)
+                if rank is not None:
+                    found.setdefault(rank, set()).add(app_id)
+            for rank in RANK_ORDER:
+                if rank in found:
+                    take(rank, found[rank])
+
+        # 模糊匹配只针对名称
+        fuzzy_pattern = self._fuzzy_pattern(query)
+        if fuzzy_pattern is None:
+            return buckets, True
+        if len(seen) >= FUZZY_LIMIT:
+            return buckets, False
+        take((MATCH_FUZZY, GROUP_NAME),
+             {app_id for app_id in self.groups[GROUP_NAME].fuzzy_candidates(query) - seen
+              if fuzzy_pattern.search(self.records[app_id][GROUP_NAME][0])})
+        return buckets, True
+
+    def search(self, query, limit=None):
+        """返回按相关度排序的应用列表"""
+        query = query.strip().lower().replace(SEPARATOR, "")
+        if not query:
+            return []
+
+        if (self.last_results is not None and query.startswith(self.last_query)
+                and (len(query) > PREFIX_LENGTH
+                     or sum(len(ids) for _, ids in self.last_results) <= INCREMENTAL_LIMIT)):
+            # 追加输入时结果只会变少，在上次结果中重新校验即可
+            fuzzy_pattern = self._fuzzy_pattern(query)
+            buckets = {}
+            for _, ids in self.last_results:
+                for app_id in ids:
+                    rank = self._rank(app_id, query, fuzzy_pattern)
+                    if rank is not None:
+                        buckets.setdefault(rank, []).append(app_id)
+            complete = True
+        else:
+            buckets, complete = self._match_all(query)
+
+        results = [(rank, self._sorted(buckets[rank])) for rank in RANK_ORDER if rank in buckets]
+        self.last_query = query
+        self.last_results = results if complete else None
+
+        apps = [self.apps[app_id] for _, ids in results for app_id in ids]
+        return apps[:limit] if limit else apps
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    # 用随机生成的中英文名称模拟大目录，测量建索引和逐键输入的耗时
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    random.seed(1)
+    chars = "嘉立创下单助手飞书谷歌浏览器开发工具微信支付宝网易云音乐腾讯会议"
+    categories = {}
+    for i in range(count):
+        name = "".join(random.choice(chars) for _ in range(random.randint(2, 6)))
+        name += random.choice(["", "Pro", " Studio", "EDA", "64"])
+        category = f"分类{i % 20}"
+        categories.setdefault(category, []).append({
+            'name': name, 'path': f"{category}\\{name}{i}.lnk",
+            'target': f"C:\\Program Files\\{name}{i}.exe", 'category': category,
+        })
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.build(categories)
+    print(f"建立 {len(index)} 个应用的索引耗时 {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    worst = 0
+    for word in ["jlcxdzs", "wangyiyun", "studio", "浏览器", "zfb", "eda", "tengxunhuiyi"]:
+        index.last_results = None
+        timings = []
+        for i in range(1, len(word) + 1):
+            start = time.perf_counter()
+            results = index.search(word[:i])
+            elapsed = (time.perf_counter() - start) * 1000
+            worst = max(worst, elapsed)
+            timings.append(f"{word[:i]}({len(results)}): {elapsed:.2f}")
+        print(", ".join(timings))
+    print(f"单次按键最慢 {worst:.2f} ms")
@@ -0,0 +1,109 @@
+"""
+统一的状态存储
+配置、收藏（集合）和每个应用的自定义设置都保存在 profile/ 下的一个SQLite数据库中（WAL模式），
+按命名空间分组，首次访问某个命名空间时才读取；修改先记在内存中，由调用方延迟调用 flush()
+在一个事务内批量提交，写入要么全部生效要么全部不生效，崩溃时不会留下损坏的文件
+"""
+import json
+import sqlite3
+
+_DELETED = object()
+
+
+class StateStore:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._cache = {}  # {命名空间: {键: 值}}，首次访问时从数据库读取
+        self._pending = {}  # {(命名空间, 键): 新值或 _DELETED}，尚未提交的修改
+        self.on_dirty = None  # 从无修改变为有修改时调用，通常用来启动延迟写入的定时器
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS state ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+            )
+        return self._conn
+
+    def namespace(self, namespace):
+        """返回命名空间的内存副本 {键: 值}（只读，修改请用 set/delete）"""
+        values = self._cache.get(namespace)
+        if values is None:
+            values = {}
+            try:
+                rows = self._connection().execute(
+                    "SELECT key, value FROM state WHERE namespace = ?", (namespace,))
+                for key, value in rows:
+                    values[key] = json.loads(value)
+            except Exception as e:
+                print(f"读取状态失败: {e}")
+            self._cache[namespace] = values
+        return values
+
+    def get(self, namespace, key, default=None):
+        return self.namespace(namespace).get(key, default)
+
+    def set(self, namespace, key, value):
+        values = self.namespace(namespace)
+        if key in values and values[key] == value:
+            return
+        values[key] = value
+        self._mark((namespace, key), value)
+
+    def update(self, namespace, mapping):
+        for key, value in mapping.items():
+            self.set(namespace, key, value)
+
+    def delete(self, namespace, key):
+        values = self.namespace(namespace)
+        if key in values:
+            del values[key]
+            self._mark((namespace, key), _DELETED)
+
+    def _mark(self, item, value):
+        was_clean = not self._pending
+        self._pending[item] = value
+        if was_clean and self.on_dirty:
+            self.on_dirty()
+
+    @property
+    def dirty(self):
+        return bool(self._pending)
+
+    def flush(self):
+        """在一个事务中提交所有修改"""
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = {}
+        upserts = [(namespace, key, json.dumps(value, ensure_ascii=False))
+                   for (namespace, key), value in pending.items() if value is not _DELETED]
+        deletes = [item for item, value in pending.items() if value is _DELETED]
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT INTO state (namespace, key, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value", upserts)
+                conn.executemany("DELETE FROM state WHERE namespace = ? AND key = ?", deletes)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            print(f"保存状态失败: {e}")
+            # 未提交的修改留到下次再写，期间的新修改优先
+            pending.update(self._pending)
+            self._pending = pending
+
+    def close(self):
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
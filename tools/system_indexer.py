@@ -0,0 +1,332 @@
+"""
+系统范围的可启动项索引
+在一个低优先级的后台线程中爬取配置的位置：PATH中的目录、开始菜单（Windows）、applications 目录（Linux）
+和用户指定的根目录，收集可启动的项目（名称、目标、参数、图标键），搜索时作为单独的“其他结果”分组显示：
+- 每个目录记录 (修改时间, 条目数)，没有变化的目录沿用上次的结果，只重新读取变化了的目录
+- 按每秒处理的目录数限速，用户操作时暂停；待处理的目录队列随索引一起保存，退出后下次从中断处继续
+- 索引保存在 profile/system_index.bin，启动时先用保存的结果，不必等待爬取
+"""
+import os
+import pickle
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+from tools.catalog_snapshot import directory_stamp
+from tools.lnk_parser import parse_lnk
+from tools.prewarm import lower_thread_priority
+from tools.search_index import search_entry
+
+INDEX_VERSION = 1
+DIRS_PER_SECOND = 20  # 默认每秒最多处理的目录数
+MAX_DEPTH = 6  # 递归爬取的最大深度
+RECRAWL_SECONDS = 1800  # 一轮爬取完成后隔这么久再检查一遍
+SAVE_EVERY = 64  # 每处理这么多个目录保存一次进度
+UPDATE_BATCH = 256  # 启动时回传保存的结果，每次最多这么多个项目
+
+
+def default_locations():
+    """[(目录, 是否递归)]：PATH中的目录，Windows的开始菜单，其他系统的 applications 目录"""
+    locations = [(path, False) for path in os.environ.get("PATH", "").split(os.pathsep) if path]
+    if sys.platform == "win32":
+        for variable in ("APPDATA", "PROGRAMDATA"):
+            base = os.environ.get(variable)
+            if base:
+                locations.append((os.path.join(base, "Microsoft", "Windows", "Start Menu", "Programs"), True))
+    else:
+        data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+        for data_dir in [data_home] + [path for path in data_dirs.split(":") if path]:
+            locations.append((os.path.join(data_dir, "applications"), True))
+    return locations
+
+
+def index_locations(config):
+    """默认位置加上配置中的 system_index_roots（递归爬取），规范化并去重，保持顺序"""
+    locations = default_locations()
+    locations += [(os.path.expanduser(str(root)), True) for root in config.get("system_index_roots") or []]
+    result, seen = [], set()
+    for directory, recursive in locations:
+        directory = os.path.normpath(directory)
+        key = os.path.normcase(directory)
+        if key not in seen:
+            seen.add(key)
+            result.append((directory, recursive))
+    return result
+
+
+def _item(name, path, target, arguments="", working_dir="", icon_key=None):
+    """一个可启动项，字段与应用目录中的应用一致；category 为空，不参与分类名的匹配"""
+    item = {
+        'name': name,
+        'path': path,
+        'target': target,
+        'arguments': arguments,
+        'working_dir': working_dir,
+        'category': "",
+        'icon_key': icon_key or target,  # 提取图标使用的文件
+        'system': True,
+    }
+    item['search_entry'] = search_entry(item)
+    return item
+
+
+def shortcut_item(path):
+    """指向 .exe 的快捷方式，无法解析或不是程序时返回None"""
+    info = parse_lnk(path)
+    if not info or not info.get('target', '').lower().endswith('.exe'):
+        return None
+    return _item(os.path.splitext(os.path.basename(path))[0], path, info['target'],
+                 info.get('arguments') or "", info.get('working_dir') or "")
+
+
+def desktop_item(path):
+    """.desktop 文件中 Type=Application 且没有隐藏的项目，Exec 去掉 %f 等占位符后拆成程序和参数"""
+    fields = {}
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            in_entry = False
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    in_entry = line == "[Desktop Entry]"
+                elif in_entry and "=" in line:
+                    key, _, value = line.partition("=")
+                    fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        return None
+    if (fields.get("Type") != "Application" or fields.get("NoDisplay") == "true"
+            or fields.get("Hidden") == "true" or not fields.get("Exec")):
+        return None
+    try:
+        tokens = shlex.split(fields["Exec"])
+    except ValueError:
+        return None
+    tokens = [token.replace("%%", "%") for token in tokens
+              if not (len(token) == 2 and token[0] == "%" and token[1] != "%")]
+    if not tokens:
+        return None
+    target = tokens[0] if os.path.isabs(tokens[0]) else shutil.which(tokens[0])
+    if not target:
+        return None
+    name = fields.get("Name[zh_CN]") or fields.get("Name") or os.path.splitext(os.path.basename(path))[0]
+    # 参数按Windows命令行规则拼接，启动时由 split_arguments 还原
+    return _item(name, path, target, subprocess.list2cmdline(tokens[1:]), fields.get("Path", ""), path)
+
+
+def scan_directory(directory, recursive):
+    """列出一个目录中的可启动项和（递归时）子目录，返回 ([项目], [子目录])"""
+    items, subdirs = [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if recursive and not entry.is_symlink():
+                        subdirs.append(entry.path)
+                    continue
+                lower = entry.name.lower()
+                if lower.endswith(".lnk"):
+                    item = shortcut_item(entry.path)
+                elif lower.endswith(".desktop"):
+                    item = desktop_item(entry.path)
+                elif sys.platform == "win32" and lower.endswith(".exe"):
+                    item = _item(os.path.splitext(entry.name)[0], entry.path, entry.path)
+                elif sys.platform != "win32" and entry.is_file() and os.access(entry.path, os.X_OK):
+                    item = _item(entry.name, entry.path, entry.path)
+                else:
+                    item = None
+            except OSError:
+                continue
+            if item:
+                items.append(item)
+    return items, subdirs
+
+
+class SystemIndexer:
+    def __init__(self, index_path, locations, on_update, dirs_per_second=DIRS_PER_SECOND):
+        """
+        locations: [(目录, 是否递归)]
+        on_update(更新, 移除): 更新为 {目录: [项目]}，移除为 [目录]，在后台线程中调用；
+            项目字典仍由索引持有（会被保存），调用方需要修改时应复制一份
+        dirs_per_second: 每秒最多处理的目录数
+        """
+        self.index_path = index_path
+        self.locations = locations
+        self.on_update = on_update
+        self.dirs_per_second = max(1, dirs_per_second)
+        self.directories = {}  # {目录: (目录标记, [项目], [子目录])}
+        self.queue = deque()  # 本轮待处理的 (目录, 是否递归, 深度)
+        self.visited = set()  # 本轮已处理的目录，一轮结束时没有处理到的目录已不存在或不再在爬取范围内
+        self.last_pass = 0.0  # 上一轮完成的时间
+        self.lock = threading.Lock()
+        self.wake = threading.Condition(self.lock)
+        self.running = threading.Event()  # 未暂停；创建后先暂停，由调用方在空闲时 resume
+        self.stopped = False
+        self.thread = None
+        self.scanned_dirs = 0  # 重新读取的目录数
+        self.reused_dirs = 0  # 没有变化、沿用上次结果的目录数
+        self.passes = 0
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="system-index", daemon=True)
+            self.thread.start()
+
+    def pause(self):
+        """用户操作时暂停，正在处理的目录处理完后停下"""
+        self.running.clear()
+
+    def resume(self):
+        self.running.set()
+
+    def stop(self, timeout=1.0):
+        """停止爬取并保存进度"""
+        with self.lock:
+            self.stopped = True
+            self.wake.notify()
+        self.running.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def stats(self):
+        return {
+            'directories': len(self.directories),
+            'items': sum(len(items) for _, items, _ in list(self.directories.values())),
+            'pending_dirs': len(self.queue),
+            'scanned_dirs': self.scanned_dirs,
+            'reused_dirs': self.reused_dirs,
+            'passes': self.passes,
+        }
+
+    def _in_locations(self, directory):
+        directory = os.path.normcase(directory)
+        for location, recursive in self.locations:
+            location = os.path.normcase(location)
+            if directory == location or (recursive and directory.startswith(location.rstrip(os.sep) + os.sep)):
+                return True
+        return False
+
+    def load(self):
+        """读取保存的索引和爬取进度，丢弃已不在爬取范围内的目录；位置配置变化后重新开始一轮"""
+        try:
+            if not os.path.exists(self.index_path):
+                return
+            with open(self.index_path, 'rb') as f:
+                saved = pickle.load(f)
+            if saved.get("version") != INDEX_VERSION:
+                return
+            self.directories = {directory: record for directory, record in saved["directories"].items()
+                                if self._in_locations(directory)}
+            self.last_pass = saved["last_pass"]
+            if saved["locations"] == self.locations:
+                self.queue = deque(saved["queue"])
+                self.visited = set(saved["visited"])
+        except Exception as e:
+            print(f"加载系统索引失败: {e}")
+            self.directories = {}
+
+    def save(self):
+        """原子地写入索引和爬取进度"""
+        try:
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({"version": INDEX_VERSION, "locations": self.locations, "directories": self.directories,
+                             "queue": list(self.queue), "visited": list(self.visited),
+                             "last_pass": self.last_pass}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"保存系统索引失败: {e}")
+
+    def _report(self, changed, removed=()):
+        try:
+            self.on_update(changed, list(removed))
+        except Exception as e:
+            print(f"回传系统索引失败: {e}")
+
+    def _report_all(self):
+        """启动时分批回传保存的全部项目"""
+        batch, count = {}, 0
+        for directory, (_, items, _) in self.directories.items():
+            if not items:
+                continue
+            batch[directory] = items
+            count += len(items)
+            if count >= UPDATE_BATCH:
+                self._report(batch)
+                batch, count = {}, 0
+        if batch:
+            self._report(batch)
+
+    def _run(self):
+        lower_thread_priority()
+        self.load()
+        self._report_all()
+        processed = 0
+        while True:
+            with self.lock:
+                if not self.queue:
+                    if self.visited:
+                        self._finish_pass()
+                    # 等到下一轮的时间（或被停止）
+                    while not self.stopped and time.time() - self.last_pass < RECRAWL_SECONDS:
+                        self.wake.wait(max(1.0, RECRAWL_SECONDS - (time.time() - self.last_pass)))
+                    if not self.stopped:
+                        self.queue.extend((directory, recursive, 0) for directory, recursive in self.locations)
+                if self.stopped:
+                    break
+            self.running.wait()
+            if self.stopped:
+                break
+            started = time.perf_counter()
+            self._visit(*self.queue.popleft())
+            processed += 1
+            if processed % SAVE_EVERY == 0:
+                self.save()
+            # 限速：每个目录至少占用 1/dirs_per_second 秒
+            delay = 1 / self.dirs_per_second - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+        self.save()
+
+    def _finish_pass(self):
+        """一轮结束：移除这一轮没有处理到的目录"""
+        removed = [directory for directory in self.directories if directory not in self.visited]
+        for directory in removed:
+            del self.directories[directory]
+        if removed:
+            self._report({}, removed)
+        self.visited = set()
+        self.last_pass = time.time()
+        self.passes += 1
+        self.save()
+
+    def _visit(self, directory, recursive, depth):
+        if directory in self.visited:
+            return
+        self.visited.add(directory)
+        stamp = directory_stamp(directory)
+        previous = self.directories.get(directory)
+        if stamp is None:
+            if previous:
+                del self.directories[directory]
+                self._report({}, [directory])
+            return
+        if previous and previous[0] == stamp:
+            subdirs = previous[2]
+            self.reused_dirs += 1
+        else:
+            try:
+                items, subdirs = scan_directory(directory, recursive)
+            except OSError as e:
+                print(f"读取目录失败: {e}")
+                return
+            self.directories[directory] = (stamp, items, subdirs)
+            self.scanned_dirs += 1
+            if items or previous:
+                self._report({directory: items})
+        if recursive and depth < MAX_DEPTH:
+            self.queue.extend((subdir, True, depth + 1) for subdir in subdirs)
@@ -0,0 +1,164 @@
+"""
+可选的性能追踪
+设置环境变量 APP_LAUNCHER_TRACE=输出路径 或使用命令行参数 --trace[=输出路径] 开启，
+记录目录扫描、快捷方式解析、图标提取、显示、搜索和启动等阶段的耗时；退出时写出Chrome trace-event JSON
+（可在 chrome://tracing 或 Perfetto 中打开），并输出最慢的快捷方式和图标汇总表
+未开启时 span() 始终返回同一个空对象，几乎没有额外开销
+"""
+import json
+import os
+import threading
+import time
+
+TRACE_ENV = "APP_LAUNCHER_TRACE"
+DEFAULT_TRACE_PATH = os.path.join("profile", "trace.json")
+
+# 汇总表中按单个对象列出最慢记录的追踪项：(追踪名, 标识对象的属性, 标题)
+SUMMARY_ITEMS = (
+    ("parse_shortcut", "path", "最慢的快捷方式"),
+    ("extract_icon", "target", "最慢的图标"),
+)
+
+
+class _NullSpan:
+    """追踪关闭时使用的空对象"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = repr(exc)
+        self.tracer.record(self.name, self.category, self.start, end - self.start, self.args)
+        return False
+
+    def set(self, **args):
+        """补充在执行过程中才知道的属性"""
+        self.args.update(args)
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.events = []  # [(名称, 分类, 开始ns, 耗时ns, 线程id, 属性)]，list.append 在多线程下是原子的
+        self.thread_names = {}
+        self.origin = time.perf_counter_ns()
+        self.lock = threading.Lock()
+
+    def enable(self, path=None):
+        self.enabled = True
+        self.path = path or DEFAULT_TRACE_PATH
+        self.origin = time.perf_counter_ns()
+
+    def span(self, name, category="launcher", **args):
+        """用法: with tracer.span("parse_shortcut", path=p) as span: ...; span.set(target=t)"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def record(self, name, category, start, duration, args):
+        thread_id = threading.get_ident()
+        if thread_id not in self.thread_names:
+            self.thread_names[thread_id] = threading.current_thread().name
+        self.events.append((name, category, start, duration, thread_id, args))
+
+    def chrome_trace(self):
+        """转换为Chrome trace-event格式（时间单位为微秒）"""
+        pid = os.getpid()
+        trace_events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": name}}
+            for thread_id, name in self.thread_names.items()
+        ]
+        for name, category, start, duration, thread_id, args in list(self.events):
+            trace_events.append({
+                "name": name, "cat": category, "ph": "X", "pid": pid, "tid": thread_id,
+                "ts": (start - self.origin) / 1000, "dur": duration / 1000,
+                "args": {key: str(value) for key, value in args.items()},
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def summary(self, top=10):
+        """各追踪项的次数和耗时，以及最慢的快捷方式和图标"""
+        totals = {}
+        for name, _, _, duration, _, _ in list(self.events):
+            count, total, longest = totals.get(name, (0, 0, 0))
+            totals[name] = (count + 1, total + duration, max(longest, duration))
+
+        lines = [f"{'追踪项':<20}{'次数':>8}{'总计(ms)':>12}{'平均(ms)':>12}{'最长(ms)':>12}"]
+        for name, (count, total, longest) in sorted(totals.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<20}{count:>8}{total / 1e6:>12.2f}{total / count / 1e6:>12.3f}{longest / 1e6:>12.3f}")
+
+        for span_name, key, title in SUMMARY_ITEMS:
+            spans = [(duration, args.get(key, "")) for name, _, _, duration, _, args in list(self.events)
+                     if name == span_name]
+            if not spans:
+                continue
+            spans.sort(key=lambda item: -item[0])
+            lines.append("")
+            lines.append(f"{title}（前{top}个）")
+            for duration, value in spans[:top]:
+                lines.append(f"{duration / 1e6:>10.3f} ms  {value}")
+        return "\n".join(lines)
+
+    def write(self, path=None):
+        """写出trace JSON和同名的 .summary.txt 汇总表"""
+        if not self.enabled:
+            return
+        path = path or self.path
+        try:
+            with self.lock:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(self.chrome_trace(), f, ensure_ascii=False)
+                summary = self.summary()
+                with open(os.path.splitext(path)[0] + ".summary.txt", 'w', encoding='utf-8') as f:
+                    f.write(summary + "\n")
+            print(summary)
+            print(f"追踪数据已写入 {path}")
+        except Exception as e:
+            print(f"写入追踪数据失败: {e}")
+
+
+tracer = Tracer()
+
+
+def configure(argv):
+    """根据命令行参数 --trace[=路径] 或环境变量开启追踪，并从argv中去掉该参数"""
+    path = os.environ.get(TRACE_ENV)
+    if path in ("1", "true", "on"):
+        path = DEFAULT_TRACE_PATH
+    for arg in list(argv[1:]):
+        if arg == "--trace" or arg.startswith("--trace="):
+            path = arg.partition("=")[2] or DEFAULT_TRACE_PATH
+            argv.remove(arg)
+    if path:
+        tracer.enable(path)
+    return tracer.enabled
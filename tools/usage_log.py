@@ -0,0 +1,146 @@
+"""
+应用使用记录和frecency评分
+每次启动应用向 profile/ 下的日志追加一行，评分为各次启动按时间衰减后的和（半衰期默认14天），
+最近且频繁使用的应用得分最高；日志行数超过上限时压缩为每个应用一行的评分快照，文件大小保持有界
+"""
+import os
+import time
+
+HALF_LIFE_DAYS = 14
+COMPACT_LINES = 2000  # 日志超过这么多行时压缩
+MIN_SCORE = 0.01  # 压缩时丢弃衰减到这个值以下的应用
+
+# 日志行格式（制表符分隔）：
+#   L <时间戳> <应用键>          一次启动
+#   S <时间戳> <评分> <应用键>    压缩后的评分，评分对应该时间戳
+#   R <时间戳> <旧键> <新键>      快捷方式被重命名或移动，评分转到新键下
+
+
+class UsageLog:
+    def __init__(self, log_path, half_life_days=HALF_LIFE_DAYS):
+        self.log_path = log_path
+        self.half_life = half_life_days * 86400
+        self.scores = {}  # {应用键: (评分, 评分对应的时间)}
+        self.line_count = 0
+        self.valid_size = None  # 日志末尾有写入中断留下的不完整行时，完整部分的字节数
+        self.load()
+        if self.needs_compaction():
+            self.compact()
+
+    def _add(self, key, score, when):
+        """把一次得分累加到应用上，评分统一折算到较晚的时间"""
+        old = self.scores.get(key)
+        if old is None:
+            self.scores[key] = (score, when)
+            return
+        old_score, old_time = old
+        if when >= old_time:
+            self.scores[key] = (old_score * self._decay(when - old_time) + score, when)
+        else:
+            self.scores[key] = (old_score + score * self._decay(old_time - when), old_time)
+
+    def _decay(self, seconds):
+        return 0.5 ** (seconds / self.half_life)
+
+    def load(self):
+        try:
+            if os.path.exists(self.log_path):
+                # newline=''：保留原样的换行符，按字节数记录完整部分的长度
+                with open(self.log_path, 'r', encoding='utf-8', newline='') as f:
+                    size = 0
+                    for line in f:
+                        if not line.endswith("\n"):
+                            # 写入中断留下的半行，应用键可能不完整，不采用，下次写入前截掉
+                            self.valid_size = size
+                            break
+                        size += len(line.encode('utf-8'))
+                        self.line_count += 1
+                        parts = line.rstrip("\r\n").split("\t")
+                        try:
+                            if parts[0] == "L" and len(parts) == 3:
+                                self._add(parts[2], 1.0, float(parts[1]))
+                            elif parts[0] == "S" and len(parts) == 4:
+                                self._add(parts[3], float(parts[2]), float(parts[1]))
+                            elif parts[0] == "R" and len(parts) == 4:
+                                self._rename(parts[2], parts[3])
+                        except ValueError:
+                            continue  # 无法解析的行
+        except Exception as e:
+            print(f"加载使用记录失败: {e}")
+
+    def record(self, key, when=None):
+        """记录一次启动"""
+        when = time.time() if when is None else when
+        self._add(key, 1.0, when)
+        try:
+            self._append(f"L\t{when:.0f}\t{key}\n")
+            self.line_count += 1
+        except Exception as e:
+            print(f"写入使用记录失败: {e}")
+        if self.needs_compaction():
+            self.compact()
+
+    def _append(self, line):
+        """追加一行；末尾有不完整的行时先截掉，避免新记录接在半行后面"""
+        if self.valid_size is not None:
+            os.truncate(self.log_path, self.valid_size)
+            self.valid_size = None
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+    def _rename(self, old_key, new_key):
+        entry = self.scores.pop(old_key, None)
+        if entry is not None:
+            self._add(new_key, *entry)
+
+    def rename(self, old_key, new_key):
+        """应用键变化（快捷方式被重命名或移动）时把评分转到新键下"""
+        if old_key not in self.scores or old_key == new_key:
+            return
+        self._rename(old_key, new_key)
+        try:
+            self._append(f"R\t{time.time():.0f}\t{old_key}\t{new_key}\n")
+            self.line_count += 1
+        except Exception as e:
+            print(f"写入使用记录失败: {e}")
+
+    def needs_compaction(self):
+        """行数超过上限、且压缩后能明显变短时才压缩"""
+        return self.line_count > max(COMPACT_LINES, 2 * len(self.scores))
+
+    def score(self, key, now=None):
+        entry = self.scores.get(key)
+        if entry is None:
+            return 0.0
+        now = time.time() if now is None else now
+        score, when = entry
+        return score * self._decay(max(0.0, now - when))
+
+    def all_scores(self, now=None):
+        """当前时刻所有应用的评分 {应用键: 评分}"""
+        now = time.time() if now is None else now
+        return {key: self.score(key, now) for key in self.scores}
+
+    def top(self, count, now=None):
+        """评分最高的应用键"""
+        scores = self.all_scores(now)
+        return sorted(scores, key=lambda key: -scores[key])[:count]
+
+    def compact(self):
+        """把日志重写为每个应用一行评分"""
+        now = time.time()
+        lines = [f"S\t{now:.0f}\t{score:.6g}\t{key}\n"
+                 for key, score in self.all_scores(now).items() if score >= MIN_SCORE]
+        try:
+            tmp_path = self.log_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(lines)
+            os.replace(tmp_path, self.log_path)
+            self.line_count = len(lines)
+            self.valid_size = None
+            self.scores = {}
+            for line in lines:
+                _, when, score, key = line.rstrip("\n").split("\t")
+                self.scores[key] = (float(score), float(when))
+        except Exception as e:
+            print(f"压缩使用记录失败: {e}")
@@ -15,33 +15,310 @@
 2. 在相应分类文件夹中放入应用程序的快捷方式（.lnk文件）
 3. 按F5刷新启动器查看添加的应用
 4. 使用Ctrl+鼠标滚轮或Ctrl++/-/0进行缩放
+5. 按F6在普通网格和虚拟化网格之间切换（应用数量很多时使用虚拟化网格）
+6. 命令行模式：--list、--search 关键字、--launch 名称（可加 --json），不打开窗口；
+   绑定快捷键时用 python -m tools.cli 加同样的参数启动更快
+7. 常驻模式：--resident 启动后关闭窗口只是隐藏，之后再运行启动器会直接显示已有窗口，命令行模式也交给它处理
+8. 多个应用根目录：在配置中设置 roots（如 ["apps", "\\\\server\\share\\apps"]），同名分类合并显示；
+   网络共享等响应慢的根目录先显示上次的内容，超过 root_timeout_ms 未列出时在搜索框下方提示
+9. 按F12显示/隐藏运行时指标浮层；--metrics-dump[=路径] 定时把指标写入JSON，常驻实例的指标可用 --metrics 查看
+10. 预热：在配置中设置 "prewarm": true 后，空闲时把常用和收藏应用的程序文件预先读入系统缓存，冷启动更快
+    （prewarm_top、prewarm_budget_mb、prewarm_rate_mb_s 分别为应用数、每轮预算和速率）
+11. 点击分类标题折叠/展开分类（状态保存在 profile/ 中）；折叠的分类在展开或搜索之前不解析快捷方式、
+    不提取图标、不创建按钮，折叠一段时间后释放图标占用的内存
 """
 import sys
 import os
-import subprocess
-import pythoncom
-import win32com.client
+
+if __name__ == '__main__':
+    # 命令行模式在导入Qt等界面模块之前处理，启动只需几十毫秒
+    from tools.cli import wants_cli, main as cli_main
+    if wants_cli(sys.argv[1:]):
+        sys.exit(cli_main(sys.argv[1:]))
+    # 已有常驻实例时让它显示窗口后立即退出
+    from tools.instance_client import request
+    if request("show") is not None:
+        sys.exit(0)
+
 import json  # 新增：导入json模块处理配置文件
+import html
+import time
+from collections import deque
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QGridLayout,
                              QToolButton, QScrollArea, QVBoxLayout, QLineEdit,
-                             QMenu, QInputDialog, QLabel, QFrame)
-from PyQt6.QtGui import QIcon, QPixmap, QFont, QColor, QAction, QImage, QPainter, QWheelEvent
+                             QMenu, QInputDialog, QLabel, QFrame, QMessageBox, QSystemTrayIcon)
+from PyQt6.QtGui import QIcon, QPixmap, QFont, QColor, QAction, QPainter, QWheelEvent
 from PyQt6.QtCore import Qt, QSize, QPoint  # 新增：导入QPoint处理窗口位置
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, QFileSystemWatcher, pyqtSignal
+
+# 图标提取：纯Python读取PE资源，失败时回退到GDI（Linux上为图标主题）
+from tools.icon_providers import extract_icon
+# 持久化图标缓存
+from tools.icon_cache import IconCache
+# 多分辨率图标金字塔和缩放结果缓存
+from tools.icon_pyramid import ICON_LEVELS, ScaledIconCache, build_pyramid
+# 可选的性能追踪（--trace 或环境变量 APP_LAUNCHER_TRACE 开启）
+from tools import tracing
+from tools.tracing import tracer
+# 运行时指标：关键操作耗时的滚动直方图，F12调试浮层
+from tools.metrics import configure as configure_metrics, metrics
+from tools.metrics_overlay import EventLoopProbe, MetricsOverlay
+# 虚拟化的模型/视图网格，用于超大目录
+from tools.app_grid_view import AppGridView, AppRole
+# 解析结果的快照，目录未变化的分类启动时不再解析
+from tools.catalog_snapshot import (DEFAULT_ROOTS, ROOT_TIMEOUT_MS, catalog_roots, directory_stamp,
+                                    load_snapshot, save_snapshot)
+# 支持拼音首字母的索引搜索
+from tools.search_index import SearchIndex, search_entry
+# 在后台线程中启动应用并记录启动耗时
+from tools.launch_executor import LaunchExecutor
+# 启动记录和frecency评分
+from tools.usage_log import UsageLog
+# 空闲时预热常用应用的程序文件
+from tools.prewarm import Prewarmer
+# 后台爬取PATH、开始菜单等位置的可启动项，搜索时显示为“其他结果”
+from tools.system_indexer import DIRS_PER_SECOND, SystemIndexer, index_locations
+# 配置、收藏和应用自定义设置的统一存储
+from tools.state_store import StateStore
+# 常驻模式：通过本地套接字接收其他进程的命令
+from tools.instance_client import server_name
+from tools.instance_server import InstanceServer
+# 分类目录的扫描和按名称查找，界面和命令行模式共用
+from tools.catalog import app_summary, find_app, scan_category
+
+ICON_SIZE = 64  # 缩放因子为1时的图标边长
+FREQUENT_CATEGORY = "★ 常用"  # 常用应用区块的标题，显示在所有分类之前
+FREQUENT_COUNT = 8  # 常用区块显示的应用数
+OTHER_CATEGORY = "其他结果"  # 系统索引中的匹配项，显示在所有分类之后
+OTHER_RESULTS_LIMIT = 24  # “其他结果”最多显示的项目数
+SYSTEM_INDEX_SLICE_MS = 4  # 每轮事件循环最多用这么久把系统索引的项目加入搜索索引
+HOT_COUNT = 32  # 启动时优先解析和加载图标的常用应用数
+PREWARM_IDLE_MS = 5000  # 没有操作这么久之后开始预热
+PIXMAP_DROP_SECONDS = 600  # 折叠超过这么久的分类释放图标
+ICON_BATCH = 8  # 每个后台任务提取的图标数，整批回传后一次替换占位图标
+
+
+class LoaderSignals(QObject):
+    """后台加载任务向GUI线程回传结果的信号"""
+    root_scanned = pyqtSignal(int, str, object, str)  # (加载批次, 根目录, {分类目录: 目录标记}或None, 错误信息)
+    category_loaded = pyqtSignal(int, int, str, object)  # (加载批次, 扫描序号, 分类目录, 应用列表)
+    icons_loaded = pyqtSignal(int, object)  # (加载批次, {目标路径: {边长: IconBuffer}})
+    system_index_updated = pyqtSignal(object, object)  # ({目录: [项目]}, [移除的目录])
+
+
+class CategoryLoadTask(QRunnable):
+    """在线程池中解析一个分类目录下的快捷方式；给出上次的应用列表时只重新解析有变化的文件"""
+
+    def __init__(self, launcher, generation, serial, category, category_path, previous_apps=None):
+        super().__init__()
+        self.launcher = launcher
+        self.signals = launcher.loader_signals
+        self.generation = generation
+        self.serial = serial
+        self.category = category
+        self.category_path = category_path
+        self.previous_apps = previous_apps
+
+    def run(self):
+        try:
+            with tracer.span("scan_category", category=self.category) as span:
+                apps = scan_category(self.category, self.category_path, self.previous_apps)
+                span.set(apps=len(apps))
+        except Exception as e:
+            print(f"加载分类 {self.category} 时出错: {e}")
+            apps = []
+        try:
+            self.signals.category_loaded.emit(self.generation, self.serial, self.category_path, apps)
+        except RuntimeError:
+            pass  # 网络共享上的扫描可能在启动器关闭后才结束
+
+
+class RootScanTask(QRunnable):
+    """列出一个根目录下的分类文件夹并取得各自的目录标记；根目录可能在响应慢的网络共享上，不能在GUI线程中进行"""
+
+    def __init__(self, signals, generation, root):
+        super().__init__()
+        self.signals = signals
+        self.generation = generation
+        self.root = root
+
+    def run(self):
+        directories, error = None, ""
+        try:
+            with tracer.span("scan_root", root=self.root) as span:
+                directories = {}
+                with os.scandir(self.root) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            directory = os.path.join(self.root, entry.name)
+                            directories[directory] = directory_stamp(directory)
+                span.set(categories=len(directories))
+        except OSError as e:
+            directories, error = None, str(e)
+        try:
+            self.signals.root_scanned.emit(self.generation, self.root, directories, error)
+        except RuntimeError:
+            pass  # 启动器已关闭
+
 
-# 导入外部图标提取函数
-from tools.get_icon_func import extract_icon
+class IconLoadTask(QRunnable):
+    """在线程池中提取一批目标程序的图标，生成各级尺寸的像素，整批一次回传"""
+
+    def __init__(self, launcher, generation, target_paths):
+        super().__init__()
+        self.launcher = launcher
+        self.signals = launcher.loader_signals
+        self.generation = generation
+        self.target_paths = target_paths
+
+    def run(self):
+        batch = {}
+        for target_path in self.target_paths:
+            levels = self.launcher.load_icon_data(target_path)
+            if levels:
+                batch[target_path] = levels
+        if not batch:
+            return
+        try:
+            self.signals.icons_loaded.emit(self.generation, batch)
+        except RuntimeError:
+            pass  # 启动器已关闭
 
 
 class AppLauncher(QMainWindow):
-    def __init__(self):
+    def __init__(self, resident=False):
         super().__init__()
-        self.app_categories = {}  # 按分类存储应用 {分类名: [应用列表]}
-        self.favorite_apps = []
-        self.apps_root_dir = "apps"  # 相对目录，存放分类文件夹
+        self.resident = resident  # 常驻模式：关闭窗口只是隐藏，目录和图标保留在内存中
+        self.quitting = False
+        self.app_categories = {}  # 按分类存储应用 {分类名: [应用列表]}，同名分类按根目录的顺序合并
+        self.dir_apps = {}  # 按分类目录存储应用 {根目录/分类名: [应用列表]}
+        self.roots = list(DEFAULT_ROOTS)  # 应用根目录，由配置中的 roots 指定
+        self.root_timeout_ms = ROOT_TIMEOUT_MS
+        self.apps_root_dir = self.roots[0]  # 第一个根目录，不存在时在其中创建示例分类
         self.scale_factor = 1.0  # 缩放因子，默认1.0
         self.min_scale = 0.5  # 最小缩放
         self.max_scale = 2.0  # 最大缩放
-        self.config_path = os.path.join("profile", "config.json")  # 配置文件路径
+        self.virtual_view = False  # 是否使用虚拟化网格（模型/视图）显示应用，F6切换
+        self.config_path = os.path.join("profile", "config.json")  # 旧版配置文件，仅用于迁移
+        self.ensure_profile_directory_exists()
+        # 配置、收藏和应用自定义设置，修改后延迟批量提交
+        self.state = StateStore(os.path.join("profile", "state.db"))
+        self.state_save_timer = QTimer(self)
+        self.state_save_timer.setSingleShot(True)
+        self.state_save_timer.setInterval(500)
+        self.state_save_timer.timeout.connect(self.state.flush)
+        self.state.on_dirty = self.state_save_timer.start
+        self.config_loaded = False  # 配置恢复之前的移动和缩放不记录
+        # 图标缓存，每个程序保存五级尺寸
+        self.icon_cache = IconCache(os.path.dirname(self.config_path), max_bytes=128 * 1024 * 1024)
+        self.scaled_icons = ScaledIconCache(self.icon_cache)  # 按当前缩放尺寸缩放好的图标，相同的图标共用一份
+        self.placeholder_icons = {}  # {边长: 默认占位图标}，所有没有图标的应用共用
+        self.icon_checked = set()  # 本轮加载中已查找过或已提交提取的目标程序，不重复提交
+
+        # 后台加载：快捷方式解析和图标提取在线程池中进行，结果通过信号回到GUI线程
+        self.thread_pool = QThreadPool()
+        self.loader_signals = LoaderSignals()
+        self.loader_signals.root_scanned.connect(self.on_root_scanned)
+        self.loader_signals.category_loaded.connect(self.on_category_loaded)
+        self.loader_signals.icons_loaded.connect(self.on_icons_loaded)
+        self.loader_signals.system_index_updated.connect(self.on_system_index_updated)
+        self.load_generation = 0  # 每次重新加载递增，用于丢弃过期结果
+        self.display_pending = False
+        self.scan_serial = 0  # 根目录和分类扫描任务的序号
+        self.category_serials = {}  # {分类目录: 最近一次扫描的序号}，同一分类只接受最新的扫描结果
+        self.scan_stamps = {}  # {分类目录: 最近一次扫描开始时的目录标记}
+        self.hot_dirs = set()  # 含常用应用的分类目录
+        # 根目录：每个根目录单独列出和计时，响应慢或无法访问时继续显示上次的内容
+        self.root_pools = {}  # {根目录: QThreadPool}
+        self.root_scans = {}  # {根目录: 扫描序号}，正在列出的根目录
+        self.root_rescans = set()  # 列出期间又被要求重新列出的根目录
+        self.root_status = {}  # {根目录: (状态, 错误信息)}，状态为 scanning/ok/slow/unreachable
+        self.full_rescan_roots = set()  # F5 后需要完整重新解析的根目录
+        self.known_dirs = {}  # {根目录: 上次成功列出的分类目录}
+        self.watched_dirs = {}  # {监视的绝对路径: 根目录或分类目录}
+        # 折叠的分类：解析推迟到展开或搜索时，折叠较久后释放图标
+        self.deferred_dirs = {}  # {分类目录: 目录标记}，因分类折叠而推迟解析的目录
+        # {分类名: 折叠开始的时间}，上次关闭时已折叠的分类从启动时算起
+        self.collapsed_since = {category: time.monotonic() for category in self.collapsed_categories}
+        self.displayed_paths = set()  # 当前显示中的应用，释放图标时跳过
+        self.pixmap_sweep_timer = QTimer(self)
+        self.pixmap_sweep_timer.setInterval(60 * 1000)
+        self.pixmap_sweep_timer.timeout.connect(self.drop_idle_pixmaps)
+        self.pixmap_sweep_timer.start()
+        # 目录快照：{分类目录: (目录修改时间, 条目数)}，与当前目录一致的分类直接沿用已解析的结果
+        self.snapshot_path = os.path.join("profile", "catalog_snapshot.bin")
+        snapshot = load_snapshot(self.snapshot_path)
+        self.category_stamps = {directory: stamp for directory, (stamp, _) in snapshot.items()}
+        self.snapshot_apps = {directory: apps for directory, (_, apps) in snapshot.items()}
+        self.snapshot_save_timer = QTimer(self)
+        self.snapshot_save_timer.setSingleShot(True)
+        self.snapshot_save_timer.setInterval(2000)
+        self.snapshot_save_timer.timeout.connect(self.save_catalog_snapshot)
+
+        # 监视应用目录，新增/删除/修改快捷方式时只增量更新对应分类
+        self.fs_watcher = QFileSystemWatcher(self)
+        self.fs_watcher.directoryChanged.connect(self.on_directory_changed)
+        self.changed_dirs = set()
+        self.own_changes = {}  # {分类目录: 目录标记}，启动器自己重命名/移动/删除快捷方式后的目录状态，不必重新扫描
+        self.watch_timer = QTimer(self)  # 合并一批连续的文件变化（如一次解压几十个快捷方式）
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.setInterval(300)
+        self.watch_timer.timeout.connect(self.apply_directory_changes)
+
+        # 常驻的界面控件：应用按钮和分类区块只在增删时创建/销毁
+        self.app_tiles = {}  # {按钮键: QToolButton}，键为快捷方式路径，常用区块的按钮另有前缀（见 tile_key）
+        self.category_sections = {}  # {分类名: 分类区块控件}
+        self.section_order = []
+        self.visible_apps = {}  # 当前显示的应用 {分类名: [应用列表]}
+        self.applied_scale = None
+        self.reflow_timer = QTimer(self)
+        self.reflow_timer.setSingleShot(True)
+        self.reflow_timer.setInterval(16)
+        self.reflow_timer.timeout.connect(self.reflow_after_resize)
+        self.launch_executor = LaunchExecutor(os.path.join("profile", "launch_stats.json"), self)
+        self.launch_executor.launched.connect(self.on_app_launched)
+        self.usage_log = UsageLog(os.path.join("profile", "usage.log"))
+        self.hot_paths = set()  # 使用评分最高的应用，加载时优先处理
+        self.search_index = SearchIndex()
+        self.search_index.set_boosts(self.usage_log.all_scores())  # 随分类加载增量维护的搜索索引
+        self.search_timer = QTimer(self)  # 输入防抖，连续输入时只搜索最后一次
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(30)
+        self.search_timer.timeout.connect(self.flush_search)
+        self.zoom_timer = QTimer(self)  # 合并快速滚动滚轮产生的多次缩放，只按最终缩放重绘一次
+        self.zoom_timer.setSingleShot(True)
+        self.zoom_timer.setInterval(40)
+        self.zoom_timer.timeout.connect(self.update_scale)
+        self.icon_cache_save_timer = QTimer(self)
+        self.icon_cache_save_timer.setSingleShot(True)
+        self.icon_cache_save_timer.setInterval(1000)
+        self.icon_cache_save_timer.timeout.connect(self.icon_cache.save)
+        # 运行时指标：事件循环延迟只在浮层显示或开启 --metrics-dump 时测量
+        self.event_loop_probe = EventLoopProbe(self)
+        self.metrics_dump_timer = QTimer(self)
+        self.metrics_dump_timer.setInterval(5000)
+        self.metrics_dump_timer.timeout.connect(lambda: metrics.write(self.metrics_report()))
+        if metrics.dump_path:
+            self.event_loop_probe.start()
+            self.metrics_dump_timer.start()
+        # 页缓存预热（配置中开启），用户操作时暂停，空闲一段时间后继续
+        self.prewarmer = None
+        self.prewarm_top = 8
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(PREWARM_IDLE_MS)
+        self.idle_timer.timeout.connect(self.on_idle)
+        # 系统范围的可启动项索引（配置中开启），与预热一样只在空闲时爬取
+        self.system_indexer = None
+        self.system_items = {}  # {目录: {项目路径: 项目}}，后台索引回传的结果
+        self.other_index = SearchIndex()  # 系统索引项目的搜索索引，与应用目录的索引分开
+        self.other_index_pending = deque()  # 待执行的 (目录, 项目路径, 项目或None)，None表示移除
+        self.other_index_timer = QTimer(self)  # 分批执行，大目录（如 /usr/bin）变化时不卡住界面
+        self.other_index_timer.setInterval(0)
+        self.other_index_timer.timeout.connect(self.apply_other_index_updates)
+        self.other_index.set_boosts(self.search_index.boosts)
+        self.other_results = []  # 当前显示的“其他结果”
+
         self.init_ui()
 
     def init_ui(self):
@@ -61,7 +338,8 @@ class AppLauncher(QMainWindow):
         # 添加搜索框
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("搜索应用...")
-        self.search_box.textChanged.connect(self.filter_apps)
+        self.search_box.textChanged.connect(self.search_timer.start)
+        self.search_box.textChanged.connect(self.note_activity)
         self.search_box.setStyleSheet("""
             QLineEdit {
                 border: 1px solid #CCCCCC;
@@ -73,6 +351,13 @@ class AppLauncher(QMainWindow):
         """)
         main_layout.addWidget(self.search_box)
 
+        # 响应慢或无法访问的根目录提示，所有根目录正常时隐藏
+        self.root_status_label = QLabel()
+        self.root_status_label.setStyleSheet("color: #B45309; font-size: 12px; padding: 2px 4px;")
+        self.root_status_label.setWordWrap(True)
+        self.root_status_label.hide()
+        main_layout.addWidget(self.root_status_label)
+
         # 创建滚动区域用于显示应用图标（只垂直滚动）
         self.scroll_area = QScrollArea()
         self.scroll_area.setWidgetResizable(True)
@@ -91,15 +376,29 @@ class AppLauncher(QMainWindow):
         self.main_content_layout.setSpacing(20)
         # 调整主内容边距，增加右边距避免被滚动条遮挡
         self.main_content_layout.setContentsMargins(10, 10, 25, 10)
+        # 添加一个伸缩项，将所有内容推到顶部
+        self.main_content_layout.addStretch()
 
         self.scroll_area.setWidget(self.scroll_content)
         main_layout.addWidget(self.scroll_area)
 
+        # 虚拟化网格：只绘制可见区域内的应用，不为每个应用创建控件
+        self.grid_view = AppGridView()
+        self.grid_view.delegate.icon_provider = self.app_pixmap
+        self.grid_view.clicked.connect(self.on_grid_clicked)
+        self.grid_view.customContextMenuRequested.connect(self.on_grid_context_menu)
+        self.grid_view.header_clicked.connect(self.toggle_category)
+        main_layout.addWidget(self.grid_view)
+        self.apply_view_mode()
+
+        # 运行时指标浮层，叠在内容之上，F12切换
+        self.metrics_overlay = MetricsOverlay(self.metrics_report, central_widget)
+
         # 确保应用目录和配置目录存在
         self.ensure_apps_directory_exists()
         self.ensure_profile_directory_exists()
 
-        # 加载应用程序
+        # 加载应用程序（后台进行，不阻塞窗口显示）
         self.load_applications()
 
         # 设置窗口样式
@@ -109,6 +408,12 @@ class AppLauncher(QMainWindow):
             }
         """)
 
+        # 常驻模式下接收其他进程的命令，系统托盘可用时显示托盘图标
+        self.instance_server = None
+        self.tray_icon = None
+        if self.resident:
+            self.start_resident_mode()
+
         # 显示窗口
         self.show()
 
@@ -119,7 +424,9 @@ class AppLauncher(QMainWindow):
             os.makedirs(profile_dir)
 
     def ensure_apps_directory_exists(self):
-        """确保存放应用分类的目录存在"""
+        """确保存放应用分类的目录存在（只处理启动器目录下的相对路径，不访问可能很慢的网络共享）"""
+        if os.path.isabs(self.apps_root_dir):
+            return
         if not os.path.exists(self.apps_root_dir):
             os.makedirs(self.apps_root_dir)
             # 创建几个示例分类文件夹
@@ -130,285 +437,1109 @@ class AppLauncher(QMainWindow):
     def load_config(self):
         """加载保存的配置"""
         try:
-            if os.path.exists(self.config_path):
+            config = dict(self.state.namespace("config"))
+            if not config and os.path.exists(self.config_path):
+                # 从旧版的 config.json 迁移
                 with open(self.config_path, 'r', encoding='utf-8') as f:
                     config = json.load(f)
-
-                    # 恢复窗口位置
-                    if "pos" in config:
-                        self.move(QPoint(config["pos"][0], config["pos"][1]))
-
-                    # 恢复窗口大小
-                    if "size" in config:
-                        self.resize(config["size"][0], config["size"][1])
-                    else:
-                        self.setGeometry(100, 100, 1000, 700)  # 默认大小
-
-                    # 恢复缩放因子
-                    if "scale_factor" in config:
-                        # 确保缩放因子在有效范围内
-                        self.scale_factor = max(self.min_scale,
-                                                min(self.max_scale, config["scale_factor"]))
+                self.state.update("config", config)
+
+            # 应用根目录
+            self.roots = catalog_roots(config)
+            self.apps_root_dir = self.roots[0]
+            self.root_timeout_ms = int(config.get("root_timeout_ms", ROOT_TIMEOUT_MS))
+
+            # 页缓存预热
+            if config.get("prewarm", False):
+                self.prewarm_top = int(config.get("prewarm_top", 8))
+                self.prewarmer = Prewarmer(
+                    budget_bytes=int(config.get("prewarm_budget_mb", 256)) * 1024 * 1024,
+                    rate_bytes=int(config.get("prewarm_rate_mb_s", 32)) * 1024 * 1024,
+                )
+                self.idle_timer.start()
+
+            # 系统范围的可启动项索引：先读入保存的结果，空闲时继续爬取
+            if config.get("system_index", False):
+                self.system_indexer = SystemIndexer(
+                    os.path.join("profile", "system_index.bin"), index_locations(config),
+                    self.loader_signals.system_index_updated.emit,
+                    dirs_per_second=int(config.get("system_index_dirs_per_second", DIRS_PER_SECOND)),
+                )
+                self.system_indexer.start()
+                self.idle_timer.start()
+
+            if config:
+                # 恢复窗口位置
+                if "pos" in config:
+                    self.move(QPoint(config["pos"][0], config["pos"][1]))
+
+                # 恢复窗口大小
+                if "size" in config:
+                    self.resize(config["size"][0], config["size"][1])
+                else:
+                    self.setGeometry(100, 100, 1000, 700)  # 默认大小
+
+                # 恢复显示模式
+                self.virtual_view = bool(config.get("virtual_view", False))
+
+                # 恢复缩放因子
+                if "scale_factor" in config:
+                    # 确保缩放因子在有效范围内
+                    self.scale_factor = max(self.min_scale,
+                                            min(self.max_scale, config["scale_factor"]))
         except Exception as e:
             print(f"加载配置失败: {e}")
             # 使用默认设置
             self.setGeometry(100, 100, 1000, 700)
+        self.config_loaded = True
 
     def save_config(self):
-        """保存当前配置"""
-        try:
-            # 确保配置目录存在
-            self.ensure_profile_directory_exists()
-
-            config = {
-                "pos": [self.x(), self.y()],  # 窗口位置
-                "size": [self.width(), self.height()],  # 窗口大小
-                "scale_factor": self.scale_factor  # 缩放因子
-            }
-
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"保存配置失败: {e}")
+        """记录当前配置，只修改内存中的状态，由定时器合并后写入"""
+        if not self.config_loaded:
+            return
+        self.state.update("config", {
+            "pos": [self.x(), self.y()],  # 窗口位置
+            "size": [self.width(), self.height()],  # 窗口大小
+            "scale_factor": self.scale_factor,  # 缩放因子
+            "virtual_view": self.virtual_view  # 显示模式
+        })
 
     def closeEvent(self, event):
         """窗口关闭时保存配置"""
         self.save_config()
+        if self.resident and not self.quitting:
+            # 常驻模式只隐藏窗口，下次显示时不必重新加载
+            self.state.flush()
+            self.hide()
+            event.ignore()
+            return
+        if self.instance_server:
+            self.instance_server.close()
+        if self.tray_icon:
+            self.tray_icon.hide()
+        # 丢弃尚未开始的后台任务
+        self.load_generation += 1
+        self.thread_pool.clear()
+        for pool in self.root_pools.values():
+            pool.clear()
+        self.icon_cache.close()
+        self.launch_executor.shutdown()
+        if self.prewarmer:
+            self.prewarmer.stop()
+        if self.system_indexer:
+            self.system_indexer.stop()
+        if metrics.dump_path:
+            metrics.write(self.metrics_report())
+        self.state.close()
+        if self.snapshot_save_timer.isActive():
+            self.save_catalog_snapshot()
+        tracer.write()
         event.accept()
 
-    def load_applications(self):
-        """从相对目录加载分类好的应用程序"""
-        self.app_categories.clear()
-
-        # 遍历应用根目录下的所有文件夹（分类）
-        for category in os.listdir(self.apps_root_dir):
-            category_path = os.path.join(self.apps_root_dir, category)
+    def start_resident_mode(self):
+        """开始监听本地套接字；已有存活的常驻实例时按普通模式运行"""
+        server = InstanceServer(server_name(), self.handle_remote_command, self)
+        if not server.listen():
+            print("已有常驻实例在运行，本实例按普通模式运行")
+            self.resident = False
+            return
+        self.instance_server = server
+        QApplication.instance().setQuitOnLastWindowClosed(False)
+
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            self.tray_icon = QSystemTrayIcon(self.default_icon(), self)
+            self.tray_icon.setToolTip(self.windowTitle())
+            tray_menu = QMenu(self)
+            tray_menu.addAction("显示", self.show_window)
+            tray_menu.addAction("退出", self.quit_resident)
+            self.tray_icon.setContextMenu(tray_menu)
+            self.tray_icon.activated.connect(
+                lambda reason: self.show_window() if reason == QSystemTrayIcon.ActivationReason.Trigger else None
+            )
+            self.tray_icon.show()
+
+    def show_window(self, query=""):
+        """显示并激活窗口，query 不为空时填入搜索框"""
+        self.note_activity()
+        if self.isMinimized():
+            self.showNormal()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        if query:
+            self.search_box.setText(query)
+        self.search_box.setFocus()
+
+    def quit_resident(self):
+        """退出常驻实例"""
+        self.quitting = True
+        self.close()
+        QApplication.instance().quit()
+
+    def find_app(self, name):
+        """名称完全相同的目录应用优先，否则取搜索结果的第一个（目录中没有时在系统索引中查找）"""
+        return find_app((app for apps in self.app_categories.values() for app in apps), name,
+                        (self.search_index, self.other_index))
+
+    def handle_remote_command(self, command, message):
+        """处理其他进程通过本地套接字发来的命令，返回值作为回复的结果"""
+        argument = message.get("argument") or ""
+        if command == "show":
+            self.show_window(argument)
+            return None
+        if command == "list":
+            return [app_summary(app) for category in sorted(self.app_categories)
+                    for app in self.app_categories[category]]
+        if command == "search":
+            return [app_summary(app) for app in self.search_index.search(argument, message.get("limit"))]
+        if command == "launch":
+            app = self.find_app(argument)
+            if app is None:
+                raise LookupError(f"未找到应用: {argument}")
+            self.launch_app(app)
+            return app_summary(app)
+        if command == "metrics":
+            return self.metrics_report()
+        if command == "quit":
+            QTimer.singleShot(0, self.quit_resident)  # 先回复再退出
+            return None
+        raise ValueError(f"未知的命令: {command}")
+
+    def load_applications(self, use_snapshot=True):
+        """
+        从各个根目录加载分类好的应用程序：先显示上次已知的内容（已加载的或快照中的），
+        再在后台逐个根目录重新验证，每个根目录单独计时，网络共享等慢速位置不会阻塞界面；
+        目录修改时间和条目数都没变的分类沿用已有结果，有变化的分类交给后台线程解析
+        use_snapshot 为False时（F5）忽略已有结果，完整重新扫描
+        """
+        self.load_generation += 1
+        self.thread_pool.clear()  # 上一轮尚未开始的任务不再需要
+        self.icon_checked.clear()
+        for pool in self.root_pools.values():
+            pool.clear()
+        self.changed_dirs.clear()
+        self.watch_timer.stop()
+        if not use_snapshot:
+            self.full_rescan_roots = set(self.roots)
+
+        # 常用应用所在的分类先解析
+        self.hot_paths = set(self.usage_log.top(HOT_COUNT))
+        self.hot_dirs = {os.path.dirname(path) for path in self.hot_paths}
+
+        with tracer.span("load_applications", roots=len(self.roots)):
+            # 不再属于任何根目录的分类移除
+            for directory in list(self.dir_apps) + list(self.deferred_dirs):
+                if self.root_of(directory) not in self.roots:
+                    self.remove_dir(directory)
+
+            # 快照中的内容立即显示，不等待目录验证（旧内容先用着，后台验证后再更新）
+            for directory in self.snapshot_apps:
+                if self.root_of(directory) in self.roots and directory not in self.dir_apps:
+                    self.apply_dir_apps(directory, self.snapshot_apps[directory])
+            self.snapshot_apps = {}  # 快照只在启动时使用一次
+            self.schedule_display()
+
+            for root in self.roots:
+                self.start_root_scan(root)
+
+    @staticmethod
+    def root_of(directory):
+        """分类目录所属的根目录"""
+        return os.path.dirname(directory)
+
+    def root_pool(self, root):
+        """
+        每个根目录使用自己的线程池：网络共享上阻塞的系统调用无法取消，
+        放在单独的线程池中不会占用其他根目录和图标提取的线程
+        """
+        pool = self.root_pools.get(root)
+        if pool is None:
+            pool = self.root_pools[root] = QThreadPool()
+        return pool
+
+    def start_root_scan(self, root):
+        """在后台列出根目录下的分类文件夹，超时后标记为响应慢，结果到达时再更新"""
+        if root in self.root_scans:
+            # 上一次列出还没有结果（根目录响应慢），等它结束后再列出一次
+            self.root_rescans.add(root)
+            return
+        self.scan_serial += 1
+        serial = self.scan_serial
+        self.root_scans[root] = serial
+        self.set_root_status(root, 'scanning')
+        self.root_pool(root).start(RootScanTask(self.loader_signals, self.load_generation, root))
+        QTimer.singleShot(self.root_timeout_ms, lambda: self.on_root_timeout(root, serial))
+
+    def on_root_timeout(self, root, serial):
+        if self.root_scans.get(root) == serial:
+            self.set_root_status(root, 'slow')
+
+    def set_root_status(self, root, status, error=""):
+        """记录根目录的状态，响应慢或无法访问的根目录显示在搜索框下方"""
+        self.root_status[root] = (status, error)
+        notes = []
+        for other in self.roots:
+            other_status, other_error = self.root_status.get(other, ('', ""))
+            if other_status == 'slow':
+                notes.append(f"{other}：响应慢，显示的是上次的内容")
+            elif other_status == 'unreachable':
+                notes.append(f"{other}：无法访问（{other_error}），显示的是上次的内容")
+        self.root_status_label.setText("\n".join(notes))
+        self.root_status_label.setVisible(bool(notes))
+
+    def on_root_scanned(self, generation, root, directories, error):
+        """根目录列出完成：移除消失的分类，重新解析目录标记有变化的分类"""
+        self.root_scans.pop(root, None)
+        if root not in self.roots:
+            return
+        if root in self.root_rescans or generation != self.load_generation:
+            # 列出期间又有新的加载请求，结果可能已过期
+            self.root_rescans.discard(root)
+            self.start_root_scan(root)
+            return
+        if directories is None:
+            # 无法访问，保留上次的内容
+            print(f"读取应用目录失败: {error}")
+            self.set_root_status(root, 'unreachable', error)
+            return
+        self.set_root_status(root, 'ok')
+        full_rescan = root in self.full_rescan_roots
+        self.full_rescan_roots.discard(root)
+
+        for directory in list(self.dir_apps) + list(self.deferred_dirs):
+            if self.root_of(directory) == root and directory not in directories:
+                self.remove_dir(directory)
+        for directory in sorted(directories, key=lambda directory: directory not in self.hot_dirs):
+            stamp = directories[directory]
+            # 没有应用的分类不在 dir_apps 中，目录标记已知时视为空列表
+            previous_apps = None if full_rescan else self.dir_apps.get(
+                directory, [] if directory in self.category_stamps else None)
+            if previous_apps is not None and stamp is not None and self.category_stamps.get(directory) == stamp:
+                continue  # 分类目录没有变化，显示的就是最新内容
+            self.request_category_scan(directory, previous_apps, stamp)
+        self.known_dirs[root] = set(directories)
+        self.watch_directories()
+        self.schedule_display()
+
+    def start_category_scan(self, directory, previous_apps=None, stamp=None):
+        """在线程池中扫描一个分类目录，previous_apps 为上次的应用列表时只重新解析有变化的快捷方式"""
+        self.scan_serial += 1
+        self.category_serials[directory] = self.scan_serial
+        # 目录标记在扫描开始前取得，扫描期间的变化会让下次启动重新扫描
+        self.scan_stamps[directory] = stamp or directory_stamp(directory)
+        # 含常用应用的分类优先
+        priority = 1 if directory in self.hot_dirs else 0
+        self.root_pool(self.root_of(directory)).start(
+            CategoryLoadTask(self, self.load_generation, self.scan_serial, os.path.basename(directory),
+                             directory, previous_apps),
+            priority
+        )
 
-            # 只处理目录
-            if os.path.isdir(category_path):
-                apps_in_category = []
+    def request_category_scan(self, directory, previous_apps=None, stamp=None):
+        """扫描一个分类目录；分类折叠时推迟到展开或搜索时（含常用应用的目录除外）"""
+        if os.path.basename(directory) in self.collapsed_categories and directory not in self.hot_dirs:
+            self.deferred_dirs[directory] = stamp
+            return
+        self.start_category_scan(directory, previous_apps, stamp)
+
+    def load_deferred(self, category=None):
+        """开始解析推迟的分类目录，category 为None时解析全部"""
+        for directory in list(self.deferred_dirs):
+            if category is None or os.path.basename(directory) == category:
+                stamp = self.deferred_dirs.pop(directory)
+                previous_apps = self.dir_apps.get(directory, [] if directory in self.category_stamps else None)
+                self.start_category_scan(directory, previous_apps, stamp)
+
+    def remove_dir(self, directory):
+        """从目录和搜索索引中移除一个分类目录"""
+        self.deferred_dirs.pop(directory, None)
+        apps = self.dir_apps.pop(directory, None)
+        if apps is not None:
+            self.update_search_index(apps, [])
+            self.rebuild_category(os.path.basename(directory))
+        self.category_serials.pop(directory, None)
+        self.scan_stamps.pop(directory, None)
+        if self.category_stamps.pop(directory, None) is not None:
+            self.snapshot_save_timer.start()
+
+    def rebuild_category(self, category):
+        """同名分类可能分布在多个根目录中，按根目录的顺序合并成一个分类显示"""
+        apps = []
+        for root in self.roots:
+            apps.extend(self.dir_apps.get(os.path.join(root, category), ()))
+        if apps:
+            self.app_categories[category] = apps
+        else:
+            self.app_categories.pop(category, None)
+
+    def watch_directories(self):
+        """监视已成功列出的根目录和其中的分类目录（响应慢或无法访问的根目录不监视，避免阻塞）"""
+        self.watched_dirs = {}
+        for root in self.roots:
+            if self.root_status.get(root, ('',))[0] != 'ok':
+                continue
+            self.watched_dirs[os.path.abspath(root)] = root
+            for directory in self.known_dirs.get(root, ()):
+                self.watched_dirs[os.path.abspath(directory)] = directory
+        watched = set(self.fs_watcher.directories())
+        stale = [path for path in watched if path not in self.watched_dirs]
+        if stale:
+            self.fs_watcher.removePaths(stale)
+        new = [path for path in self.watched_dirs if path not in watched]
+        if new:
+            self.fs_watcher.addPaths(new)
+
+    def on_directory_changed(self, path):
+        """目录内容变化：记下目录，等这一批变化结束后再统一处理"""
+        self.changed_dirs.add(path)
+        self.watch_timer.start()
+
+    def apply_directory_changes(self):
+        """把积累的目录变化合并成一次增量更新，只重新扫描受影响的根目录和分类"""
+        changed = self.changed_dirs
+        self.changed_dirs = set()
+
+        for path in changed:
+            expected = self.own_changes.pop(path, None)
+            if expected is not None and expected == directory_stamp(path):
+                continue  # 变化来自 mutate_catalog，目录中已是最新内容
+            watched = self.watched_dirs.get(path)
+            if watched in self.roots:
+                # 分类文件夹被新建、删除或重命名，重新列出这个根目录
+                self.start_root_scan(watched)
+            elif watched is not None:
+                # 已在目录中的应用若快捷方式未变化，直接沿用，不重新解析和提取图标
+                self.request_category_scan(watched, self.dir_apps.get(watched))
+
+    def on_category_loaded(self, generation, serial, directory, apps):
+        """一个分类目录解析完成：记录目录标记后更新显示"""
+        if generation != self.load_generation or self.category_serials.get(directory) != serial:
+            return
+        stamp = self.scan_stamps.pop(directory, None)
+        if stamp is not None and self.category_stamps.get(directory) != stamp:
+            self.category_stamps[directory] = stamp
+            self.snapshot_save_timer.start()
+        elif stamp is None:
+            self.category_stamps.pop(directory, None)
+        self.apply_dir_apps(directory, apps)
+
+    def apply_dir_apps(self, directory, apps):
+        """用分类目录的新应用列表替换旧的：先用占位图标显示，再在后台提取真实图标（折叠的分类在显示时才提取）"""
+        if not apps:  # 只添加有应用的分类
+            if directory in self.dir_apps:
+                self.update_search_index(self.dir_apps.pop(directory), [])
+                self.rebuild_category(os.path.basename(directory))
+                self.schedule_display()
+            return
 
-                # 遍历分类目录下的所有快捷方式
-                for file in os.listdir(category_path):
-                    file_path = os.path.join(category_path, file)
+        if os.path.basename(directory) in self.collapsed_categories:
+            placeholder = self.default_icon()
+            for app in apps:
+                if not app.get('has_icon'):
+                    app['icon'] = placeholder
+                    app['has_icon'] = False
+        else:
+            self.resolve_icons(apps)
+
+        self.apply_overrides(apps)
+        self.update_search_index(self.dir_apps.get(directory, []), apps)
+        self.dir_apps[directory] = apps
+        self.rebuild_category(os.path.basename(directory))
+        self.schedule_display()
+
+    def resolve_icons(self, apps):
+        """为还没有真实图标的应用取得图标：缓存中有的直接使用，其余用占位图标显示并交给后台提取"""
+        placeholder = self.default_icon()
+        icon_size = self.icon_pixel_size()
+        pending_targets = {}  # {目标路径: 优先级}
+        for app in apps:
+            if app.get('has_icon'):  # 沿用的应用已有图标
+                continue
+            target_path = self.icon_key(app)
+            icon = self.scaled_icons.icon(target_path, icon_size)
+            if icon:
+                app['icon'] = icon
+                app['has_icon'] = True
+                continue
+            app['icon'] = placeholder
+            app['has_icon'] = False
+            if target_path in self.icon_checked:
+                continue  # 已在提取中，或不是可以提取图标的程序
+            if os.path.exists(target_path) and (target_path.lower().endswith('.exe') or app.get('system')):
+                # 常用应用的图标先提取
+                priority = 2 if app['path'] in self.hot_paths else 0
+                pending_targets[target_path] = max(priority, pending_targets.get(target_path, 0))
+            else:
+                self.icon_checked.add(target_path)
+
+        batches = {}  # {优先级: [目标路径]}
+        for target_path, priority in pending_targets.items():
+            self.icon_checked.add(target_path)
+            batches.setdefault(priority, []).append(target_path)
+        for priority, targets in batches.items():
+            for i in range(0, len(targets), ICON_BATCH):
+                batch = targets[i:i + ICON_BATCH]
+                self.thread_pool.start(IconLoadTask(self, self.load_generation, batch), priority)
+
+    def on_icons_loaded(self, generation, batch):
+        """后台提取的一批图标到达：各级尺寸写入缓存，再遍历一次应用替换界面上的占位图标"""
+        if generation != self.load_generation:
+            return
 
-                    # 只处理.lnk快捷方式文件
-                    if file.lower().endswith('.lnk'):
-                        try:
-                            # 解析快捷方式
-                            lnk_info = self.parse_shortcut(file_path)
-                            if lnk_info:
-                                app_name = os.path.splitext(file)[0]  # 从文件名获取应用名
-                                target_path = lnk_info['target']
-
-                                # 获取图标
-                                icon = self.get_app_icon(target_path)
-
-                                apps_in_category.append({
-                                    'name': app_name,
-                                    'path': file_path,  # 快捷方式路径
-                                    'target': target_path,  # 实际应用路径
-                                    'icon': icon,
-                                    'category': category
-                                })
-                        except Exception as e:
-                            print(f"处理快捷方式 {file} 时出错: {e}")
-
-                if apps_in_category:  # 只添加有应用的分类
-                    self.app_categories[category] = apps_in_category
-
-        # 加载收藏的应用
-        self.load_favorite_apps()
-
-        # 显示应用图标
-        self.display_apps()
-
-    def parse_shortcut(self, lnk_path):
-        """解析Windows快捷方式(.lnk)文件"""
-        try:
-            pythoncom.CoInitialize()
-            shell = win32com.client.Dispatch("WScript.Shell")
-            shortcut = shell.CreateShortCut(lnk_path)
-            return {
-                'target': shortcut.Targetpath,
-                'arguments': shortcut.Arguments,
-                'working_dir': shortcut.WorkingDirectory
-            }
-        except Exception as e:
-            print(f"解析快捷方式失败: {e}")
-            return None
-        finally:
-            pythoncom.CoUninitialize()
+        icon_size = self.icon_pixel_size()
+        icons = {}  # {目标路径: QIcon}
+        for target_path, levels in batch.items():
+            for level, buffer in levels.items():
+                self.icon_cache.put(target_path, level, buffer.width, buffer.height, buffer.data)
+            self.scaled_icons.invalidate(target_path)
+            icon = self.scaled_icons.icon(target_path, icon_size)
+            if icon:
+                icons[target_path] = icon
+        self.icon_cache_save_timer.start()
+        if not icons:
+            return
 
-    def get_app_icon(self, exe_path):
-        """从可执行文件获取图标，调用外部extract_icon函数"""
+        for apps in list(self.app_categories.values()) + [self.other_results]:
+            for app in apps:
+                icon = icons.get(self.icon_key(app))
+                if icon:
+                    app['icon'] = icon
+                    app['has_icon'] = True
+                    self.grid_view.app_model.app_changed(app['path'])
+        # 同一个应用可能同时出现在常用区块和所属分类中
+        for tile in self.app_tiles.values():
+            icon = icons.get(self.icon_key(tile.app))
+            if icon:
+                tile.setIcon(icon)
+
+    def save_catalog_snapshot(self):
+        """把已解析的目录写入快照"""
+        self.snapshot_save_timer.stop()
+        with tracer.span("save_catalog_snapshot", categories=len(self.category_stamps)):
+            save_snapshot(self.snapshot_path, self.dir_apps, self.category_stamps)
+
+    def update_search_index(self, old_apps, apps):
+        """用分类目录的新应用列表替换索引中的旧条目"""
+        for app in old_apps:
+            self.search_index.remove(app['path'])
+        for app in apps:
+            self.search_index.add(app)
+
+    def schedule_display(self):
+        """合并同一轮事件循环内的多次刷新请求"""
+        if not self.display_pending:
+            self.display_pending = True
+            QTimer.singleShot(0, self.flush_display)
+
+    def flush_display(self):
+        self.display_pending = False
+        # 保持当前的搜索过滤
+        self.search_timer.stop()
+        self.filter_apps(self.search_box.text())
+
+    def flush_search(self):
+        """防抖结束后执行搜索"""
+        self.filter_apps(self.search_box.text())
+
+    def load_icon_data(self, exe_path):
+        """
+        按最大一级尺寸提取图标并生成金字塔，返回 {边长: IconBuffer}，失败返回None
+        只创建QImage（不创建QPixmap和控件），可在后台线程调用
+        """
         try:
-            if os.path.exists(exe_path) and exe_path.lower().endswith('.exe'):
-                # 调用外部函数获取PIL Image对象
-                pil_image = extract_icon(exe_path)
-                if pil_image:
-                    # 保持alpha通道（透明）
-                    img = pil_image.convert("RGBA")
-                    data = img.tobytes("raw", "RGBA")
-                    q_image = QImage(data, img.width, img.height, QImage.Format.Format_RGBA8888)
-
-                    # 转换为QPixmap并创建QIcon
-                    pixmap = QPixmap.fromImage(q_image)
-                    return QIcon(pixmap)
+            # 提取后端直接返回预乘BGRA像素
+            with tracer.span("extract_icon", target=exe_path):
+                buffer = extract_icon(exe_path, ICON_LEVELS[-1])
+            if buffer:
+                # 保持alpha通道（透明），缩小到各级尺寸
+                return build_pyramid(buffer)
         except Exception as e:
             print(f"获取图标失败: {e}")
+        return None
+
+    @staticmethod
+    def icon_key(app):
+        """提取和缓存图标用的文件：一般是目标程序，系统索引中的 .desktop 项目是 .desktop 文件本身"""
+        return app.get('icon_key') or app['target']
 
-        # 如果无法获取图标，返回带透明背景的默认图标
+    def icon_pixel_size(self):
+        """当前缩放下图标的边长"""
+        return int(ICON_SIZE * self.scale_factor)
+
+    def app_pixmap(self, app, size):
+        """虚拟化网格绘制时按需取得缩放好的图标，尚无真实图标时返回None"""
+        if not app.get('has_icon'):
+            return None
+        return self.scaled_icons.pixmap(self.icon_key(app), size)
+
+    def default_icon(self):
+        """带透明背景的默认占位图标，每种尺寸只绘制一次"""
+        icon = self.placeholder_icons.get(self.icon_pixel_size())
+        if icon is not None:
+            return icon
         default_pixmap = QPixmap(int(64 * self.scale_factor), int(64 * self.scale_factor))
         default_pixmap.fill(Qt.GlobalColor.transparent)  # 设置透明背景
         painter = QPainter(default_pixmap)
         painter.setPen(QColor(200, 200, 200))
         painter.drawRect(10, 10, int(44 * self.scale_factor), int(44 * self.scale_factor))  # 绘制简单边框作为默认图标
         painter.end()
-        return QIcon(default_pixmap)
-
-    def display_apps(self, filtered_apps=None):
-        """显示应用程序图标，按分类组织"""
-        # 清除现有内容
-        while self.main_content_layout.count():
-            item = self.main_content_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-
-        if filtered_apps:
+        icon = self.placeholder_icons[self.icon_pixel_size()] = QIcon(default_pixmap)
+        return icon
+
+    def display_apps(self, filtered_apps=None, other_apps=None):
+        """
+        显示应用程序图标，按分类组织；控件常驻，只同步增删、切换可见性并重新排列
+        other_apps 为系统索引中的匹配项，搜索时显示在所有分类之后
+        """
+        frequent = self.frequent_apps()
+        self.other_results = other_apps or []
+        if filtered_apps is not None:
             # 处理搜索过滤的情况，按分类重新组织
-            filtered_categories = {}
+            by_category = {}
             for app in filtered_apps:
-                if app['category'] not in filtered_categories:
-                    filtered_categories[app['category']] = []
-                filtered_categories[app['category']].append(app)
-            categories_to_display = filtered_categories
+                by_category.setdefault(app['category'], []).append(app)
+            categories_to_display = {category: by_category[category] for category in sorted(by_category)}
+            if other_apps:
+                categories_to_display[OTHER_CATEGORY] = other_apps
         else:
-            # 显示所有分类
-            categories_order = sorted(self.app_categories.keys())  # 按名称排序分类
-            categories_to_display = {cat: self.app_categories[cat] for cat in categories_order}
-
-        # 按分类显示应用
-        for category, apps in categories_to_display.items():
-            # 添加分类标题
-            category_label = QLabel(category)
-            category_label.setFont(QFont("SimHei", int(14 * self.scale_factor), QFont.Weight.Bold))
-            category_label.setStyleSheet("color: #333333; margin-top: 10px;")
-            self.main_content_layout.addWidget(category_label)
-
-            # 添加分隔线
-            line = QFrame()
-            line.setFrameShape(QFrame.Shape.HLine)
-            line.setFrameShadow(QFrame.Shadow.Sunken)
-            line.setStyleSheet("background-color: #E5E7EB; height: 1px;")
-            self.main_content_layout.addWidget(line)
-
-            # 创建网格布局显示该分类下的应用
-            category_widget = QWidget()
-            grid_layout = QGridLayout(category_widget)
-            grid_layout.setSpacing(int(15 * self.scale_factor))
-            # 增加右 margin 避免被滚动条遮挡
-            grid_layout.setContentsMargins(5, 5, 15, 15)
-
-            # 根据缩放因子和窗口宽度计算列数
-            base_item_width = 160  # 基础宽度
-            scaled_item_width = base_item_width * self.scale_factor
-            cols = max(1, int(self.width() // scaled_item_width))
+            # 显示所有分类，常用应用在最前面，折叠的分类只显示标题
+            categories_to_display = {FREQUENT_CATEGORY: frequent} if frequent else {}
+            collapsed = self.collapsed_categories
+            for category in sorted(self.category_names()):
+                categories_to_display[category] = [] if category in collapsed else self.app_categories[category]
+
+        with tracer.span("display_apps", virtual=self.virtual_view,
+                         apps=sum(len(apps) for apps in categories_to_display.values())), \
+                metrics.timer("display_apps"):
+            # 只为显示出来的应用取得图标
+            displayed = [app for apps in categories_to_display.values() for app in apps]
+            self.displayed_paths = {app['path'] for app in displayed}
+            self.resolve_icons(displayed)
+            if self.virtual_view:
+                # 虚拟化网格只需要重建模型的行列表
+                titles = {category: self.section_title(category) for category in categories_to_display}
+                self.grid_view.app_model.set_categories(categories_to_display, titles,
+                                                        self.collapsed_categories)
+                return
 
-            # 添加应用按钮
-            for i, app in enumerate(apps):
-                row = i // cols
-                col = i % cols
-
-                # 创建应用按钮
-                app_button = QToolButton()
-                app_button.setIcon(app['icon'])
-                # 根据缩放因子调整图标大小
-                icon_size = int(64 * self.scale_factor)
-                app_button.setIconSize(QSize(icon_size, icon_size))
-                app_button.setText(app['name'])
-                app_button.setToolTip(app['target'])
-                app_button.setObjectName(app['path'])
-
-                # 绑定点击事件（启动应用）
-                app_button.clicked.connect(
-                    lambda checked, target=app['target'], args=app.get('arguments', ''):
-                    self.launch_app(target, args)
-                )
+            self.sync_app_tiles(frequent, categories_to_display)
+            self.visible_apps = categories_to_display
+            self.reflow_apps(force=True)
 
-                # 计算按钮尺寸
-                btn_min_width = int(120 * self.scale_factor)
-                btn_max_width = int(140 * self.scale_factor)
-                btn_height = int(140 * self.scale_factor)
-
-                # 设置按钮样式 - 根据缩放因子调整
-                app_button.setStyleSheet(f"""
-                    QToolButton {{
-                        background-color: rgba(255, 255, 255, 0.7);
-                        border: 1px solid transparent;
-                        border-radius: {int(8 * self.scale_factor)}px;
-                        padding: {int(8 * self.scale_factor)}px;
-                        margin: {int(5 * self.scale_factor)}px;
-                        text-align: center;
-                        font-size: {int(12 * self.scale_factor)}px;
-                        min-width: {btn_min_width}px;
-                        max-width: {btn_max_width}px;
-                        min-height: {btn_height}px;
-                        max-height: {btn_height}px;
-                        white-space: normal;
-                        word-wrap: break-word;
-                    }}
-                    QToolButton:hover {{
-                        background-color: rgba(240, 240, 240, 0.9);
-                        border: 1px solid #E5E7EB;
-                    }}
-                    QToolButton:pressed {{
-                        background-color: rgba(220, 220, 220, 0.9);
-                    }}
-                """)
-
-                # 设置文本在图标下方
-                app_button.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
-
-                # 添加右键菜单
-                app_button.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-                app_button.customContextMenuRequested.connect(
-                    lambda pos, app=app, widget=app_button:
-                    self.show_context_menu(pos, app, widget)
-                )
+    def apply_view_mode(self):
+        """在控件网格和虚拟化网格之间切换"""
+        self.scroll_area.setVisible(not self.virtual_view)
+        self.grid_view.setVisible(self.virtual_view)
+        self.grid_view.set_scale(self.scale_factor)
 
-                grid_layout.addWidget(app_button, row, col)
+    def toggle_view_mode(self):
+        """切换显示模式，并释放不再使用的那一套界面"""
+        self.virtual_view = not self.virtual_view
+        self.save_config()
+        self.apply_view_mode()
+        if self.virtual_view:
+            self.visible_apps = {}
+            for tile in self.app_tiles.values():
+                tile.deleteLater()
+            for section in self.category_sections.values():
+                section['widget'].deleteLater()
+            self.app_tiles.clear()
+            self.category_sections.clear()
+            self.section_order = []
+        else:
+            self.grid_view.app_model.set_categories({})
+            self.applied_scale = None
+        self.flush_display()
+
+    def on_grid_clicked(self, index):
+        """虚拟化网格中左键点击应用时启动，按住Ctrl/Shift点击只是多选"""
+        if QApplication.keyboardModifiers() & (Qt.KeyboardModifier.ControlModifier
+                                               | Qt.KeyboardModifier.ShiftModifier):
+            return
+        app = index.data(AppRole)
+        if app:
+            self.launch_app(app)
+
+    def on_grid_context_menu(self, pos):
+        """虚拟化网格中的右键菜单，在多选的应用上右键时对所有选中的应用批量操作"""
+        app = self.grid_view.app_at(pos)
+        if not app:
+            return
+        selected = self.grid_view.selected_apps()
+        if len(selected) > 1 and any(selected_app['path'] == app['path'] for selected_app in selected):
+            self.show_batch_menu(pos, selected, self.grid_view.viewport())
+        else:
+            self.show_context_menu(pos, app, self.grid_view.viewport())
+
+    def sync_app_tiles(self, frequent=None, displayed=None):
+        """
+        使分类区块和应用按钮与 app_categories 及常用应用保持一致：只创建新增的、删除消失的；
+        折叠的分类只为 displayed 中（搜索结果中）的应用创建按钮
+        """
+        collapsed = self.collapsed_categories
+        sections = {}
+        for category in self.category_names():
+            if category in collapsed:
+                sections[category] = (displayed or {}).get(category, [])
+            else:
+                sections[category] = self.app_categories[category]
+        if frequent:
+            sections[FREQUENT_CATEGORY] = frequent
+        if displayed and displayed.get(OTHER_CATEGORY):
+            sections[OTHER_CATEGORY] = displayed[OTHER_CATEGORY]
+        current_paths = set()
+        for category, apps in sections.items():
+            if category not in self.category_sections:
+                self.category_sections[category] = self.create_category_section(category)
+            self.update_section_title(category)
+            for app in apps:
+                key = self.tile_key(category, app)
+                current_paths.add(key)
+                tile = self.app_tiles.get(key)
+                if tile is None:
+                    tile = self.create_app_tile(app)
+                    self.app_tiles[key] = tile
+                elif tile.app is not app:
+                    # 重新加载后应用信息是新的对象，更新按钮引用和显示内容
+                    tile.app = app
+                    tile.setText(app['name'])
+                    tile.setToolTip(app['target'])
+                    tile.setIcon(app['icon'])
+
+        for path in list(self.app_tiles):
+            if path not in current_paths:
+                self.app_tiles.pop(path).deleteLater()
+
+        for category in list(self.category_sections):
+            if category not in sections:
+                self.category_sections.pop(category)['widget'].deleteLater()
+
+        # 常用区块在前，“其他结果”在最后，其余按名称排序分类，只有顺序变化时才调整布局
+        order = sorted(self.category_sections, key=lambda category: (
+            category == OTHER_CATEGORY, category != FREQUENT_CATEGORY, category))
+        if order != self.section_order:
+            for category in order:
+                self.main_content_layout.removeWidget(self.category_sections[category]['widget'])
+            for i, category in enumerate(order):
+                self.main_content_layout.insertWidget(i, self.category_sections[category]['widget'])
+            self.section_order = order
+
+    @staticmethod
+    def tile_key(category, app):
+        """应用按钮的键：常用区块中的按钮与分类中的按钮分开"""
+        if category == FREQUENT_CATEGORY:
+            return FREQUENT_CATEGORY + "|" + app['path']
+        return app['path']
+
+    def frequent_apps(self):
+        """使用评分最高的几个应用"""
+        top = self.usage_log.top(FREQUENT_COUNT * 2)
+        if not top:
+            return []
+        wanted = set(top)
+        found = {}
+        for apps in self.app_categories.values():
+            for app in apps:
+                if app['path'] in wanted:
+                    found[app['path']] = app
+        return [found[path] for path in top if path in found][:FREQUENT_COUNT]
+
+    def create_category_section(self, category):
+        """创建分类区块：标题、分隔线和放置应用按钮的网格"""
+        section_widget = QWidget(self.scroll_content)
+        section_layout = QVBoxLayout(section_widget)
+        section_layout.setContentsMargins(0, 0, 0, 0)
+        section_layout.setSpacing(20)
+
+        # 添加分类标题，点击折叠/展开（常用区块和“其他结果”除外）
+        category_label = QLabel(category)
+        category_label.setFont(QFont("SimHei", int(14 * self.scale_factor), QFont.Weight.Bold))
+        category_label.setStyleSheet("color: #333333; margin-top: 10px;")
+        if category not in (FREQUENT_CATEGORY, OTHER_CATEGORY):
+            category_label.setTextFormat(Qt.TextFormat.RichText)
+            category_label.linkActivated.connect(lambda link, category=category: self.toggle_category(category))
+        section_layout.addWidget(category_label)
+
+        # 添加分隔线
+        line = QFrame()
+        line.setFrameShape(QFrame.Shape.HLine)
+        line.setFrameShadow(QFrame.Shadow.Sunken)
+        line.setStyleSheet("background-color: #E5E7EB; height: 1px;")
+        section_layout.addWidget(line)
+
+        # 创建网格布局显示该分类下的应用
+        category_widget = QWidget()
+        grid_layout = QGridLayout(category_widget)
+        grid_layout.setSpacing(int(15 * self.scale_factor))
+        # 增加右 margin 避免被滚动条遮挡
+        grid_layout.setContentsMargins(5, 5, 15, 15)
+        section_layout.addWidget(category_widget)
+
+        return {
+            'widget': section_widget,
+            'label': category_label,
+            'grid_widget': category_widget,
+            'grid': grid_layout,
+            'layout_key': None,  # 上次排列时的 (列数, 应用路径)，未变化时跳过重新排列
+        }
+
+    @property
+    def collapsed_categories(self):
+        """折叠的分类名（集合视图）"""
+        return self.state.namespace("collapsed").keys()
+
+    def category_names(self):
+        """所有分类名，包括推迟解析、还没有应用的折叠分类"""
+        return set(self.app_categories) | {os.path.basename(directory) for directory in self.deferred_dirs}
+
+    def section_title(self, category):
+        """分类标题的文字：折叠的分类显示应用数，还没有解析的显示“未加载”"""
+        if category in (FREQUENT_CATEGORY, OTHER_CATEGORY):
+            return category
+        if category not in self.collapsed_categories:
+            return f"▼ {category}"
+        if any(os.path.basename(directory) == category for directory in self.deferred_dirs):
+            return f"▶ {category}（未加载）"
+        return f"▶ {category}（{len(self.app_categories.get(category, []))}）"
+
+    def update_section_title(self, category):
+        section = self.category_sections[category]
+        title = self.section_title(category)
+        if section.get('title') == title:
+            return
+        section['title'] = title
+        if category in (FREQUENT_CATEGORY, OTHER_CATEGORY):
+            section['label'].setText(title)
+        else:
+            section['label'].setText(f'<a href="#" style="color: #333333; text-decoration: none;">'
+                                     f'{html.escape(title)}</a>')
 
-            self.main_content_layout.addWidget(category_widget)
+    def toggle_category(self, category):
+        """折叠或展开分类，状态保存在 profile/state.db 中"""
+        if category in (FREQUENT_CATEGORY, OTHER_CATEGORY):
+            return
+        if category in self.collapsed_categories:
+            self.state.delete("collapsed", category)
+            self.collapsed_since.pop(category, None)
+            self.load_deferred(category)  # 第一次展开时才解析
+        else:
+            self.state.set("collapsed", category, True)
+            self.collapsed_since[category] = time.monotonic()
+        self.schedule_display()
+
+    def drop_idle_pixmaps(self):
+        """折叠较久的分类中不在显示的应用换回占位图标，不再被其他应用使用的缩放图标随之释放"""
+        now = time.monotonic()
+        idle = {category for category, since in self.collapsed_since.items()
+                if now - since >= PIXMAP_DROP_SECONDS and category in self.collapsed_categories}
+        if not idle:
+            return
+        placeholder = self.default_icon()
+        dropped, in_use = set(), set()
+        for category, apps in self.app_categories.items():
+            for app in apps:
+                if category in idle and app.get('has_icon') and app['path'] not in self.displayed_paths:
+                    app['icon'] = placeholder
+                    app['has_icon'] = False
+                    dropped.add(self.icon_key(app))
+                elif app.get('has_icon'):
+                    in_use.add(self.icon_key(app))
+        # 系统索引的“其他结果”也可能与目录应用共用图标
+        in_use.update(self.icon_key(app) for app in self.other_results if app.get('has_icon'))
+        for target_path in dropped - in_use:
+            self.scaled_icons.invalidate(target_path)
+        if dropped:
+            metrics.count("dropped_icon_targets", len(dropped - in_use))
+
+    def create_app_tile(self, app):
+        """创建应用按钮，按钮通过 tile.app 引用当前的应用信息"""
+        app_button = QToolButton(self.scroll_content)
+        app_button.app = app
+        app_button.setIcon(app['icon'])
+        # 根据缩放因子调整图标大小
+        icon_size = int(64 * self.scale_factor)
+        app_button.setIconSize(QSize(icon_size, icon_size))
+        app_button.setText(app['name'])
+        app_button.setToolTip(app['target'])
+        app_button.setObjectName(app['path'])
+
+        # 绑定点击事件（启动应用）
+        app_button.clicked.connect(
+            lambda checked, widget=app_button:
+            self.launch_app(widget.app)
+        )
 
-        # 添加一个伸缩项，将所有内容推到顶部
-        self.main_content_layout.addStretch()
+        # 设置文本在图标下方
+        app_button.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextUnderIcon)
 
-    def launch_app(self, target_path, arguments=""):
-        """启动应用程序"""
-        try:
-            if arguments:
-                subprocess.Popen([target_path, arguments])
-            else:
-                subprocess.Popen([target_path])
-        except Exception as e:
-            print(f"无法启动应用: {e}")
+        # 添加右键菜单
+        app_button.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        app_button.customContextMenuRequested.connect(
+            lambda pos, widget=app_button:
+            self.show_context_menu(pos, widget.app, widget)
+        )
+        app_button.hide()
+        return app_button
+
+    def apply_scale(self):
+        """缩放变化时只更新尺寸：按钮样式统一设在容器上，不再逐个按钮生成样式表"""
+        # 计算按钮尺寸
+        btn_min_width = int(120 * self.scale_factor)
+        btn_max_width = int(140 * self.scale_factor)
+        btn_height = int(140 * self.scale_factor)
+
+        # 设置按钮样式 - 根据缩放因子调整
+        self.scroll_content.setStyleSheet(f"""
+            QToolButton {{
+                background-color: rgba(255, 255, 255, 0.7);
+                border: 1px solid transparent;
+                border-radius: {int(8 * self.scale_factor)}px;
+                padding: {int(8 * self.scale_factor)}px;
+                margin: {int(5 * self.scale_factor)}px;
+                text-align: center;
+                font-size: {int(12 * self.scale_factor)}px;
+                min-width: {btn_min_width}px;
+                max-width: {btn_max_width}px;
+                min-height: {btn_height}px;
+                max-height: {btn_height}px;
+            }}
+            QToolButton:hover {{
+                background-color: rgba(240, 240, 240, 0.9);
+                border: 1px solid #E5E7EB;
+            }}
+            QToolButton:pressed {{
+                background-color: rgba(220, 220, 220, 0.9);
+            }}
+        """)
+
+        icon_size = QSize(int(64 * self.scale_factor), int(64 * self.scale_factor))
+        for tile in self.app_tiles.values():
+            tile.setIconSize(icon_size)
+
+        for section in self.category_sections.values():
+            section['label'].setFont(QFont("SimHei", int(14 * self.scale_factor), QFont.Weight.Bold))
+            section['grid'].setSpacing(int(15 * self.scale_factor))
+
+        self.applied_scale = self.scale_factor
+
+    def zoom_to(self, scale_factor):
+        """改变缩放因子，连续的缩放操作合并成一次重绘"""
+        self.scale_factor = min(self.max_scale, max(self.min_scale, round(scale_factor, 2)))
+        self.zoom_timer.start()
+
+    def update_scale(self):
+        """缩放因子改变后更新尺寸并重新排列"""
+        self.zoom_timer.stop()
+        self.save_config()
+        with metrics.timer("zoom_relayout"):
+            if self.virtual_view:
+                # 虚拟化网格绘制时按需取得对应尺寸的图标
+                self.grid_view.set_scale(self.scale_factor)
+                return
+            self.refresh_icons()
+            self.apply_scale()
+            self.reflow_apps()
+
+    def refresh_icons(self):
+        """按当前缩放选用最接近的一级图标，替换按钮上的图标"""
+        size = self.icon_pixel_size()
+        icons = {}
+        for tile in self.app_tiles.values():
+            app = tile.app
+            if not app.get('has_icon'):
+                continue
+            target_path = self.icon_key(app)
+            if target_path not in icons:
+                icons[target_path] = self.scaled_icons.icon(target_path, size)
+            if icons[target_path]:
+                app['icon'] = icons[target_path]
+                tile.setIcon(app['icon'])
+
+    def schedule_reflow(self):
+        """合并连续的窗口大小变化，每帧最多重新排列一次"""
+        if self.virtual_view:
+            # 虚拟化网格由视图自己按宽度重新布局
+            return
+        if not self.reflow_timer.isActive():
+            self.reflow_timer.start()
+
+    def reflow_after_resize(self):
+        """窗口大小变化引起的重新排列，单独记录次数和耗时"""
+        metrics.count("resize_relayouts")
+        with metrics.timer("resize_relayout"):
+            self.reflow_apps()
+
+    def reflow_apps(self, force=False):
+        """按当前列数把可见的应用按钮放入各分类网格，列数和内容都未变化时跳过"""
+        if self.applied_scale != self.scale_factor:
+            self.apply_scale()
+
+        # 根据缩放因子和窗口宽度计算列数
+        base_item_width = 160  # 基础宽度
+        scaled_item_width = base_item_width * self.scale_factor
+        cols = max(1, int(self.width() // scaled_item_width))
+
+        visible_paths = set()
+        for category, section in self.category_sections.items():
+            apps = self.visible_apps.get(category, [])
+            layout_key = (cols, tuple(self.tile_key(category, app) for app in apps))
+            if apps:
+                visible_paths.update(layout_key[1])
+            if not force and layout_key == section['layout_key']:
+                continue
+            section['layout_key'] = layout_key
+
+            grid_layout = section['grid']
+            while grid_layout.count():
+                grid_layout.takeAt(0)
+
+            # 添加应用按钮
+            for i, app in enumerate(apps):
+                grid_layout.addWidget(self.app_tiles[self.tile_key(category, app)], i // cols, i % cols)
+            # 折叠的分类没有应用时只显示标题
+            section['grid_widget'].setVisible(bool(apps))
+            section['widget'].setVisible(category in self.visible_apps)
+
+        for path, tile in self.app_tiles.items():
+            tile.setVisible(path in visible_paths)
+
+    def launch_app(self, app):
+        """启动应用程序：在后台线程中创建进程，使用快捷方式的参数和工作目录，重复点击只启动一次"""
+        self.note_activity()  # 预热让出磁盘
+        with tracer.span("launch_app", target=app['target'], arguments=app.get('arguments', '')) as span:
+            submitted = self.launch_executor.launch(app['path'], app['target'],
+                                                    app.get('arguments', ''), app.get('working_dir', ''))
+            span.set(submitted=submitted)
+
+    def on_app_launched(self, path):
+        """进程创建成功后才记录使用（启动失败的不计入），更新搜索排序和常用区块"""
+        self.usage_log.record(path)
+        self.search_index.set_boosts(self.usage_log.all_scores())
+        self.other_index.set_boosts(self.search_index.boosts)
+        if not self.search_box.text().strip():
+            self.schedule_display()
 
     def filter_apps(self, text):
-        """根据搜索文本过滤应用"""
-        if not text or text.strip() == "":
-            self.display_apps()
+        """根据搜索文本过滤应用，匹配名称、拼音全拼/首字母、目标文件名和分类，结果按相关度排序"""
+        with metrics.timer("filter_apps"):
+            if not text or text.strip() == "":
+                self.display_apps()
+                return
+            if self.deferred_dirs:
+                # 搜索可能匹配折叠分类中的应用，解析完成后结果自动更新
+                self.load_deferred()
+
+            self.note_activity()  # 输入期间系统索引和预热让出CPU和磁盘
+            with tracer.span("filter_apps", query=text) as span:
+                results = self.search_index.search(text)
+                others = self.other_matches(text) if self.system_items else []
+                span.set(results=len(results), others=len(others))
+            self.display_apps(results, others)
+
+    def other_matches(self, text):
+        """系统索引中的匹配项，去掉目标已在应用目录中的和目标重复的，最多 OTHER_RESULTS_LIMIT 个"""
+        seen = {os.path.normcase(app['target']) for apps in self.app_categories.values() for app in apps}
+        others = []
+        for item in self.other_index.search(text, OTHER_RESULTS_LIMIT * 4):
+            target = os.path.normcase(item['target'])
+            if target in seen:
+                continue
+            seen.add(target)
+            others.append(item)
+            if len(others) >= OTHER_RESULTS_LIMIT:
+                break
+        return others
+
+    def on_system_index_updated(self, changed, removed):
+        """后台索引的一批目录有变化：更新这些目录的项目，搜索索引的增删排队分批执行"""
+        for directory in list(removed) + list(changed):
+            for path in self.system_items.pop(directory, {}):
+                self.other_index_pending.append((directory, path, None))
+        for directory, items in changed.items():
+            # 复制一份，图标等界面状态不写回后台索引（会被保存）
+            items = {item['path']: dict(item) for item in items}
+            self.system_items[directory] = items
+            self.other_index_pending.extend((directory, path, item) for path, item in items.items())
+        self.other_index_timer.start()
+
+    def apply_other_index_updates(self):
+        """执行排队的搜索索引增删，每轮最多 SYSTEM_INDEX_SLICE_MS 毫秒；全部完成后刷新正在显示的搜索结果"""
+        deadline = time.perf_counter() + SYSTEM_INDEX_SLICE_MS / 1000
+        pending = self.other_index_pending
+        while pending and time.perf_counter() < deadline:
+            for _ in range(min(16, len(pending))):
+                directory, path, item = pending.popleft()
+                if item is None:
+                    self.other_index.remove(path)
+                elif self.system_items.get(directory, {}).get(path) is item:  # 之后没有再被替换
+                    self.other_index.add(item)
+        if pending:
             return
+        self.other_index_timer.stop()
+        if self.search_box.text().strip():
+            self.search_timer.start()
+
+    def metrics_report(self):
+        """运行时指标：各操作耗时的滚动直方图，加上控件数、图标内存和各分类的应用数"""
+        icon_stats = self.scaled_icons.stats()
+        placeholder_bytes = sum(size * size * 4 for size in self.placeholder_icons)
+        return metrics.report(
+            widgets=len(self.scroll_content.findChildren(QWidget)),
+            icon_bytes=icon_stats['bytes'] + placeholder_bytes,
+            unique_icons=icon_stats['unique_icons'],
+            icon_cache=self.icon_cache.stats(),  # 命中、未命中、失效次数和映射的字节数
+            prewarm=self.prewarmer.stats() if self.prewarmer else "未开启",
+            system_index=self.system_indexer.stats() if self.system_indexer else "未开启",
+            slowest_launches={key: f"平均 {stats['total_ms'] / stats['launches']:.0f} ms，"
+                                   f"{stats['launches']} 次，失败 {stats['failures']} 次"
+                              for key, stats in self.launch_executor.slowest(5)},
+            apps=sum(len(apps) for apps in self.app_categories.values()),
+            categories={category: len(apps) for category, apps in sorted(self.app_categories.items())},
+        )
 
-        # 搜索所有分类中的应用
-        all_apps = []
-        for apps in self.app_categories.values():
-            all_apps.extend(apps)
+    def note_activity(self):
+        """用户有操作：暂停预热和系统索引，空闲一段时间后再继续"""
+        if self.prewarmer:
+            self.prewarmer.pause()
+        if self.system_indexer:
+            self.system_indexer.pause()
+        if self.prewarmer or self.system_indexer:
+            self.idle_timer.start()
+
+    def on_idle(self):
+        """没有操作一段时间：继续爬取系统索引，开始新一轮预热"""
+        if self.system_indexer:
+            self.system_indexer.resume()
+        self.start_prewarm()
+
+    def prewarm_targets(self):
+        """需要预热的目标程序：最常用的应用在前，其次是收藏的应用"""
+        apps = {app['path']: app for apps in self.app_categories.values() for app in apps}
+        paths = list(self.usage_log.top(self.prewarm_top)) + sorted(self.favorite_apps)
+        targets = []
+        for path in paths:
+            app = apps.get(path)
+            if app and app['target'].lower().endswith('.exe') and app['target'] not in targets:
+                targets.append(app['target'])
+        return targets
+
+    def start_prewarm(self):
+        """空闲时开始新一轮预热"""
+        if not self.prewarmer:
+            return
+        if not self.app_categories:
+            self.idle_timer.start()  # 目录还没加载完
+            return
+        self.prewarmer.submit(self.prewarm_targets())
+        self.prewarmer.resume()
 
-        # 过滤应用
-        filtered = [app for app in all_apps if text.lower() in app['name'].lower()]
-        self.display_apps(filtered)
+    def toggle_metrics_overlay(self):
+        """显示/隐藏运行时指标浮层"""
+        self.metrics_overlay.toggle()
+        if self.metrics_overlay.isVisible():
+            self.event_loop_probe.start()
+        elif not metrics.dump_path:
+            self.event_loop_probe.stop()
 
     def show_context_menu(self, position, app, widget):
         """显示右键菜单"""
@@ -417,13 +1548,18 @@ class AppLauncher(QMainWindow):
         # 启动应用动作
         launch_action = QAction("启动", self)
         launch_action.triggered.connect(
-            lambda: self.launch_app(app['target'], app.get('arguments', ''))
+            lambda: self.launch_app(app)
         )
+        if app.get('system'):
+            # “其他结果”中的项目不在应用目录中，只能启动
+            menu.addAction(launch_action)
+            menu.exec(widget.mapToGlobal(position))
+            return
 
         # 重命名动作
         rename_action = QAction("重命名", self)
         rename_action.triggered.connect(
-            lambda: self.rename_app(app, widget)
+            lambda: self.rename_app(app)
         )
 
         # 添加到收藏动作
@@ -445,101 +1581,327 @@ class AppLauncher(QMainWindow):
         menu.addAction(launch_action)
         menu.addAction(rename_action)
         menu.addAction(favorite_action)
+        self.add_move_menu(menu, [app])
         menu.addSeparator()
         menu.addAction(remove_action)
 
         # 在鼠标位置显示菜单
         menu.exec(widget.mapToGlobal(position))
 
-    def rename_app(self, app, widget):
+    def show_batch_menu(self, position, apps, widget):
+        """多选时的右键菜单，每个操作对所有选中的应用作为一次更新提交（“其他结果”中的项目只参与启动）"""
+        menu = QMenu()
+        catalog_apps = [app for app in apps if not app.get('system')]
+
+        launch_action = QAction(f"启动 {len(apps)} 个应用", self)
+        launch_action.triggered.connect(
+            lambda: [self.launch_app(app) for app in apps]
+        )
+        menu.addAction(launch_action)
+        if not catalog_apps:
+            menu.exec(widget.mapToGlobal(position))
+            return
+
+        favorite_action = QAction("全部添加到收藏", self)
+        favorite_action.triggered.connect(
+            lambda: self.mutate_catalog([('favorite', app, True) for app in catalog_apps])
+        )
+
+        unfavorite_action = QAction("全部从收藏移除", self)
+        unfavorite_action.triggered.connect(
+            lambda: self.mutate_catalog([('favorite', app, False) for app in catalog_apps])
+        )
+
+        remove_action = QAction(f"从启动器移除 {len(catalog_apps)} 个应用", self)
+        remove_action.triggered.connect(
+            lambda: self.remove_apps(catalog_apps)
+        )
+
+        menu.addAction(favorite_action)
+        menu.addAction(unfavorite_action)
+        self.add_move_menu(menu, catalog_apps)
+        menu.addSeparator()
+        menu.addAction(remove_action)
+
+        menu.exec(widget.mapToGlobal(position))
+
+    def add_move_menu(self, menu, apps):
+        """移动到其他分类的子菜单，列出其他分类文件夹"""
+        current = {app['category'] for app in apps}
+        categories = {os.path.basename(directory) for directories in self.known_dirs.values()
+                      for directory in directories}
+        targets = sorted(category for category in categories
+                         if len(current) > 1 or category not in current)
+        if not targets:
+            return
+        move_menu = menu.addMenu("移动到")
+        for category in targets:
+            move_action = QAction(category, self)
+            move_action.triggered.connect(
+                lambda checked, category=category:
+                self.mutate_catalog([('move', app, category) for app in apps if app['category'] != category])
+            )
+            move_menu.addAction(move_action)
+
+    def rename_app(self, app):
         """重命名应用（实际是重命名快捷方式文件）"""
         new_name, ok = QInputDialog.getText(
             self, "重命名应用", "新名称:", text=app['name']
         )
 
         if ok and new_name and new_name != app['name']:
-            try:
-                # 获取文件扩展名
-                ext = os.path.splitext(app['path'])[1]
-                # 构建新路径
-                new_path = os.path.join(os.path.dirname(app['path']), new_name + ext)
-
-                # 重命名文件
-                os.rename(app['path'], new_path)
-
-                # 更新应用信息
-                app['name'] = new_name
-                app['path'] = new_path
-                widget.setText(new_name)
-
-                # 重新加载应用列表
-                self.load_applications()
-            except Exception as e:
-                print(f"重命名失败: {e}")
+            self.mutate_catalog([('rename', app, new_name)])
 
     def toggle_favorite(self, app_path):
         """添加或移除收藏"""
         if app_path in self.favorite_apps:
-            self.favorite_apps.remove(app_path)
+            self.state.delete("favorites", app_path)
         else:
-            self.favorite_apps.append(app_path)
-        self.save_favorite_apps()
+            self.state.set("favorites", app_path, True)
 
     def remove_app(self, app):
         """从启动器移除应用（删除快捷方式）"""
+        self.mutate_catalog([('remove', app, None)])
+
+    def remove_apps(self, apps):
+        """确认后批量删除选中应用的快捷方式"""
+        answer = QMessageBox.question(self, "从启动器移除", f"删除选中的 {len(apps)} 个快捷方式？")
+        if answer == QMessageBox.StandardButton.Yes:
+            self.mutate_catalog([('remove', app, None) for app in apps])
+
+    def mutate_catalog(self, changes):
+        """
+        把一批对单个应用的修改直接应用到目录、搜索索引和界面上的按钮，不重新扫描和加载整个目录，
+        整批修改只刷新一次界面、只保存一次快照
+        changes 为 [(操作, 应用信息, 参数)]，操作为 'rename'（参数为新名称）、'remove'、
+        'move'（参数为目标分类）或 'favorite'（参数为是否收藏）；返回成功应用的修改数
+        """
+        touched = set()  # 内容有变化的分类目录
+        applied = 0
+        with tracer.span("mutate_catalog", changes=len(changes)) as span:
+            for action, app, value in changes:
+                try:
+                    if action == 'favorite':
+                        if value:
+                            self.state.set("favorites", app['path'], True)
+                        else:
+                            self.state.delete("favorites", app['path'])
+                    elif action == 'rename':
+                        try:
+                            touched.update(self.relocate_entry(app, value, app['category']))
+                        except PermissionError as e:
+                            # 没有权限重命名快捷方式时，只修改启动器中显示的名称
+                            print(f"重命名文件失败，改为只修改显示名称: {e}")
+                            self.set_display_name(app, value)
+                    elif action == 'move':
+                        touched.update(self.relocate_entry(app, None, value))
+                    elif action == 'remove':
+                        touched.add(self.drop_entry(app))
+                    else:
+                        raise ValueError(f"未知的操作: {action}")
+                    applied += 1
+                except Exception as e:
+                    print(f"修改应用失败: {e}")
+            span.set(applied=applied)
+
+        if touched:
+            for directory in touched:
+                stamp = directory_stamp(directory)
+                self.own_changes[os.path.abspath(directory)] = stamp
+                if directory in self.scan_stamps:
+                    # 这个分类正在后台扫描，扫描结果可能是修改之前的内容，以当前内容重新扫描
+                    self.start_category_scan(directory, self.dir_apps.get(directory))
+                elif directory in self.dir_apps and stamp is not None:
+                    self.category_stamps[directory] = stamp
+                else:
+                    self.category_stamps.pop(directory, None)
+            self.snapshot_save_timer.start()
+            self.search_index.set_boosts(self.usage_log.all_scores())
+            self.schedule_display()
+        return applied
+
+    def relocate_entry(self, app, new_name, category):
+        """
+        重命名快捷方式文件或把它移动到另一个分类文件夹，就地更新应用信息和对应的按钮
+        new_name 为None时保留文件名；目标分类优先放在应用所在的根目录中；返回内容有变化的分类目录
+        """
+        old_path = app['path']
+        old_category = app['category']
+        old_dir = os.path.dirname(old_path)
+        new_dir = old_dir if category == old_category else self.category_directory(self.root_of(old_dir), category)
+        file_name = os.path.basename(old_path)
+        if new_name is not None:
+            file_name = new_name + os.path.splitext(old_path)[1]
+        new_path = os.path.join(new_dir, file_name)
+        if new_path == old_path:
+            return set()
+        if os.path.exists(new_path):
+            raise FileExistsError(f"已存在同名的快捷方式: {new_path}")
+        os.rename(old_path, new_path)
+
+        self.search_index.remove(old_path)
+        apps = self.dir_apps.get(old_dir, [])
+        position = next((i for i, other in enumerate(apps) if other is app), None)
+        if position is not None:
+            del apps[position]
+        if new_dir != old_dir:
+            if not apps:
+                self.dir_apps.pop(old_dir, None)
+            self.dir_apps.setdefault(new_dir, []).append(app)
+            position = None
+        if position is not None:
+            apps.insert(position, app)  # 同一分类内重命名，保持原来的位置
+        self.rebuild_category(old_category)
+        self.rebuild_category(category)
+
+        app['path'] = new_path
+        app['category'] = category
+        if new_name is not None:
+            app['name'] = new_name
         try:
-            if os.path.exists(app['path']):
-                os.remove(app['path'])
-
-            # 重新加载应用
-            self.load_applications()
-        except Exception as e:
-            print(f"删除应用失败: {e}")
-
-    def load_favorite_apps(self):
-        """从文件加载收藏的应用"""
-        try:
-            if os.path.exists('favorites.txt'):
-                with open('favorites.txt', 'r', encoding='utf-8') as f:
-                    self.favorite_apps = [line.strip() for line in f.readlines()]
-        except Exception as e:
-            print(f"加载收藏失败: {e}")
-
-    def save_favorite_apps(self):
-        """保存收藏的应用到文件"""
-        try:
-            with open('favorites.txt', 'w', encoding='utf-8') as f:
-                for app_path in self.favorite_apps:
-                    f.write(f"{app_path}\n")
-        except Exception as e:
-            print(f"保存收藏失败: {e}")
+            st = os.stat(new_path)
+            app['stat'] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+        self.migrate_app_key(old_path, new_path)
+        if new_name is not None:
+            # 文件名就是新的名称，不再需要自定义的显示名称
+            override = self.state.get("overrides", new_path)
+            if override and 'name' in override:
+                override = {key: value for key, value in override.items() if key != 'name'}
+                if override:
+                    self.state.set("overrides", new_path, override)
+                else:
+                    self.state.delete("overrides", new_path)
+        self.search_index.add(app)
+
+        # 按钮键随快捷方式路径变化
+        for section in (old_category, FREQUENT_CATEGORY):
+            tile = self.app_tiles.pop(self.tile_key(section, {'path': old_path}), None)
+            if tile is not None:
+                tile.setText(app['name'])
+                tile.setObjectName(new_path)
+                self.app_tiles[self.tile_key(section, app)] = tile
+        return {old_dir, new_dir}
+
+    def category_directory(self, root, category):
+        """分类在指定根目录中的文件夹；这个根目录中没有该分类时使用其他根目录中的同名分类"""
+        directory = os.path.join(root, category)
+        if directory in self.known_dirs.get(root, ()):
+            return directory
+        for other_root in self.roots:
+            other = os.path.join(other_root, category)
+            if other in self.known_dirs.get(other_root, ()):
+                return other
+        raise FileNotFoundError(f"分类不存在: {category}")
+
+    def drop_entry(self, app):
+        """删除快捷方式，并从目录、搜索索引、收藏和自定义设置中移除；返回应用所在的分类目录"""
+        if os.path.exists(app['path']):
+            os.remove(app['path'])
+        directory = os.path.dirname(app['path'])
+        apps = [other for other in self.dir_apps.get(directory, []) if other is not app]
+        if apps:
+            self.dir_apps[directory] = apps
+        else:
+            self.dir_apps.pop(directory, None)
+        self.rebuild_category(app['category'])
+        self.search_index.remove(app['path'])
+        self.state.delete("favorites", app['path'])
+        self.state.delete("overrides", app['path'])
+        # 按钮在下一次刷新界面时由 sync_app_tiles 删除
+        return directory
+
+    def migrate_app_key(self, old_path, new_path):
+        """快捷方式路径变化后，把收藏、自定义设置、使用记录和启动统计转到新路径下"""
+        if old_path in self.favorite_apps:
+            self.state.delete("favorites", old_path)
+            self.state.set("favorites", new_path, True)
+        override = self.state.get("overrides", old_path)
+        if override is not None:
+            self.state.delete("overrides", old_path)
+            self.state.set("overrides", new_path, override)
+        self.usage_log.rename(old_path, new_path)
+        self.launch_executor.rename_key(old_path, new_path)
+        if old_path in self.hot_paths:
+            self.hot_paths.discard(old_path)
+            self.hot_paths.add(new_path)
+
+    def set_display_name(self, app, name):
+        """只修改启动器中显示的名称，保存为自定义设置"""
+        override = dict(self.state.get("overrides", app['path'], {}))
+        override['name'] = name
+        self.state.set("overrides", app['path'], override)
+        app['name'] = name
+        self.search_index.add(app)
+        for section in (app['category'], FREQUENT_CATEGORY):
+            tile = self.app_tiles.get(self.tile_key(section, app))
+            if tile is not None:
+                tile.setText(name)
+        self.grid_view.app_model.app_changed(app['path'])
+        self.schedule_display()
+
+    @property
+    def favorite_apps(self):
+        """收藏的应用（快捷方式路径的集合视图），第一次使用时才读取"""
+        favorites = self.state.namespace("favorites")
+        if not self.state.get("meta", "favorites_migrated"):
+            # 从旧版的 favorites.txt 迁移
+            try:
+                if os.path.exists('favorites.txt'):
+                    with open('favorites.txt', 'r', encoding='utf-8') as f:
+                        for line in f:
+                            if line.strip():
+                                self.state.set("favorites", line.strip(), True)
+            except Exception as e:
+                print(f"加载收藏失败: {e}")
+            self.state.set("meta", "favorites_migrated", True)
+        return favorites.keys()
+
+    def apply_overrides(self, apps):
+        """应用用户对单个应用的自定义设置（目前为显示名称）"""
+        overrides = self.state.namespace("overrides")
+        if not overrides:
+            return
+        for app in apps:
+            override = overrides.get(app['path'])
+            if override and override.get('name'):
+                app['name'] = override['name']
 
     def resizeEvent(self, event):
-        """窗口大小改变时重新排列图标"""
-        self.display_apps()
+        """窗口大小改变时重新排列图标（合并为每帧一次），并记录窗口大小"""
+        self.schedule_reflow()
+        self.save_config()
         super().resizeEvent(event)
 
+    def moveEvent(self, event):
+        """记录窗口位置，异常退出时也能恢复"""
+        self.save_config()
+        super().moveEvent(event)
+
     def keyPressEvent(self, event):
         """处理键盘事件"""
         # 缩放控制
         if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
             if event.key() == Qt.Key.Key_Plus or event.key() == Qt.Key.Key_Equal:
-                self.scale_factor = min(self.max_scale, self.scale_factor + 0.1)
-                self.display_apps()
+                self.zoom_to(self.scale_factor + 0.1)
                 return
             elif event.key() == Qt.Key.Key_Minus:
-                self.scale_factor = max(self.min_scale, self.scale_factor - 0.1)
-                self.display_apps()
+                self.zoom_to(self.scale_factor - 0.1)
                 return
             elif event.key() == Qt.Key.Key_0:
-                self.scale_factor = 1.0
-                self.display_apps()
+                self.zoom_to(1.0)
                 return
 
         if event.key() == Qt.Key.Key_Escape:
             self.close()
         elif event.key() == Qt.Key.Key_F5:
-            self.load_applications()
+            # 完整重新扫描，忽略快照
+            self.load_applications(use_snapshot=False)
+        elif event.key() == Qt.Key.Key_F6:
+            self.toggle_view_mode()
+        elif event.key() == Qt.Key.Key_F12:
+            self.toggle_metrics_overlay()
         else:
             super().keyPressEvent(event)
 
@@ -549,17 +1911,21 @@ class AppLauncher(QMainWindow):
             delta = event.angleDelta().y()
             if delta > 0:
                 # 滚轮向上，放大
-                self.scale_factor = min(self.max_scale, self.scale_factor + 0.1)
+                self.zoom_to(self.scale_factor + 0.1)
             else:
                 # 滚轮向下，缩小
-                self.scale_factor = max(self.min_scale, self.scale_factor - 0.1)
-            self.display_apps()
+                self.zoom_to(self.scale_factor - 0.1)
             event.accept()
         else:
             super().wheelEvent(event)
 
 
 if __name__ == '__main__':
+    # --trace[=路径] 开启性能追踪，退出时写出Chrome trace JSON
+    tracing.configure(sys.argv)
+    # --metrics-dump[=路径] 定时写出运行时指标
+    configure_metrics(sys.argv)
+
     # 确保中文显示正常
     font = QFont("SimHei")
 
@@ -569,5 +1935,6 @@ if __name__ == '__main__':
     # 设置全局样式
     app.setStyle("Fusion")
 
-    launcher = AppLauncher()
+    # --resident: 常驻模式
+    launcher = AppLauncher(resident='--resident' in sys.argv)
     sys.exit(app.exec())
\ No newline at end of file